@@ -0,0 +1,81 @@
+# Benchmark: ORM add-per-row loop vs. chunked bulk INSERT-or-ignore
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_bulk_insert.py [rows ...]
+# Defaults to 1k, 10k and 100k rows, each written into a fresh temporary SQLite database.
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from models.news_article import NewsArticle
+from services.storage import article_row, bulk_insert_articles
+
+def make_articles(count):
+    """Builds standardized article dicts shaped like the output of standardize_articles."""
+    now = datetime.utcnow()
+    return [{
+        "title": f"Benchmark headline number {i}",
+        "description": "A short description of the story. " * 4,
+        "content": "Body text of the article. " * 40,
+        "url": f"https://example.com/news/{i}",
+        "url_hash": f"{i:032x}",
+        "image_url": f"https://example.com/img/{i}.jpg",
+        "published_at": now - timedelta(minutes=i),
+        "source_name": "example",
+        "source_url": "https://example.com",
+        "category": "technology",
+        "api_source": "GNews"
+    } for i in range(count)]
+
+def fresh_engine(directory, name):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+def run_orm_loop(engine, articles):
+    """The original write path: one NewsArticle per row via db.add, then a single commit."""
+    db = sessionmaker(bind=engine)()
+    try:
+        for data in articles:
+            db.add(NewsArticle(**article_row(data)))
+        db.commit()
+    finally:
+        db.close()
+
+def run_bulk(engine, articles):
+    fetched_at = datetime.utcnow()
+    return bulk_insert_articles([article_row(a, fetched_at) for a in articles], bind=engine)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'rows':>8} {'orm loop (s)':>14} {'bulk (s)':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            articles = make_articles(size)
+
+            engine = fresh_engine(directory, f"orm_{size}.db")
+            started = time.perf_counter()
+            run_orm_loop(engine, articles)
+            orm_seconds = time.perf_counter() - started
+            engine.dispose()
+
+            engine = fresh_engine(directory, f"bulk_{size}.db")
+            started = time.perf_counter()
+            counts = run_bulk(engine, articles)
+            bulk_seconds = time.perf_counter() - started
+            engine.dispose()
+
+            assert counts["added"] == size, counts
+            print(f"{size:>8} {orm_seconds:>14.3f} {bulk_seconds:>10.3f} {orm_seconds / bulk_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Benchmark: scans over the articles table before and after its text moves to article_contents
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_content_split.py [articles]
+# Defaults to 100k articles. Builds a database in the old layout (description, content and
+# image_url in the articles table), measures, runs the migration, VACUUMs and measures again.
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from models.news_article import NewsArticle
+from config import CATEGORIES
+from migrations import split_article_content
+from services.queries import get_headlines
+
+REPEATS = 7
+ROWS_PER_DAY = 20_000
+
+def build_legacy_database(engine, count):
+    """Creates the schema as older versions had it and fills it with wide article rows."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for column in ("description", "content", "image_url"):
+            conn.exec_driver_sql(f"ALTER TABLE articles ADD COLUMN {column} TEXT")
+        rows = []
+        for i in range(count):
+            age = timedelta(seconds=rng.randrange(0, int(count / ROWS_PER_DAY * 86400) + 1))
+            rows.append({
+                "title": f"Benchmark headline number {i}",
+                "description": "<p>A short <b>description</b> of the story.</p> " * 8,
+                "content": "Body text of the article. " * rng.randrange(40, 200),
+                "url": f"https://example.com/news/{i}",
+                "url_hash": f"{i:032x}",
+                "image_url": f"https://example.com/img/{i}.jpg",
+                "published_at": now - age - timedelta(minutes=rng.randrange(0, 120)),
+                "fetched_at": now - age,
+                "source_name": f"source{i % 50}",
+                "source_url": f"https://source{i % 50}.example",
+                "category": rng.choice(CATEGORIES),
+                "api_source": "GNews",
+                "story_key": f"{i // 3:032x}"
+            })
+        conn.execute(text(
+            "INSERT INTO articles (title, description, content, url, url_hash, image_url, published_at, fetched_at, "
+            "source_name, source_url, category, api_source, story_key) VALUES (:title, :description, :content, :url, "
+            ":url_hash, :image_url, :published_at, :fetched_at, :source_name, :source_url, :category, :api_source, :story_key)"
+        ), rows)
+
+def table_megabytes(engine, table):
+    """Bytes of a table's b-tree (including overflow pages), or None without the dbstat module."""
+    try:
+        with engine.connect() as conn:
+            size = conn.execute(text("SELECT sum(pgsize) FROM dbstat WHERE name = :name"), {"name": table}).scalar()
+    except Exception:
+        return None
+    return round((size or 0) / 2 ** 20, 1)
+
+def measure(engine, func):
+    session_factory = sessionmaker(bind=engine)
+    timings = []
+    for _ in range(REPEATS):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            func(db)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return statistics.median(timings)
+
+# Queries run against both layouts; only the table they read from changes
+SCANS = {
+    "index headlines": lambda db: get_headlines(db, datetime.utcnow() - timedelta(hours=24)),
+    # No index on source_name: walks the table newest first until 20 rows match
+    "api page by source": lambda db: db.execute(
+        select(NewsArticle.id, NewsArticle.title, NewsArticle.published_at)
+        .where(NewsArticle.source_name == "source49")
+        .order_by(NewsArticle.published_at.desc()).limit(20)
+    ).all(),
+    "full table scan": lambda db: db.execute(text("SELECT count(*) FROM articles WHERE api_source = 'GNews'")).scalar()
+}
+
+def run_scans(engine, label):
+    results = {name: measure(engine, scan) for name, scan in SCANS.items()}
+    print(f"{label:<8} " + " ".join(f"{results[name]:>{len(name) + 5}.2f}" for name in SCANS)
+          + f" {table_megabytes(engine, 'articles') or 'n/a':>14}")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'split.db')}")
+        build_legacy_database(engine, count)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+
+        print(f"{count} articles, median of {REPEATS} runs (ms)")
+        print(f"{'layout':<8} " + " ".join(f"{name + ' (ms)':>{len(name) + 5}}" for name in SCANS) + f" {'articles (MB)':>14}")
+        run_scans(engine, "before")
+
+        started = time.perf_counter()
+        split_article_content(engine)
+        migration_seconds = time.perf_counter() - started
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+        run_scans(engine, "after")
+        print(f"\nMigration took {migration_seconds:.1f}s; article_contents is {table_megabytes(engine, 'article_contents') or 'n/a'} MB")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Benchmark: timestamp parsing, dateutil isoparse + parse fallback vs. services.dates.parse_datetime
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_dates.py [batch_size ...]
+# Defaults to batches of 1k and 10k timestamps in the mix the providers actually send.
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from dateutil import parser as date_parser
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import dates
+
+REPEATS = 5
+
+# (provider, weight, formatter) — provider None means a format only the generic parser is expected to see
+FORMATS = [
+    ("GNews", 40, lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%SZ")),
+    ("NewsData.io", 30, lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S")),
+    ("WorldNewsAPI", 20, lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S")),
+    (None, 5, lambda dt: dt.replace(tzinfo=timezone(timedelta(hours=5, minutes=30))).isoformat(timespec="milliseconds")),
+    (None, 5, lambda dt: dt.strftime("%a, %d %b %Y %H:%M:%S +0000")),
+]
+
+def make_batch(size, rng):
+    """Timestamps repeat within a batch: the same story is returned for several categories."""
+    now = datetime(2026, 1, 15, 12, 0, 0)
+    distinct = [now - timedelta(seconds=rng.randrange(0, 48 * 3600)) for _ in range(max(size // 3, 1))]
+    weights = [weight for _, weight, _ in FORMATS]
+    batch = []
+    for _ in range(size):
+        provider, _, formatter = rng.choices(FORMATS, weights)[0]
+        batch.append((formatter(rng.choice(distinct)), provider))
+    return batch
+
+def dateutil_parse(value):
+    """The previous approach (with its timezone conversion fixed): isoparse, then the generic parser."""
+    try:
+        dt = date_parser.isoparse(value)
+    except ValueError:
+        dt = date_parser.parse(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def time_it(fn, batch, before=None):
+    timings = []
+    for _ in range(REPEATS):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn(batch)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def run_dateutil(batch):
+    return [dateutil_parse(value) for value, _ in batch]
+
+def run_engine(batch):
+    return [dates.parse_datetime(value, provider) for value, provider in batch]
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000]
+    rng = random.Random(42)
+    print(f"{'batch':>8} {'dateutil':>12} {'engine cold':>12} {'engine warm':>12} {'speedup':>9}")
+    for size in sizes:
+        batch = make_batch(size, rng)
+        expected = run_dateutil(batch)
+        dates.clear_cache()
+        assert run_engine(batch) == expected, "parse_datetime disagrees with dateutil"
+
+        baseline = time_it(run_dateutil, batch)
+        cold = time_it(run_engine, batch, before=dates.clear_cache)
+        warm = time_it(run_engine, batch)
+        print(f"{size:>8} {baseline * 1000:>10.1f}ms {cold * 1000:>10.1f}ms {warm * 1000:>10.1f}ms {baseline / cold:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
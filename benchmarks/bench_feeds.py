@@ -0,0 +1,152 @@
+# Benchmark: personalized feeds, fan-out cost at ingest and serving latency per user
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_feeds.py [users]
+# Defaults to 10k users, each subscribed to 2 categories and 3 sources (skewed popularity),
+# over a week of articles. Compares full fan-out with the hybrid (fan-out for categories/sources
+# with at most FEED_FANOUT_MAX_SUBSCRIBERS subscribers, merge-on-read above), and both with
+# building every feed from the articles table on each request.
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, or_, text
+from sqlalchemy.orm import sessionmaker
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, create_engines
+from models.news_article import NewsArticle
+from models.user import User, Subscription
+from config import CATEGORIES, FEED_FANOUT_MAX_SUBSCRIBERS, FEED_PAGE_SIZE
+from services.storage import bulk_insert, bulk_insert_articles
+from services import feeds
+
+SOURCES = 300
+ARTICLES_PER_DAY = 3_000
+BATCHES = 5
+BATCH_SIZE = 200
+READS = 200
+
+def _weighted(rng, population, count):
+    """Picks count distinct items, the first ones far more often (Zipf-like popularity)."""
+    weights = [1 / (rank + 1) for rank in range(len(population))]
+    picked = set()
+    while len(picked) < count:
+        picked.add(rng.choices(population, weights)[0])
+    return picked
+
+def article_rows(rng, start, count, now, spread):
+    return [{
+        "title": f"Benchmark headline number {i}",
+        "summary": "A short description of the story.",
+        "url": f"https://example.com/news/{i}",
+        "url_hash": f"{i:032x}",
+        "published_at": now - timedelta(seconds=rng.randrange(0, spread)),
+        "fetched_at": now,
+        "source_name": f"source{_weighted(rng, range(SOURCES), 1).pop()}",
+        "category": rng.choice(CATEGORIES),
+        "api_source": "GNews"
+    } for i in range(start, start + count)]
+
+def build_database(engine, users):
+    """Creates users, their subscriptions and a week of articles; returns the next article number."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(11)
+    now = datetime.utcnow()
+    count = ARTICLES_PER_DAY * 7
+    bulk_insert_articles(article_rows(rng, 0, count, now, 7 * 86400), bind=engine)
+    bulk_insert(User.__table__, [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "created_at": now, "merge_on_read": False}
+        for i in range(1, users + 1)
+    ], bind=engine)
+    subscriptions = []
+    for user_id in range(1, users + 1):
+        for category in _weighted(rng, CATEGORIES, 2):
+            subscriptions.append({"user_id": user_id, "kind": "category", "value": category,
+                                  "materialized": False, "created_at": now})
+        for source in _weighted(rng, range(SOURCES), 3):
+            subscriptions.append({"user_id": user_id, "kind": "source", "value": f"source{source}",
+                                  "materialized": False, "created_at": now})
+    bulk_insert(Subscription.__table__, subscriptions, bind=engine)
+    return count
+
+def naive_feed(db, user_id):
+    """The feed without materialization: an OR over every subscription on the articles table."""
+    subscriptions = db.execute(select(Subscription.kind, Subscription.value).where(Subscription.user_id == user_id)).all()
+    conditions = [feeds.TARGET_COLUMNS[kind] == value for kind, value in subscriptions]
+    return db.execute(
+        select(*feeds.FEED_ARTICLE_COLUMNS).where(or_(*conditions))
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(FEED_PAGE_SIZE)
+    ).all()
+
+def read_latency(session_factory, user_ids, read):
+    timings = []
+    for user_id in user_ids:
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            read(db, user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+def run(users, threshold, label):
+    feeds.FEED_FANOUT_MAX_SUBSCRIBERS = threshold
+    with tempfile.TemporaryDirectory() as directory:
+        # The app's engines: WAL, its synchronous/cache pragmas and a read-only reader pool
+        engine, read_engine = create_engines(f"sqlite:///{os.path.join(directory, 'feeds.db')}", concurrent=True)
+        next_article = build_database(engine, users)
+
+        started = time.perf_counter()
+        feeds.rebalance_subscriptions(bind=engine)
+        materialize_seconds = time.perf_counter() - started
+
+        rng = random.Random(5)
+        fan_out_ms, entries = [], 0
+        for _ in range(BATCHES):
+            rows = article_rows(rng, next_article, BATCH_SIZE, datetime.utcnow(), 3600)
+            next_article += BATCH_SIZE
+            bulk_insert_articles(rows, bind=engine)
+            started = time.perf_counter()
+            entries += feeds.fan_out(rows, bind=engine)
+            fan_out_ms.append((time.perf_counter() - started) * 1000)
+
+        with engine.connect() as conn:
+            feed_items = conn.execute(text("SELECT count(*) FROM feed_items")).scalar()
+            heavy_users = conn.execute(text("SELECT id FROM users WHERE merge_on_read")).scalars().all()
+            light_users = conn.execute(text("SELECT id FROM users WHERE NOT merge_on_read")).scalars().all()
+
+        session_factory = sessionmaker(bind=read_engine)
+        materialized = lambda db, user_id: feeds.get_user_feed(db, db.get(User, user_id))
+        sample = random.Random(1)
+        print(f"\n{label}: {len(light_users)} users fully materialized, {len(heavy_users)} merging on read")
+        print(f"  initial materialization {materialize_seconds:.1f}s, {feed_items} feed entries stored")
+        print(f"  fan-out per {BATCH_SIZE}-article batch: median {statistics.median(fan_out_ms):.1f} ms, "
+              f"{entries // BATCHES} entries written")
+        for name, group in (("light users", light_users), ("heavy users", heavy_users)):
+            if not group:
+                continue
+            picked = sample.sample(group, min(READS, len(group)))
+            median, p95 = read_latency(session_factory, picked, materialized)
+            naive_median, naive_p95 = read_latency(session_factory, picked, naive_feed)
+            print(f"  {name:<12} feed read median {median:6.2f} ms p95 {p95:6.2f} ms | "
+                  f"from articles median {naive_median:6.2f} ms p95 {naive_p95:6.2f} ms")
+        engine.dispose()
+        read_engine.dispose()
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{users} users, {ARTICLES_PER_DAY * 7} articles from {SOURCES} sources, page size {FEED_PAGE_SIZE}")
+    run(users, users + 1, "full fan-out")
+    run(users, FEED_FANOUT_MAX_SUBSCRIBERS, f"hybrid (fan-out up to {FEED_FANOUT_MAX_SUBSCRIBERS} subscribers)")
+
+if __name__ == "__main__":
+    main()
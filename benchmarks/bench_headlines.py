@@ -0,0 +1,96 @@
+# Benchmark: index page headline query, full-row load + Python grouping vs. get_headlines
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_headlines.py [rows_per_day ...]
+# Defaults to 10k and 100k articles fetched within the last 24 hours (plus a day of older rows).
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, desc
+from sqlalchemy.orm import sessionmaker
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from models.news_article import NewsArticle
+from config import CATEGORIES
+from services.storage import bulk_insert_articles, bulk_insert_article_contents
+from services.queries import get_headlines
+
+REPEATS = 5
+
+def seed(engine, rows_per_day):
+    now = datetime.utcnow()
+    rng = random.Random(42)
+    rows = []
+    for i in range(rows_per_day * 2):
+        age = timedelta(seconds=rng.randrange(0, 48 * 3600))
+        rows.append({
+            "title": f"Benchmark headline number {i}",
+            "summary": "A short description of the story. " * 4,
+            "url": f"https://example.com/news/{i}",
+            "url_hash": f"{i:032x}",
+            "story_key": f"{i // 3:032x}", # Roughly three reports per story
+            "published_at": now - age - timedelta(minutes=rng.randrange(0, 120)),
+            "fetched_at": now - age,
+            "source_name": "example",
+            "source_url": "https://example.com",
+            "category": rng.choice(CATEGORIES),
+            "api_source": "GNews"
+        })
+    bulk_insert_articles(rows, chunk_size=5000, bind=engine)
+    bulk_insert_article_contents([{
+        "url_hash": row["url_hash"],
+        "description": "A short description of the story. " * 8,
+        "content": "Body text of the article. " * 200,
+        "image_url": f"https://example.com/img/{i}.jpg"
+    } for i, row in enumerate(rows)], chunk_size=5000, bind=engine)
+
+def legacy_index(db, since):
+    """The original index query: every full row from the window, grouped in Python."""
+    recent_articles = db.query(NewsArticle)\
+                        .filter(NewsArticle.fetched_at >= since)\
+                        .order_by(desc(NewsArticle.published_at))\
+                        .all()
+    articles_by_category = {category: [] for category in CATEGORIES}
+    for article in recent_articles:
+        if article.category in articles_by_category:
+            articles_by_category[article.category].append(article)
+    return {k: v for k, v in articles_by_category.items() if v}
+
+def measure(session_factory, func, since):
+    timings = []
+    for _ in range(REPEATS):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            func(db, since)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return statistics.median(timings)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'rows/day':>9} {'legacy (ms)':>12} {'get_headlines (ms)':>19}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, f'headlines_{size}.db')}")
+            Base.metadata.create_all(bind=engine)
+            seed(engine, size)
+            session_factory = sessionmaker(bind=engine)
+            since = datetime.utcnow() - timedelta(hours=24)
+
+            legacy_ms = measure(session_factory, legacy_index, since)
+            headlines_ms = measure(session_factory, get_headlines, since)
+            engine.dispose()
+            print(f"{size:>9} {legacy_ms:>12.1f} {headlines_ms:>19.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Benchmark: FTS5 search latency on a synthetic article corpus
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_search.py [articles]
+# Defaults to a 1M-article corpus in a temporary SQLite database (building it takes a few minutes).
+
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from config import CATEGORIES
+from services.storage import bulk_insert_articles, bulk_insert_article_contents
+from services.search import ensure_search_index, index_new_articles, search_articles
+
+REPEATS = 20
+VOCABULARY_SIZE = 20_000
+QUERIES = {
+    "common term": "word1",
+    "mid-frequency term": "word300",
+    "rare term": "word15000",
+    "two terms": "word2 word40",
+    "common term + category": ("word1", {"category": "technology"}),
+    "common term + 30-day range": ("word1", {"since_days": 30}),
+}
+
+def build_corpus(engine, count):
+    rng = random.Random(7)
+    # Zipf-like word frequencies: low-numbered words are far more common
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(VOCABULARY_SIZE)))
+    now = datetime.utcnow()
+    batch = []
+    contents = []
+    for i in range(count):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=60)
+        batch.append({
+            "title": " ".join(words[:10]),
+            "url": f"https://example.com/news/{i}",
+            "url_hash": f"{i:032x}",
+            "published_at": now - timedelta(minutes=i),
+            "fetched_at": now,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "api_source": "GNews"
+        })
+        contents.append({"url_hash": f"{i:032x}", "description": " ".join(words[10:30]), "content": " ".join(words[30:])})
+        if len(batch) == 50_000:
+            bulk_insert_article_contents(contents, chunk_size=10_000, bind=engine)
+            bulk_insert_articles(batch, chunk_size=10_000, bind=engine)
+            batch = []
+            contents = []
+    if batch:
+        bulk_insert_article_contents(contents, chunk_size=10_000, bind=engine)
+        bulk_insert_articles(batch, chunk_size=10_000, bind=engine)
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+        Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+
+        started = time.perf_counter()
+        build_corpus(engine, count)
+        print(f"Inserted {count} articles in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        index_new_articles(engine)
+        print(f"Built FTS index in {time.perf_counter() - started:.1f}s\n")
+
+        db = sessionmaker(bind=engine)()
+        print(f"{'query':<28} {'p50 (ms)':>9} {'p95 (ms)':>9} {'page 10 p50 (ms)':>17}")
+        try:
+            for name, spec in QUERIES.items():
+                query, options = spec if isinstance(spec, tuple) else (spec, {})
+                filters = {}
+                if "category" in options:
+                    filters["category"] = options["category"]
+                if "since_days" in options:
+                    filters["since"] = datetime.utcnow() - timedelta(days=options["since_days"])
+
+                first_page, deep_page = [], []
+                for _ in range(REPEATS):
+                    started = time.perf_counter()
+                    _, cursor = search_articles(db, query, **filters)
+                    first_page.append((time.perf_counter() - started) * 1000)
+                for _ in range(8): # Walk to page 10, then time fetching it
+                    if cursor:
+                        _, cursor = search_articles(db, query, cursor=cursor, **filters)
+                for _ in range(REPEATS if cursor else 0):
+                    started = time.perf_counter()
+                    search_articles(db, query, cursor=cursor, **filters)
+                    deep_page.append((time.perf_counter() - started) * 1000)
+
+                deep = f"{statistics.median(deep_page):.1f}" if deep_page else "n/a"
+                print(f"{name:<28} {statistics.median(first_page):>9.1f} {percentile(first_page, 95):>9.1f} {deep:>17}")
+        finally:
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Benchmark: application startup — import time, gunicorn boot to all workers ready, worker restart
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_startup.py [workers] [repeats]
+# Defaults to 4 workers and 5 repeats. Uses a throwaway instance folder; the scheduler is disabled.
+
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_PATTERN = re.compile(r"Worker (\d+) ready")
+BOOT_TIMEOUT_SECONDS = 60
+
+# Prints the seconds `import main` takes and which heavy modules it loaded
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+heavy = [m for m in ("requests", "dateutil", "apscheduler", "services.api_clients", "services.processing") if m in sys.modules]
+print(json.dumps({"seconds": elapsed, "modules": len(sys.modules), "heavy": heavy}))
+"""
+
+def base_env(instance_dir, **overrides):
+    env = dict(os.environ, INSTANCE_FOLDER_PATH=instance_dir, SCHEDULER_ENABLED="false", PYTHONDONTWRITEBYTECODE="1")
+    env.update(overrides)
+    return env
+
+def bench_import(instance_dir, repeats, schema_upgrade):
+    """Median seconds for a fresh interpreter to import the app (and create it)."""
+    env = base_env(instance_dir, SCHEMA_UPGRADE_ON_STARTUP=str(schema_upgrade).lower())
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=PROJECT_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "modules": runs[-1]["modules"],
+        "heavy_modules_loaded": runs[-1]["heavy"]
+    }
+
+def _wait_ready(process, count, deadline):
+    """Reads the gunicorn log until count more workers report ready; returns their pids."""
+    pids = []
+    while len(pids) < count:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Workers did not become ready in time.")
+        line = process.stderr.readline()
+        if not line:
+            raise RuntimeError("gunicorn exited during startup.")
+        match = READY_PATTERN.search(line)
+        if match:
+            pids.append(int(match.group(1)))
+    return pids
+
+def _pss_mb(pids):
+    """Total proportional set size of the workers (pages shared with the master counted fractionally)."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += next(int(l.split()[1]) for l in f if l.startswith("Pss:"))
+        except (OSError, StopIteration):
+            return None
+    return round(total / 1024, 1)
+
+def bench_gunicorn(instance_dir, workers, preload):
+    """Seconds from launching gunicorn to every worker ready, and to replace one killed worker."""
+    port = 18000 + os.getpid() % 1000
+    env = base_env(instance_dir, GUNICORN_PRELOAD=str(preload).lower(), WEB_CONCURRENCY=str(workers), PORT=str(port))
+    # Load the project as a package, as the Procfile does ("src.main:app")
+    app_uri = f"{os.path.basename(PROJECT_DIR)}.main:app"
+    command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(PROJECT_DIR, "gunicorn.conf.py"),
+               "--chdir", os.path.dirname(PROJECT_DIR), app_uri]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+    try:
+        pids = _wait_ready(process, workers, started + BOOT_TIMEOUT_SECONDS)
+        boot = time.perf_counter() - started
+        pss = _pss_mb(pids)
+
+        killed = time.perf_counter()
+        os.kill(pids[0], signal.SIGKILL)
+        _wait_ready(process, 1, killed + BOOT_TIMEOUT_SECONDS)
+        restart = time.perf_counter() - killed
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {"boot_seconds": boot, "worker_restart_seconds": restart, "workers_pss_mb": pss}
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    instance_dir = tempfile.mkdtemp()
+    # Create the schema once so every measured run sees an existing database, as in production
+    bench_import(instance_dir, 1, schema_upgrade=True)
+
+    print(f"import main (median of {repeats}):")
+    for schema_upgrade in (True, False):
+        result = bench_import(instance_dir, repeats, schema_upgrade)
+        print(f"  schema check {'on ' if schema_upgrade else 'off'}: {result['seconds'] * 1000:7.1f} ms, "
+              f"{result['modules']} modules, ingest-only modules loaded: {result['heavy_modules_loaded'] or 'none'}")
+
+    try:
+        import gunicorn # noqa: F401
+    except ImportError:
+        print("gunicorn is not installed; skipping the server benchmarks.")
+        return
+    print(f"gunicorn, {workers} workers (median of {repeats}):")
+    for preload in (False, True):
+        runs = [bench_gunicorn(instance_dir, workers, preload) for _ in range(repeats)]
+        boot = statistics.median(r["boot_seconds"] for r in runs)
+        restart = statistics.median(r["worker_restart_seconds"] for r in runs)
+        pss = runs[-1]["workers_pss_mb"]
+        print(f"  preload {'on ' if preload else 'off'}: all ready in {boot * 1000:7.1f} ms, "
+              f"worker restart {restart * 1000:7.1f} ms, workers PSS {pss if pss is not None else 'n/a'} MB")
+
+if __name__ == "__main__":
+    main()
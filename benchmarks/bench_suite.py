@@ -0,0 +1,268 @@
+# Benchmark suite: end-to-end ingest, dedup cost and page latency, fully offline
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_suite.py [--output results.json] [--compare baseline.json] [options]
+# Serving is measured rendering every request, through the page cache, and from static snapshots.
+# Runs against a temporary instance folder and a local provider stub (benchmarks/stub_providers.py),
+# so it needs no API keys or network. Results are written as JSON; --compare prints the change
+# of every metric against an earlier results file.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubSettings, start_stub
+
+# Metrics where a lower value is better; everything else (throughput) is better higher
+LOWER_IS_BETTER = ("_ms", "_seconds")
+
+def configure_app(instance_dir, stub_url):
+    """Points the app at a scratch instance folder and the stub; must run before any app import."""
+    os.environ.update({
+        "INSTANCE_FOLDER_PATH": instance_dir,
+        "NEWSDATA_BASE_URL": stub_url,
+        "WORLDNEWS_BASE_URL": stub_url,
+        "GNEWS_BASE_URL": stub_url,
+        "HTTP_CACHE_ENABLED": "false",
+        "SCHEDULER_ENABLED": "false",
+        "RETENTION_ENABLED": "false"
+    })
+    import config
+    # The stub has no plan limits; keep the quota layer from pacing the measurement
+    for quota in config.PROVIDER_QUOTAS.values():
+        quota.update(daily_limit=10 ** 9, rate_per_second=10 ** 6, burst=10 ** 6)
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda fraction: ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+    return {"p50_ms": round(pick(0.50), 3), "p90_ms": round(pick(0.90), 3),
+            "p99_ms": round(pick(0.99), 3), "max_ms": round(ordered[-1] * 1000, 3)}
+
+# --- Ingest ---
+
+def bench_ingest(rounds):
+    from services.ingest import run_ingest
+    totals = {"fetched": 0, "added": 0, "duplicates": 0, "errors": 0}
+    started = time.perf_counter()
+    for _ in range(rounds):
+        counts = run_ingest()
+        for key in totals:
+            totals[key] += counts[key]
+    elapsed = time.perf_counter() - started
+    return dict(totals, rounds=rounds, elapsed_seconds=round(elapsed, 3),
+                fetched_per_second=round(totals["fetched"] / elapsed, 1),
+                stored_per_second=round(totals["added"] / elapsed, 1))
+
+# --- Dedup ---
+
+def _synthetic_articles(start, count):
+    from services.dedup import url_hash
+    now = datetime.utcnow()
+    articles = []
+    for i in range(start, start + count):
+        url = f"https://bench.example/story/{i}"
+        articles.append({
+            "title": f"Synthetic benchmark story {i} about {random.choice(('markets', 'science', 'sport'))}",
+            "description": "A short description of the story. " * 4,
+            "content": "Body text of the article. " * 60,
+            "url": url,
+            "url_hash": url_hash(url),
+            "published_at": now - timedelta(minutes=i % 1440),
+            "source_name": "bench",
+            "category": random.choice(("business", "science", "sports", "technology")),
+            "api_source": "GNews"
+        })
+    return articles
+
+def _article_count():
+    from database import engine
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT count(*) FROM articles").scalar()
+
+def bench_dedup(sizes, batch_size=200, repeats=20):
+    from database import SessionLocal
+    from services.dedup import find_existing_hashes
+    from services.processing import store_standardized_articles
+    from services.storage import article_row, bulk_insert_articles
+
+    results = []
+    next_id = 0
+    for size in sizes:
+        missing = size - _article_count()
+        while missing > 0:
+            chunk = _synthetic_articles(next_id, min(missing, 20_000))
+            next_id += len(chunk)
+            bulk_insert_articles([article_row(a) for a in chunk])
+            missing = size - _article_count()
+
+        stored_hashes = [a["url_hash"] for a in _synthetic_articles(max(next_id - batch_size // 2, 0), batch_size // 2)]
+        lookups = []
+        for _ in range(repeats):
+            new_hashes = [a["url_hash"] for a in _synthetic_articles(10 ** 9 + random.randrange(10 ** 6), batch_size // 2)]
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                find_existing_hashes(db, stored_hashes + new_hashes)
+                lookups.append(time.perf_counter() - started)
+            finally:
+                db.close()
+
+        # Full store path for one batch of new articles: dedup + clustering + insert + index
+        batch = _synthetic_articles(next_id, batch_size)
+        next_id += batch_size
+        started = time.perf_counter()
+        store_standardized_articles(batch)
+        store_seconds = time.perf_counter() - started
+
+        results.append({"table_rows": _article_count(), "batch_size": batch_size,
+                        "lookup": percentiles(lookups), "store_batch_ms": round(store_seconds * 1000, 3)})
+    return results
+
+# --- Serving ---
+
+# Serving modes: render every request, shared page cache, or static snapshot files for "/"
+SERVING_MODES = ("direct", "page_cache", "snapshot")
+
+def bench_serving(concurrency, requests_per_client, mode):
+    import requests
+    from werkzeug.serving import make_server
+    import services.page_cache
+    import services.snapshots
+    from main import app
+    from database import engine
+
+    services.page_cache.PAGE_CACHE_ENABLED = mode != "direct"
+    services.snapshots.SNAPSHOTS_ENABLED = mode == "snapshot"
+    if mode == "snapshot":
+        services.snapshots.publish_snapshots(force=True)
+    with engine.connect() as conn:
+        article_ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM articles ORDER BY id DESC LIMIT 5000")]
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    samples = {"index": [], "article": []}
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        for i in range(requests_per_client):
+            name, path = ("index", "/") if i % 2 == 0 else ("article", f"/article/{rng.choice(article_ids)}")
+            started = time.perf_counter()
+            response = session.get(base_url + path)
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status_code == 200:
+                    samples[name].append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    total = sum(len(values) for values in samples.values())
+    return {"mode": mode, "concurrency": concurrency, "requests": total, "errors": errors[0],
+            "requests_per_second": round(total / elapsed, 1),
+            "index": percentiles(samples["index"]), "article": percentiles(samples["article"])}
+
+# --- Reporting ---
+
+def flatten(results, prefix=""):
+    """Flattens nested results into {"section.metric": number} for comparisons."""
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(results, list):
+        for i, value in enumerate(results):
+            # Name list entries by what they measured, so runs with other sizes/modes still line up
+            key = value.get("mode", value.get("table_rows", i)) if isinstance(value, dict) else i
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix.rstrip(".")] = results
+    return flat
+
+def compare(baseline, current):
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\n{'metric':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        if old[key] == 0:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100
+        worse = change > 0 if key.endswith(LOWER_IS_BETTER) else change < 0
+        flag = "  <-- worse" if worse and abs(change) >= 10 else ""
+        print(f"{key:<48} {old[key]:>12} {new[key]:>12} {change:>+8.1f}%{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest and serving benchmark suite")
+    parser.add_argument("--output", help="Write results JSON here (default: print it)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--ingest-rounds", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--articles-per-response", type=int, default=10)
+    parser.add_argument("--content-chars", type=int, default=1500)
+    parser.add_argument("--dedup-sizes", default="10000,50000,100000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests-per-client", type=int, default=200)
+    args = parser.parse_args()
+
+    stub_settings = StubSettings(latency_ms=args.latency_ms, error_rate=args.error_rate,
+                                 articles=args.articles_per_response, content_chars=args.content_chars)
+    stub, stub_url, _ = start_stub(stub_settings)
+    instance_dir = tempfile.mkdtemp(prefix="news-bench-")
+    configure_app(instance_dir, stub_url)
+    from migrations import upgrade_schema
+    upgrade_schema()
+
+    print("Running ingest benchmark...", file=sys.stderr)
+    results = {"ingest": bench_ingest(args.ingest_rounds)}
+    print("Running dedup benchmark...", file=sys.stderr)
+    results["dedup"] = bench_dedup([int(size) for size in args.dedup_sizes.split(",")])
+    print("Running serving benchmark...", file=sys.stderr)
+    results["serving"] = [bench_serving(args.concurrency, args.requests_per_client, mode) for mode in SERVING_MODES]
+    stub.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "settings": vars(args)
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Benchmark: read latency while a large ingest commit is running, rollback journal vs. concurrent mode
+#
+# Usage (from the project directory):
+#     python benchmarks/bench_wal.py [rows_per_commit]
+# Defaults to 50k-row ingest transactions; readers run the JSON API's first-page query meanwhile.
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+# Ensure src directory is in path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, create_engines
+from models.news_article import NewsArticle, ArticleContent
+from services.storage import bulk_insert
+
+READERS = 4
+READER_PAUSE_SECONDS = 0.005 # Think time between requests, so readers don't starve the writer of the GIL
+WRITE_ROUNDS = 3
+SEED_ROWS = 20_000
+
+def make_rows(start, count):
+    now = datetime.utcnow()
+    return [{
+        "title": f"Benchmark headline number {i}",
+        "summary": "A short description of the story. " * 4,
+        "url": f"https://example.com/news/{i}",
+        "url_hash": f"{i:032x}",
+        "published_at": now - timedelta(seconds=i),
+        "fetched_at": now,
+        "category": "technology",
+        "api_source": "GNews"
+    } for i in range(start, start + count)]
+
+def make_content_rows(start, count):
+    return [{
+        "url_hash": f"{i:032x}",
+        "description": "A short description of the story. " * 8,
+        "content": "Body text of the article. " * 80
+    } for i in range(start, start + count)]
+
+def run_mode(concurrent, rows_per_commit):
+    directory = tempfile.mkdtemp()
+    write_engine, read_engine = create_engines(f"sqlite:///{directory}/bench.db", concurrent=concurrent)
+    Base.metadata.create_all(bind=write_engine)
+    bulk_insert(NewsArticle.__table__, make_rows(0, SEED_ROWS), chunk_size=SEED_ROWS, bind=write_engine)
+
+    query = select(NewsArticle.id, NewsArticle.title, NewsArticle.published_at)\
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(20)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    writing = threading.Event()
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            overlapped = writing.is_set()
+            started = time.perf_counter()
+            try:
+                with read_engine.connect() as conn:
+                    conn.execute(query).all()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            if overlapped or writing.is_set():
+                with lock:
+                    latencies.append(elapsed)
+            time.sleep(READER_PAUSE_SECONDS)
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    next_id = SEED_ROWS
+    write_seconds = []
+    for _ in range(WRITE_ROUNDS):
+        rows = make_rows(next_id, rows_per_commit)
+        next_id += rows_per_commit
+        writing.set()
+        started = time.perf_counter()
+        # One transaction per table, like a big ingest batch
+        bulk_insert(ArticleContent.__table__, make_content_rows(next_id - rows_per_commit, rows_per_commit),
+                    chunk_size=rows_per_commit, bind=write_engine)
+        bulk_insert(NewsArticle.__table__, rows, chunk_size=rows_per_commit, bind=write_engine)
+        write_seconds.append(time.perf_counter() - started)
+        writing.clear()
+        time.sleep(0.2)
+    done.set()
+    for thread in threads:
+        thread.join()
+    write_engine.dispose()
+    read_engine.dispose()
+    return latencies, errors[0], statistics.median(write_seconds)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    rows_per_commit = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"{READERS} readers, {WRITE_ROUNDS} ingest commits of {rows_per_commit} rows each")
+    print(f"{'mode':>16} {'reads':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'errors':>7} {'commit':>8}")
+    for label, concurrent in (("rollback journal", False), ("WAL reader/writer", True)):
+        latencies, errors, write_time = run_mode(concurrent, rows_per_commit)
+        if not latencies:
+            print(f"{label:>16} no reads completed during the commits ({errors} errors)")
+            continue
+        print(f"{label:>16} {len(latencies):>7} "
+              f"{percentile(latencies, 0.5) * 1000:>7.1f}ms {percentile(latencies, 0.95) * 1000:>7.1f}ms "
+              f"{percentile(latencies, 0.99) * 1000:>7.1f}ms {max(latencies) * 1000:>7.1f}ms "
+              f"{errors:>7} {write_time:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Local stub of the NewsData.io, WorldNewsAPI and GNews endpoints used by services/api_clients
+#
+# Usage (from the project directory):
+#     python benchmarks/stub_providers.py [--port 8099] [--latency-ms 50] [--error-rate 0.02] [--articles 10]
+# then point the app at it:
+#     NEWSDATA_BASE_URL=http://127.0.0.1:8099 WORLDNEWS_BASE_URL=http://127.0.0.1:8099 GNEWS_BASE_URL=http://127.0.0.1:8099
+# The benchmark suite (bench_suite.py) starts it in-process instead.
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+WORDS = ("market", "election", "research", "launch", "team", "school", "policy", "chip", "climate",
+         "league", "startup", "court", "vaccine", "satellite", "budget", "festival", "merger", "storm")
+
+class StubSettings:
+    """Knobs shared by every request the stub serves; may be changed while it runs."""
+
+    def __init__(self, latency_ms=50, latency_jitter_ms=20, error_rate=0.0, rate_limit_rate=0.0,
+                 articles=10, content_chars=1500, duplicate_rate=0.1, seed=1):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate # Share of requests answered with a 500
+        self.rate_limit_rate = rate_limit_rate # Share answered with 429 + Retry-After: 1
+        self.articles = articles # Articles per response (payload size together with content_chars)
+        self.content_chars = content_chars
+        self.duplicate_rate = duplicate_rate # Share of articles re-sent from an earlier response
+        self.rng = random.Random(seed)
+        self.counter = itertools.count(1)
+        self.sent_ids = []
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def next_article_ids(self):
+        """Returns ids for one response: mostly new ones, some repeats to exercise dedup."""
+        with self.lock:
+            self.requests += 1
+            ids = []
+            for _ in range(self.articles):
+                if self.sent_ids and self.rng.random() < self.duplicate_rate:
+                    ids.append(self.rng.choice(self.sent_ids))
+                else:
+                    ids.append(next(self.counter))
+            self.sent_ids.extend(ids)
+            del self.sent_ids[:-10_000]
+            return ids
+
+    def roll(self):
+        """Returns 500, 429 or None (serve normally) for one request."""
+        with self.lock:
+            value = self.rng.random()
+        if value < self.error_rate:
+            return 500
+        if value < self.error_rate + self.rate_limit_rate:
+            return 429
+        return None
+
+def _article_text(article_id, category, length):
+    rng = random.Random(article_id)
+    title = f"{category.title()} {' '.join(rng.choice(WORDS) for _ in range(6))} report {article_id}"
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(WORDS))
+    return title, " ".join(words)
+
+def _published(article_id):
+    return datetime.utcnow() - timedelta(minutes=article_id % 600)
+
+# --- Provider Schemas ---
+
+def _pick_category(categories, article_id):
+    """Batched requests name several categories; each article belongs to one of them."""
+    return categories[article_id % len(categories)]
+
+def newsdata_payload(ids, categories, settings):
+    results = []
+    for article_id in ids:
+        category = _pick_category(categories, article_id)
+        title, body = _article_text(article_id, category, settings.content_chars)
+        results.append({
+            "article_id": f"nd{article_id}",
+            "title": title,
+            "link": f"https://stub-newsdata.example/news/{article_id}?utm_source=stub",
+            "description": body[:200],
+            "content": body,
+            "pubDate": _published(article_id).strftime("%Y-%m-%d %H:%M:%S"),
+            "image_url": f"https://stub-newsdata.example/img/{article_id}.jpg",
+            "source_id": "stubwire",
+            "category": [category],
+            "language": "english"
+        })
+    return {"status": "success", "totalResults": len(results), "results": results, "nextPage": None}
+
+def worldnews_payload(ids, categories, settings):
+    news = []
+    for article_id in ids:
+        category = _pick_category(categories, article_id)
+        title, body = _article_text(article_id, category, settings.content_chars)
+        news.append({
+            "id": article_id,
+            "title": title,
+            "text": body,
+            "url": f"https://stub-worldnews.example/news/{article_id}",
+            "image": f"https://stub-worldnews.example/img/{article_id}.jpg",
+            "publish_date": _published(article_id).strftime("%Y-%m-%d %H:%M:%S"),
+            "language": "en",
+            "source_country": "us",
+            "category": category
+        })
+    return {"offset": 0, "number": len(news), "available": len(news), "news": news}
+
+def gnews_payload(ids, categories, settings):
+    articles = []
+    for article_id in ids:
+        title, body = _article_text(article_id, categories[0], settings.content_chars)
+        articles.append({
+            "title": title,
+            "description": body[:200],
+            "content": body,
+            "url": f"https://stub-gnews.example/news/{article_id}",
+            "image": f"https://stub-gnews.example/img/{article_id}.jpg",
+            "publishedAt": _published(article_id).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": {"name": "Stub Gazette", "url": "https://stub-gnews.example"}
+        })
+    return {"totalArticles": len(articles), "articles": articles}
+
+# path -> (payload builder, query parameters that carry the category)
+ROUTES = {
+    "/api/1/news": (newsdata_payload, ("category", "q")),
+    "/search-news": (worldnews_payload, ("category-filter", "text")),
+    "/api/v4/top-headlines": (gnews_payload, ("category",)),
+    "/api/v4/search": (gnews_payload, ("q",)),
+}
+
+# --- Server ---
+
+def make_handler(settings):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the real providers
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            route = ROUTES.get(parts.path)
+            if route is None:
+                return self._send(404, b'{"error": "not found"}', {"Content-Type": "application/json"})
+
+            delay = settings.latency_ms + settings.rng.uniform(-1, 1) * settings.latency_jitter_ms
+            time.sleep(max(delay, 0) / 1000)
+            failure = settings.roll()
+            if failure == 429:
+                return self._send(429, b'{"error": "rate limited"}', {"Retry-After": "1", "Content-Type": "application/json"})
+            if failure == 500:
+                return self._send(500, b'{"error": "internal"}', {"Content-Type": "application/json"})
+
+            builder, category_params = route
+            query = parse_qs(parts.query)
+            category = next((query[name][0] for name in category_params if name in query), "general")
+            body = json.dumps(builder(settings.next_article_ids(), category.split(","), settings)).encode("utf-8")
+            # no-store keeps the app's HTTP cache out of the measurement
+            self._send(200, body, {"Content-Type": "application/json", "Cache-Control": "no-store"})
+    return StubHandler
+
+def start_stub(settings=None, port=0):
+    """Starts the stub on a background thread; returns (server, base_url, settings)."""
+    settings = settings or StubSettings()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(settings))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", settings
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the news provider APIs")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--content-chars", type=int, default=1500)
+    args = parser.parse_args()
+    settings = StubSettings(latency_ms=args.latency_ms, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                            articles=args.articles, content_chars=args.content_chars)
+    server, base_url, _ = start_stub(settings, args.port)
+    print(f"Provider stub listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
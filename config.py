@@ -13,10 +13,29 @@ GNEWS_API_KEY = os.getenv("GNEWS_API_KEY", "YOUR_GNEWS_API_KEY_HERE")
 
 # --- Database Configuration ---
 BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
-INSTANCE_FOLDER_PATH = os.path.join(BASE_DIR, '..', 'instance')
-DATABASE_PATH = os.path.join(INSTANCE_FOLDER_PATH, 'news.db')
+INSTANCE_FOLDER_PATH = os.getenv("INSTANCE_FOLDER_PATH", os.path.join(BASE_DIR, '..', 'instance'))
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(INSTANCE_FOLDER_PATH, 'news.db'))
 SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+# Concurrent storage mode (SQLite): WAL journaling, a read-only connection pool for request
+# handlers and a separate writer pool for ingest/jobs, so commits don't block readers
+DB_CONCURRENT_MODE = os.getenv("DB_CONCURRENT_MODE", "true").lower() == "true"
+SQLITE_SYNCHRONOUS = "NORMAL" # Safe with WAL: a power loss can only lose the last commits, never corrupt
+SQLITE_CACHE_SIZE_KIB = 64 * 1024 # Page cache per connection
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024 # Read through a memory map instead of read() syscalls
+SQLITE_BUSY_TIMEOUT_MS = 10_000 # Wait this long for the write lock instead of failing with "database is locked"
+DB_READ_POOL_SIZE = 5
+DB_READ_POOL_MAX_OVERFLOW = 10
+# Writer connections: ingest, quota/lease bookkeeping from fetch threads and jobs each check one
+# out; SQLite still serializes the writes themselves (waiting up to SQLITE_BUSY_TIMEOUT_MS)
+DB_WRITE_POOL_SIZE = 5
+DB_WRITE_POOL_MAX_OVERFLOW = 10
+
+# --- Provider Endpoints ---
+# Overridable so benchmarks (and staging) can point the clients at local stubs
+NEWSDATA_BASE_URL = os.getenv("NEWSDATA_BASE_URL", "https://newsdata.io")
+WORLDNEWS_BASE_URL = os.getenv("WORLDNEWS_BASE_URL", "https://api.worldnewsapi.com")
+GNEWS_BASE_URL = os.getenv("GNEWS_BASE_URL", "https://gnews.io")
 
 # --- News Categories ---
 # Define the categories required by the user
@@ -72,10 +91,89 @@ API_CATEGORY_MAPPING = {
     }
 }
 
+# --- Startup ---
+# Create/upgrade the schema when the app is created. With the preloading gunicorn config this
+# happens once in the master; turn it off when "flask upgrade-db" runs as a separate release step.
+SCHEMA_UPGRADE_ON_STARTUP = os.getenv("SCHEMA_UPGRADE_ON_STARTUP", "true").lower() == "true"
+# Set by gunicorn.conf.py: per-process setup (fresh DB connections, scheduler) runs in each
+# worker after the fork instead of in create_app
+WORKER_INIT_DEFERRED = os.getenv("WORKER_INIT_DEFERRED", "false").lower() == "true"
+
 # --- Scheduling Configuration ---
 # India Standard Time (IST) is UTC+5:30
 SCHEDULE_TIMES_IST = ["10:00", "18:00"]
 SCHEDULE_TIMEZONE = "Asia/Kolkata"
+# Every gunicorn worker runs the scheduler; a DB lease makes sure only one of them ingests per slot
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+# Random delay (seconds) added to each run so nodes don't hit the APIs at the same instant
+SCHEDULER_JITTER_SECONDS = 120
+# A run that couldn't start on time (e.g. during a restart) still fires if this late at most
+SCHEDULER_MISFIRE_GRACE_SECONDS = 15 * 60
+# How long the winning worker holds a slot's lease. Must exceed jitter + misfire grace + run time
+# and stay below the gap between SCHEDULE_TIMES_IST entries.
+SCHEDULER_LEASE_SECONDS = 60 * 60
+
+# --- Index Page ---
+# Headlines shown per category, from articles fetched within the window
+HEADLINES_PER_CATEGORY = 10
+HEADLINES_WINDOW_HOURS = 24
+# Candidates read per category (x HEADLINES_PER_CATEGORY) to leave room for collapsing story duplicates
+HEADLINE_STORY_OVERFETCH = 3
+# Length of the plain-text summary stored with each article at ingest (all the index page shows of it)
+ARTICLE_SUMMARY_CHARS = 150
+# Rows per batch when an older database's article text is moved to the content table
+CONTENT_MIGRATION_BATCH_SIZE = 2000
+
+# --- Background Ingest Jobs ---
+# A queued/running job whose heartbeat is older than this is treated as dead (its worker crashed)
+JOB_STALE_SECONDS = 10 * 60
+# Lease held while a job ingests so manual and scheduled runs on any worker never overlap;
+# it is renewed on every progress update
+JOB_LEASE_SECONDS = 5 * 60
+
+# --- Page Cache ---
+# Rendered pages are shared across gunicorn workers in a small SQLite file and invalidated
+# by a generation counter that ingest bumps whenever it stores new articles
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+PAGE_CACHE_PATH = os.path.join(INSTANCE_FOLDER_PATH, "page_cache.db")
+# Seconds browsers/proxies may reuse a page before revalidating it with its ETag
+PAGE_CACHE_MAX_AGE = 60
+# Pages kept per generation at most (one per article page viewed); the oldest are evicted first
+PAGE_CACHE_MAX_ENTRIES = 500
+
+# --- Metrics ---
+# Prometheus-format /metrics: each worker adds its counters to a shared SQLite file every
+# METRICS_FLUSH_SECONDS, so a scrape of any worker returns the totals of all of them
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PATH = os.path.join(INSTANCE_FOLDER_PATH, "metrics.db")
+METRICS_FLUSH_SECONDS = 5
+# Histogram bucket bounds (seconds for latencies)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_FETCH_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+METRICS_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# --- Static Snapshots ---
+# Opt-in: after each ingest that stores articles, the index page and per-category JSON feeds are
+# rendered once into a new versioned folder (with .gz variants) and swapped in atomically; "/" and
+# /api/v1/feeds/<category> then serve those bytes. A front proxy can serve SNAPSHOT_DIR/current directly.
+SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS_ENABLED", "false").lower() == "true"
+SNAPSHOT_DIR = os.path.join(INSTANCE_FOLDER_PATH, "snapshots")
+# Versions kept on disk (requests may still be reading the previous one while a new one goes live)
+SNAPSHOT_KEEP_VERSIONS = 3
+# Compressed once per publish, so use the smallest output
+SNAPSHOT_GZIP_LEVEL = 9
+
+# --- Search ---
+SEARCH_RESULTS_PER_PAGE = 20
+# Approximate number of tokens in each highlighted result snippet
+SEARCH_SNIPPET_TOKENS = 24
+
+# --- JSON API ---
+API_DEFAULT_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Responses at least this large are gzip-compressed when the client accepts it
+API_GZIP_MIN_BYTES = 1024
+API_GZIP_LEVEL = 6
 
 # --- Other Settings ---
 # Max articles to fetch per category per API run (adjust based on API limits)
@@ -83,3 +181,165 @@ MAX_ARTICLES_PER_FETCH = 20
 # How far back to look for articles (e.g., '1d' for 1 day) - relevant for some APIs
 FETCH_LOOKBACK_PERIOD = "1d"
 
+# --- Concurrent Fetching ---
+# Fan out all category/provider calls at once instead of walking them one by one
+FETCH_CONCURRENTLY = os.getenv("FETCH_CONCURRENTLY", "true").lower() == "true"
+# Max simultaneous in-flight requests per provider (keep within each plan's rate limits)
+FETCH_MAX_IN_FLIGHT = {
+    "NewsData.io": 2,
+    "WorldNewsAPI": 2,
+    "GNews": 2
+}
+# Total wall-clock budget (seconds) for one fetch run; calls still pending after this are abandoned
+FETCH_RUN_DEADLINE_SECONDS = 90
+# Max calls submitted or fetched-but-not-yet-stored at once during ingest (backpressure between
+# fetching and storing; bounds how many provider responses are held in memory)
+FETCH_PIPELINE_MAX_PENDING = 8
+
+# --- Incremental Fetching ---
+# Each (provider, category) remembers the newest publish time ingested; later runs ask only for
+# newer articles (WorldNewsAPI earliest-publish-date, GNews from) and page back until they reach it
+FETCH_INCREMENTAL = os.getenv("FETCH_INCREMENTAL", "true").lower() == "true"
+# Max pages per provider call when catching up to a watermark (every page counts against the daily quota).
+# GNews only serves pages beyond the first on paid plans.
+FETCH_MAX_PAGES = {
+    "NewsData.io": 3,
+    "WorldNewsAPI": 2,
+    "GNews": 1
+}
+# Window re-requested before each watermark for articles providers index after their publish time
+FETCH_WATERMARK_OVERLAP_MINUTES = 30
+
+# --- Request Batching ---
+# Merge categories a provider can filter on together into one request (results are routed back
+# to their category by the category each article carries)
+FETCH_BATCH_CATEGORIES = os.getenv("FETCH_BATCH_CATEGORIES", "true").lower() == "true"
+# Max categories per request; NewsData.io accepts up to 5, GNews top-headlines takes a single one
+FETCH_MAX_CATEGORIES_PER_REQUEST = {
+    "NewsData.io": 5,
+    "WorldNewsAPI": 10,
+    "GNews": 1
+}
+# Largest page each provider serves; a batch asks for MAX_ARTICLES_PER_FETCH per category,
+# split over as many pages as needed (within FETCH_MAX_PAGES)
+FETCH_MAX_PAGE_SIZE = {
+    "NewsData.io": 50,
+    "WorldNewsAPI": 100,
+    "GNews": 100
+}
+
+# --- HTTP Client ---
+# One pooled keep-alive session is kept per provider host
+HTTP_TIMEOUT_SECONDS = 20
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 8 # Should be >= the largest FETCH_MAX_IN_FLIGHT value
+# Retries for connection errors and 502/503/504 responses (429s are not retried here)
+HTTP_RETRY_TOTAL = 2
+HTTP_RETRY_BACKOFF_FACTOR = 0.5
+# On-disk response cache honoring ETag/Last-Modified and Cache-Control max-age
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_DIR = os.path.join(INSTANCE_FOLDER_PATH, "http_cache")
+# Freshness (seconds) assumed when a response carries no max-age of its own
+HTTP_CACHE_DEFAULT_MAX_AGE = 300
+# Entries older than this are evicted
+HTTP_CACHE_MAX_ENTRY_AGE = 24 * 60 * 60
+# Query parameters left out of the cache key (credentials don't change the response)
+HTTP_CACHE_IGNORED_PARAMS = ["apikey", "api-key"]
+
+# --- Provider Quotas ---
+# Per-plan limits (free tiers by default). daily_limit is persisted in the DB per UTC day and shared
+# by every worker; rate_per_second/burst is a token bucket pacing requests within a run.
+PROVIDER_QUOTAS = {
+    "NewsData.io": {"daily_limit": 200, "rate_per_second": 30 / 900, "burst": 30}, # 30 credits / 15 min
+    "WorldNewsAPI": {"daily_limit": 50, "rate_per_second": 1.0, "burst": 1},
+    "GNews": {"daily_limit": 100, "rate_per_second": 1.0, "burst": 1}
+}
+# 429 handling: retry after Retry-After (or exponential backoff with jitter when it's missing),
+# but stop waiting and open the circuit instead when the provider asks for longer than this
+QUOTA_MAX_ATTEMPTS = 3
+QUOTA_BACKOFF_BASE_SECONDS = 1.0
+QUOTA_MAX_RETRY_WAIT_SECONDS = 30
+# Circuit breaker: after this many consecutive failures (network errors, 429, 5xx, 401/403)
+# a provider is skipped for the cooldown, then one trial call decides whether it's back
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN_SECONDS = 10 * 60
+
+# --- Deduplication ---
+# Query parameters dropped when canonicalizing article URLs (tracking/analytics noise)
+DEDUP_TRACKING_PARAM_PREFIXES = ["utm_"]
+DEDUP_TRACKING_PARAMS = [
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "cmpid", "ocid", "smid", "cmp", "ito", "rss", "feature"
+]
+# Max hashes per "IN (...)" lookup (stays below SQLite's bound parameter limit)
+DEDUP_LOOKUP_CHUNK_SIZE = 500
+# Optional in-process Bloom filter in front of the DB lookup (skips definite misses)
+DEDUP_BLOOM_FILTER_ENABLED = os.getenv("DEDUP_BLOOM_FILTER_ENABLED", "false").lower() == "true"
+DEDUP_BLOOM_CAPACITY = 1_000_000
+DEDUP_BLOOM_ERROR_RATE = 0.01
+
+# --- Bulk Writes ---
+# Rows per INSERT ... ON CONFLICT DO NOTHING transaction; a failing chunk doesn't affect the others
+INGEST_CHUNK_SIZE = 500
+# Ingest stores standardized articles in batches of this size as provider responses arrive
+INGEST_STREAM_BATCH_SIZE = 200
+
+# --- Story Clustering ---
+# Articles whose title/description SimHash signatures differ in at most this many bits are one story
+CLUSTER_SIMHASH_MAX_DISTANCE = 3
+# The 64-bit signature is split into this many LSH bands; must exceed the max distance to guarantee recall
+CLUSTER_SIMHASH_BANDS = 4
+# Only stories published within this many hours are considered as candidates
+CLUSTER_WINDOW_HOURS = 72
+
+# --- Trending ---
+# Title terms and two-word phrases are counted per time bucket (by publish time) in count-min
+# sketches at ingest; a term trends when its count in the recent window outpaces the baseline
+TRENDING_ENABLED = os.getenv("TRENDING_ENABLED", "true").lower() == "true"
+TRENDING_BUCKET_HOURS = 3
+TRENDING_WINDOW_HOURS = 12 # Recent window (a multiple of the bucket size), compared against...
+TRENDING_BASELINE_HOURS = 72 # ...the rate over this long a period before it
+# Sketch size per bucket (width x depth 32-bit counters); overestimates stay below ~2/width of a bucket's terms
+TRENDING_SKETCH_WIDTH = 2048
+TRENDING_SKETCH_DEPTH = 4
+# Most frequent terms remembered per bucket: the candidates scored for trending
+TRENDING_TOP_K = 100
+# Articles a term must appear in within the window before it can trend
+TRENDING_MIN_COUNT = 3
+# ...and its acceleration score (standard deviations above the baseline rate) reach this
+TRENDING_MIN_SCORE = 3.0
+# Trending terms kept and shown on the index page
+TRENDING_TERMS_SHOWN = 10
+
+# --- Personalized Feeds ---
+# Articles of a category/source with at most this many subscribers are copied into each
+# subscriber's feed at ingest; subscribers of more popular ones merge them in when reading
+FEED_FANOUT_MAX_SUBSCRIBERS = 1000
+# Newest articles copied into a feed when a subscription starts being materialized
+FEED_BACKFILL_ITEMS = 50
+# Materialized entries older than this are trimmed by the daily retention run
+FEED_ITEM_DAYS = 14
+FEED_PAGE_SIZE = 30
+# Feed entries are small; more of them go into each fan-out transaction than articles do
+FEED_FANOUT_CHUNK_SIZE = 5000
+
+# --- Date Parsing ---
+# Distinct timestamp strings memoized by the date parsers (they repeat heavily within a batch)
+DATE_PARSE_CACHE_SIZE = 8192
+
+# --- Retention ---
+# Articles published more than RETENTION_HOT_DAYS ago are moved out of the articles table into
+# compressed, date-partitioned archive files (still viewable by id)
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "true").lower() == "true"
+RETENTION_HOT_DAYS = int(os.getenv("RETENTION_HOT_DAYS", "30"))
+# Articles moved per transaction; keeps each write lock short
+RETENTION_BATCH_SIZE = 500
+# Daily run (IST), guarded by a DB lease like the ingest schedule
+RETENTION_SCHEDULE_TIME_IST = "03:30"
+RETENTION_LEASE_SECONDS = 60 * 60
+# Free pages returned to the filesystem per incremental_vacuum step (each step is its own short transaction)
+RETENTION_VACUUM_PAGES_PER_STEP = 500
+ARCHIVE_FOLDER_PATH = os.path.join(INSTANCE_FOLDER_PATH, 'archive')
+# Articles per gzip member; fetching one archived article decompresses only its block
+ARCHIVE_BLOCK_SIZE = 64
+ARCHIVE_COMPRESSION_LEVEL = 6
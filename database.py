@@ -1,13 +1,21 @@
 # Database setup for the News Aggregator Application
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-import sys
 
-# Ensure src directory is in path for imports
-sys.path.insert(0, os.path.dirname(__file__))
-
-from config import SQLALCHEMY_DATABASE_URI, INSTANCE_FOLDER_PATH
+from config import (
+    SQLALCHEMY_DATABASE_URI,
+    INSTANCE_FOLDER_PATH,
+    DB_CONCURRENT_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE_KIB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    DB_READ_POOL_SIZE,
+    DB_READ_POOL_MAX_OVERFLOW,
+    DB_WRITE_POOL_SIZE,
+    DB_WRITE_POOL_MAX_OVERFLOW
+)
 
 # Ensure the instance folder exists
 if not os.path.exists(INSTANCE_FOLDER_PATH):
@@ -16,15 +24,66 @@ if not os.path.exists(INSTANCE_FOLDER_PATH):
 # Define the base for declarative models
 Base = declarative_base()
 
-# Create the SQLAlchemy engine
-engine = create_engine(SQLALCHEMY_DATABASE_URI)
+def _sqlite_pragmas(read_only):
+    """Returns a connect hook applying the tuned pragmas to every new SQLite connection."""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Only takes effect on a new, empty database, and must come before WAL is enabled
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cursor.execute("PRAGMA journal_mode=WAL") # Persistent; readers never block on the writer
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KIB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+def create_engines(database_uri, concurrent=DB_CONCURRENT_MODE):
+    """Returns (write_engine, read_engine) for a database URI.
+
+    In concurrent mode on SQLite the writer is a pool of connections in WAL mode whose
+    writes wait for each other on SQLite's lock (busy_timeout) rather than on the pool, so
+    a long ingest transaction never keeps fetch threads from recording quota usage or
+    leases. The reader is a pool of read-only connections that keep reading the last
+    committed snapshot while a write is in progress. Other databases (or concurrent mode
+    off) share one engine for both roles.
+    """
+    if not concurrent or not database_uri.startswith("sqlite:///"):
+        write_engine = create_engine(database_uri)
+        return write_engine, write_engine
+
+    timeout = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    write_engine = create_engine(
+        database_uri,
+        connect_args=dict(timeout, check_same_thread=False),
+        pool_size=DB_WRITE_POOL_SIZE,
+        max_overflow=DB_WRITE_POOL_MAX_OVERFLOW
+    )
+    event.listen(write_engine, "connect", _sqlite_pragmas(read_only=False))
 
-# Create a configured "Session" class
+    path = database_uri[len("sqlite:///"):]
+    read_engine = create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        connect_args=dict(timeout, check_same_thread=False),
+        pool_size=DB_READ_POOL_SIZE,
+        max_overflow=DB_READ_POOL_MAX_OVERFLOW
+    )
+    event.listen(read_engine, "connect", _sqlite_pragmas(read_only=True))
+    return write_engine, read_engine
+
+# Writer (ingest, jobs, leases, migrations) and reader (request handlers) engines
+engine, read_engine = create_engines(SQLALCHEMY_DATABASE_URI)
+
+# Create configured "Session" classes: SessionLocal writes, ReadSessionLocal only reads
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 def get_db():
-    """Dependency function to get a database session."""
-    db = SessionLocal()
+    """Dependency function to get a read-only database session for request handlers."""
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
@@ -48,4 +107,3 @@ def init_db():
 #     from models.news_article import NewsArticle
 #     Base.metadata.create_all(bind=engine)
 #     print("Database initialized.")
-
@@ -0,0 +1,42 @@
+# Gunicorn settings for the News Aggregator Application (web: gunicorn -c src/gunicorn.conf.py "src.main:app")
+#
+# The app is imported and the schema checked once, in the master; workers are forked from it and
+# only do their per-process setup (fresh DB connections, scheduler) in post_fork. Module objects
+# created during the import are frozen out of the garbage collector so its passes don't touch
+# (and copy) the pages workers share with the master.
+
+import gc
+import os
+import sys
+
+# The app's modules import each other from the src directory ("from config import ...")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+
+# Import the app once in the master instead of once per worker
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+if preload_app:
+    # Tells create_app to leave init_worker to post_fork (threads and connections don't survive a fork)
+    os.environ["WORKER_INIT_DEFERRED"] = "true"
+    gc.disable() # No collections while the app is imported; everything it creates is frozen below
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before the first worker is forked."""
+    if preload_app:
+        gc.freeze() # Move everything allocated so far to the permanent generation
+        gc.enable()
+
+def post_fork(server, worker):
+    """Per-process setup of each worker, right after it is forked."""
+    gc.enable() # Whatever state the master was in, workers always collect
+    if preload_app:
+        # Without preloading, create_app runs init_worker itself when the worker imports the app
+        app = worker.app.wsgi()
+        sys.modules[app.import_name].init_worker()
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} ready.")
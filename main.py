@@ -8,64 +8,131 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 # -------------------------- #
 
-from flask import Flask, flash # Import flash
-from flask_sqlalchemy import SQLAlchemy
+from flask import Flask
 
 # Import configurations and database setup
-from config import SQLALCHEMY_DATABASE_URI, SQLALCHEMY_TRACK_MODIFICATIONS, INSTANCE_FOLDER_PATH
-from database import Base, engine # Import Base and engine
+import config
+from config import INSTANCE_FOLDER_PATH, SCHEDULER_ENABLED, SCHEMA_UPGRADE_ON_STARTUP, WORKER_INIT_DEFERRED
 
 # Import blueprints
 from routes.main_routes import main_bp
-
-# Initialize SQLAlchemy extension object (but don\t bind it to app yet)
-db = SQLAlchemy()
+from routes.api import api_bp
+from routes.user import user_bp
+from routes.metrics import metrics_bp, instrument_app
+
+def init_worker():
+    """Starts what belongs to one serving process rather than to the app.
+
+    Connections inherited from a preloading master are dropped (SQLite handles must not be
+    shared across a fork) and the ingest scheduler is started. gunicorn.conf.py calls this
+    in every worker after the fork; otherwise create_app does.
+    """
+    from database import engine, read_engine
+    for bound_engine in {engine, read_engine}:
+        bound_engine.dispose(close=False) # Leave the parent's connections to the parent
+
+    # Scheduled ingest at SCHEDULE_TIMES_IST (a DB lease keeps it to one worker per slot)
+    if SCHEDULER_ENABLED:
+        from scheduler import start_scheduler
+        start_scheduler()
 
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__, instance_path=INSTANCE_FOLDER_PATH, instance_relative_config=False)
 
-    # Load configuration from config.py
-    app.config.from_pyfile("config.py")
-
-    # Override DB URI from config.py (ensure it uses the correct path)
-    app.config["SQLALCHEMY_DATABASE_URI"] = SQLALCHEMY_DATABASE_URI
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = SQLALCHEMY_TRACK_MODIFICATIONS
+    # Load configuration from the already imported config module (from_pyfile would execute it again)
+    app.config.from_object(config)
 
     # Add a secret key for session management (required for flash messages)
     # In a real app, use a strong, randomly generated key stored securely.
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
 
-    # Initialize extensions
-    db.init_app(app)
-
-    # Create database tables if they don\t exist
-    with app.app_context():
-        # Import models here so Base knows about them before create_all
-        from models.news_article import NewsArticle
-        Base.metadata.create_all(bind=engine)
-        print("Database tables checked/created.")
+    # Create database tables if they don\t exist. With a preloaded app (gunicorn.conf.py) this runs
+    # once in the master; deployments that run "flask upgrade-db" as a release step can turn it off.
+    if SCHEMA_UPGRADE_ON_STARTUP:
+        with app.app_context():
+            # Create missing tables and upgrade existing ones (new columns, backfills, indexes)
+            from migrations import upgrade_schema
+            upgrade_schema()
+            print("Database tables checked/created.")
 
     # Register blueprints
     app.register_blueprint(main_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(user_bp)
+    app.register_blueprint(metrics_bp)
+    instrument_app(app) # Request latency and SQL query counts for /metrics
+
+    # Ingest renders the index page and feeds into static snapshots with this app (SNAPSHOTS_ENABLED)
+    from services import snapshots
+    snapshots.init_app(app)
+
+    # Per-process setup; a preloading gunicorn master leaves it to each worker after the fork
+    if not WORKER_INIT_DEFERRED:
+        init_worker()
+
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """CLI command to create missing tables and upgrade existing ones (run once per deploy)."""
+        from migrations import upgrade_schema
+        upgrade_schema()
+        print("Database tables checked/created.")
 
     # Optional: Add a command to manually fetch news
     @app.cli.command("fetch-news")
     def fetch_news_command():
         """CLI command to fetch and store news."""
         print("Starting manual news fetch via CLI...")
-        from services.api_clients import fetch_all_news
-        from services.processing import process_and_store_articles
+        from services.ingest import run_ingest
         try:
-            raw_articles = fetch_all_news()
-            if raw_articles:
-                process_and_store_articles(raw_articles)
-                print("News fetch and processing complete.")
+            counts = run_ingest()
+            if counts["fetched"]:
+                print(f"News fetch and processing complete: {counts}")
             else:
                 print("No new articles fetched.")
         except Exception as e:
             print(f"Error during CLI news fetch: {e}")
 
+    @app.cli.command("publish-snapshots")
+    def publish_snapshots_command():
+        """CLI command to render the index page and category feeds into a new static snapshot now."""
+        version = snapshots.publish_snapshots(force=True)
+        if version:
+            print(f"Published snapshot {version} to {snapshots.SNAPSHOT_DIR}.")
+        else:
+            print("Snapshot not published; see the log for details.")
+
+    @app.cli.command("rebuild-trends")
+    def rebuild_trends_command():
+        """CLI command to recount the trending sketches from recent articles (after upgrading or retuning)."""
+        from services.trending import rebuild_trends
+        counted = rebuild_trends()
+        print(f"Trend buckets rebuilt from {counted} articles.")
+
+    @app.cli.command("rebalance-feeds")
+    def rebalance_feeds_command():
+        """CLI command to re-decide which subscriptions are fanned out (after changing FEED_FANOUT_MAX_SUBSCRIBERS)."""
+        from services.feeds import rebalance_subscriptions
+        changed = rebalance_subscriptions()
+        print(f"{changed} subscriptions switched between fan-out and merge-on-read.")
+
+    @app.cli.command("archive-articles")
+    def archive_articles_command():
+        """CLI command to archive articles older than RETENTION_HOT_DAYS and reclaim their space."""
+        from services.retention import run_retention
+        result = run_retention()
+        print(f"Archived {result['archived']} articles, trimmed {result['feed_items_trimmed']} feed entries, "
+              f"freed {result['freed_pages']} database pages.")
+
+    @app.cli.command("enable-incremental-vacuum")
+    def enable_incremental_vacuum_command():
+        """CLI command to convert an existing database to incremental vacuum (runs a full VACUUM once)."""
+        from services.retention import enable_incremental_vacuum
+        if enable_incremental_vacuum():
+            print("Database converted to incremental vacuum.")
+        else:
+            print("Nothing to do: the database already uses incremental vacuum (or isn't SQLite).")
+
     return app
 
 # Create the app instance using the factory
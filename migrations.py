@@ -0,0 +1,205 @@
+# Lightweight schema upgrades for databases created by older versions of the app
+import logging
+from sqlalchemy import inspect, text, update, bindparam
+
+from database import Base, engine, SessionLocal
+from config import CONTENT_MIGRATION_BATCH_SIZE
+# Import all models so Base knows about them before create_all
+from models.news_article import NewsArticle, ArticleContent, SimhashBand
+from models.job_lease import JobLease
+from models.ingest_job import IngestJob
+from models.archived_article import ArchivedArticle
+from models.provider_quota import ProviderQuotaUsage
+from models.fetch_watermark import FetchWatermark
+from models.trending import TrendBucket, TrendingTerm
+from models.user import User, Subscription, FeedItem
+from services.dedup import backfill_url_hashes
+from services.search import SEARCH_DOCS_VIEW, ensure_search_index, index_new_articles
+from services.storage import insert_ignore_statement
+from services.summaries import summarize
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Columns older versions kept in the articles table; they now live in article_contents
+LEGACY_CONTENT_COLUMNS = ("description", "content", "image_url")
+# Indexes older versions created that a model index now replaces
+OBSOLETE_INDEXES = (
+    "ix_articles_category_fetched_published", # Sorted by fetched_at: the headline query sorted its whole window
+    "ix_articles_category_published_id" # A prefix of ix_articles_category_published_id_fetched
+)
+
+def add_missing_columns(bind):
+    """Adds model columns that are missing from existing tables.
+
+    New columns must be nullable; uniqueness is enforced by indexes created afterwards.
+    """
+    with bind.begin() as conn:
+        # Inspect on the same connection, inside the transaction that alters the tables
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logging.info(f"Added column {table.name}.{column.name} ({column_type})")
+
+def create_missing_indexes(bind):
+    """Creates indexes declared on the models that don't exist yet."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+def drop_obsolete_indexes(bind):
+    """Drops indexes that are no longer declared on the models (OBSOLETE_INDEXES)."""
+    with bind.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def split_article_content(bind, batch_size=CONTENT_MIGRATION_BATCH_SIZE):
+    """Moves article text that older versions stored in the articles table to article_contents.
+
+    Each batch copies description, content and image_url into the content table and writes
+    the summary, in its own transaction; the old columns are dropped once every row is
+    copied, so an interrupted run simply copies again. Rows without a url_hash (duplicates
+    of a hashed row, see backfill_url_hashes) keep only their summary. Returns the rows moved.
+    """
+    with bind.connect() as conn:
+        existing_columns = {column["name"] for column in inspect(conn).get_columns(NewsArticle.__tablename__)}
+    legacy_columns = [column for column in LEGACY_CONTENT_COLUMNS if column in existing_columns]
+    if not legacy_columns:
+        return 0
+
+    # Rows without any text have nothing to move (and no summary)
+    has_text = " OR ".join(f"{column} IS NOT NULL" for column in legacy_columns)
+    select_batch = text(
+        f"SELECT id, url_hash, {', '.join(legacy_columns)} FROM articles "
+        f"WHERE id > :last_id AND ({has_text}) ORDER BY id LIMIT :limit"
+    )
+    insert_content = insert_ignore_statement(bind.dialect.name, ArticleContent.__table__)
+    update_summary = update(NewsArticle.__table__)\
+        .where(NewsArticle.id == bindparam("article_id"))\
+        .values(summary=bindparam("new_summary"))
+    moved = 0
+    last_id = 0
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(select_batch, {"last_id": last_id, "limit": batch_size}).mappings().all()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            content_rows = [
+                {column: row.get(column) for column in ("url_hash", *LEGACY_CONTENT_COLUMNS)}
+                for row in rows if row["url_hash"]
+            ]
+            if content_rows:
+                conn.execute(insert_content, content_rows)
+            conn.execute(update_summary, [
+                {"article_id": row["id"], "new_summary": summarize(row.get("description") or row.get("content"))}
+                for row in rows
+            ])
+        moved += len(rows)
+
+    for column in legacy_columns:
+        try:
+            with bind.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE articles DROP COLUMN {column}")
+        except Exception as e:
+            # SQLite before 3.35 can't drop columns; emptying them still narrows the rows
+            # (and leaves nothing to move on the next start)
+            if moved:
+                logging.warning(f"Could not drop articles.{column} ({e}); clearing it instead.")
+                with bind.begin() as conn:
+                    conn.exec_driver_sql(f"UPDATE articles SET {column} = NULL")
+    logging.info(f"Moved the text of {moved} articles to article_contents and dropped {', '.join(legacy_columns)} from articles.")
+    return moved
+
+def use_autoincrement_ids(bind):
+    """Rebuilds an articles table created without AUTOINCREMENT so ids are never reused (SQLite).
+
+    Without it SQLite hands out the id of the newest row again once that row is deleted,
+    which retention does when it archives: the new article then shares its id with an
+    archived one and sits below the search index watermark. The table is copied into a new
+    one in a single transaction; the id sequence starts above every id already handed out
+    (live, archived or indexed). Returns True if the table was rebuilt.
+    """
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.connect() as conn:
+        table_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles'"
+        )).scalar()
+    if table_sql is None or "AUTOINCREMENT" in table_sql.upper():
+        return False
+
+    columns = [column.name for column in NewsArticle.__table__.columns]
+    with bind.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            existing_columns = {column["name"] for column in inspect(conn).get_columns("articles")}
+            copied = ", ".join(column for column in columns if column in existing_columns)
+            # The view would follow the rename; ensure_search_index recreates it over the new table
+            conn.execute(text(f"DROP VIEW IF EXISTS {SEARCH_DOCS_VIEW}"))
+            index_names = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'articles' AND sql IS NOT NULL"
+            )).scalars().all()
+            for name in index_names:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text("ALTER TABLE articles RENAME TO articles_legacy"))
+            NewsArticle.__table__.create(bind=conn) # With its indexes
+            conn.execute(text(f"INSERT INTO articles ({copied}) SELECT {copied} FROM articles_legacy"))
+            conn.execute(text("DROP TABLE articles_legacy"))
+
+            handed_out = [conn.execute(text("SELECT MAX(id) FROM articles")).scalar()]
+            if inspect(conn).has_table(ArchivedArticle.__tablename__):
+                handed_out.append(conn.execute(text("SELECT MAX(id) FROM archived_articles")).scalar())
+            if inspect(conn).has_table("search_index_state"):
+                handed_out.append(conn.execute(text("SELECT MAX(last_indexed_id) FROM search_index_state")).scalar())
+            last_id = max((value for value in handed_out if value is not None), default=0)
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'articles'"))
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('articles', :seq)"), {"seq": last_id})
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    logging.info(f"Rebuilt the articles table with AUTOINCREMENT ids; new articles start after id {last_id}.")
+    return True
+
+def run_data_migrations():
+    """Backfills data for newly added columns before their indexes are built."""
+    db = SessionLocal()
+    try:
+        backfill_url_hashes(db)
+    finally:
+        db.close()
+    # Needs the url_hash backfill: content rows are keyed by it
+    split_article_content(engine)
+    # After the split, so the text columns aren't copied into the rebuilt table
+    use_autoincrement_ids(engine)
+
+def use_incremental_vacuum_for_new_database(bind):
+    """New SQLite databases get auto_vacuum=INCREMENTAL so retention can reclaim space in steps.
+
+    The mode can only be set before the first table is created; existing databases are
+    converted explicitly (flask enable-incremental-vacuum).
+    """
+    if bind.dialect.name != "sqlite" or inspect(bind).get_table_names():
+        return
+    with bind.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+
+def upgrade_schema():
+    """Creates missing tables, then brings existing tables up to date with the models."""
+    use_incremental_vacuum_for_new_database(engine)
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    run_data_migrations()
+    drop_obsolete_indexes(engine)
+    create_missing_indexes(engine)
+    # Full-text index (SQLite only); the first run indexes all existing articles
+    ensure_search_index(engine)
+    index_new_articles(engine)
@@ -0,0 +1,18 @@
+# Database model for the offset index of archived articles
+from sqlalchemy import Column, Integer, String, DateTime
+
+from database import Base # Import Base from database.py
+
+class ArchivedArticle(Base):
+    """Where an article moved out of the hot table lives: one gzip block in a daily archive file."""
+    __tablename__ = "archived_articles"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) # Same id the article had in articles
+    url_hash = Column(String(32), nullable=True, unique=True, index=True) # Still checked by dedup
+    published_at = Column(DateTime, nullable=False)
+    archive_path = Column(String(255), nullable=False) # Relative to ARCHIVE_FOLDER_PATH
+    block_offset = Column(Integer, nullable=False) # Byte offset of the gzip member holding the article
+    block_length = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedArticle(id={self.id}, archive_path=\"{self.archive_path}\", block_offset={self.block_offset})>"
@@ -0,0 +1,16 @@
+# Database model for incremental fetch watermarks
+from sqlalchemy import Column, String, DateTime
+
+from database import Base # Import Base from database.py
+
+class FetchWatermark(Base):
+    """Newest publish time ingested for one provider and category; the next run only asks for newer items."""
+    __tablename__ = "fetch_watermarks"
+
+    provider = Column(String(100), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    published_at = Column(DateTime, nullable=False) # Naive UTC
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<FetchWatermark(provider=\"{self.provider}\", category=\"{self.category}\", published_at={self.published_at})>"
@@ -0,0 +1,44 @@
+# Database model for background ingest jobs
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+import json
+
+from database import Base # Import Base from database.py
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trigger = Column(String(20), nullable=False) # "manual" or "scheduled"
+    status = Column(String(20), nullable=False, index=True) # queued, running, succeeded, failed, coalesced
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow) # Heartbeat while running
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    progress = Column(Text, nullable=True) # JSON: stage and per-provider progress
+    added = Column(Integer, nullable=True)
+    duplicates = Column(Integer, nullable=True)
+    errors = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    coalesced_into = Column(Integer, nullable=True) # Job that did the work when this one was a duplicate trigger
+
+    def to_dict(self):
+        def iso(value):
+            return value.isoformat() + "Z" if value else None
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "progress": json.loads(self.progress) if self.progress else None,
+            "added": self.added,
+            "duplicates": self.duplicates,
+            "errors": self.errors,
+            "error": self.error,
+            "coalesced_into": self.coalesced_into
+        }
+
+    def __repr__(self):
+        return f"<IngestJob(id={self.id}, trigger=\"{self.trigger}\", status=\"{self.status}\")>"
@@ -0,0 +1,17 @@
+# Database model for cross-worker job leases
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from database import Base # Import Base from database.py
+
+class JobLease(Base):
+    """A named, expiring lock row; whoever holds an unexpired lease may run the job."""
+    __tablename__ = "job_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    acquired_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<JobLease(name=\"{self.name}\", holder=\"{self.holder}\", expires_at={self.expires_at})>"
@@ -1,34 +1,75 @@
 # Database models for the News Aggregator Application
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Text, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, sessionmaker
 from datetime import datetime
-import sys
-import os
-
-# Ensure src directory is in path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from database import Base # Import Base from database.py
 
 class NewsArticle(Base):
+    """The hot article row: only what listings sort, filter and render, so scans stay narrow.
+
+    The full description, body text and image live in ArticleContent, read by the detail views.
+    """
     __tablename__ = "articles"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(Text, nullable=False)
-    description = Column(Text, nullable=True)
-    content = Column(Text, nullable=True)
+    summary = Column(String(255), nullable=True) # Plain-text start of the description (ARTICLE_SUMMARY_CHARS), set at ingest
     url = Column(Text, nullable=False, unique=True) # Unique constraint on URL
-    image_url = Column(Text, nullable=True)
+    url_hash = Column(String(32), nullable=True, unique=True, index=True) # Hash of the canonical URL, used for dedup
     published_at = Column(DateTime, nullable=False)
     source_name = Column(String(255), nullable=True)
     source_url = Column(Text, nullable=True)
     category = Column(String(100), nullable=True)
     api_source = Column(String(100), nullable=True)
     fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    simhash = Column(BigInteger, nullable=True) # Signed 64-bit SimHash of title + description
+    story_key = Column(String(32), nullable=True, index=True) # url_hash of the story cluster's first article
 
     # Optional: Add a unique constraint across multiple columns if needed
     # __table_args__ = (UniqueConstraint("url", name="uq_article_url"),)
+    __table_args__ = (
+        # Keyset pagination on (published_at, id) for the JSON API, overall and per category.
+        # The per-category one also serves the index page's headline query in its own order, so
+        # its LIMIT ends the scan; fetched_at and story_key are carried along so that query
+        # filters and ranks without touching the table rows
+        Index("ix_articles_published_id", "published_at", "id"),
+        Index("ix_articles_category_published_id_fetched", "category", "published_at", "id", "fetched_at", "story_key"),
+        # Newest articles of a source, merged into the feeds of its subscribers when read
+        Index("ix_articles_source_published_id", "source_name", "published_at", "id"),
+        # Never hand out an id again once its row is gone: archived articles keep theirs, and the
+        # search index watermark and feed entries refer to articles by id
+        {"sqlite_autoincrement": True}
+    )
 
     def __repr__(self):
         return f"<NewsArticle(id={self.id}, title=\"{self.title[:50]}...\", url=\"{self.url}\")>"
 
+
+class ArticleContent(Base):
+    """The wide part of an article, split off the hot table; keyed like the article's url_hash."""
+    __tablename__ = "article_contents"
+
+    url_hash = Column(String(32), primary_key=True)
+    description = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+    image_url = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<ArticleContent(url_hash=\"{self.url_hash}\")>"
+
+
+class SimhashBand(Base):
+    """LSH bucket entry: one row per (band, article) so near-duplicate candidates are an index lookup."""
+    __tablename__ = "article_simhash_bands"
+
+    band_key = Column(Integer, primary_key=True) # (band index << band bits) | band value
+    url_hash = Column(String(32), primary_key=True)
+    published_at = Column(DateTime, nullable=False)
+    simhash = Column(BigInteger, nullable=False)
+    story_key = Column(String(32), nullable=False)
+
+    __table_args__ = (Index("ix_simhash_bands_band_published", "band_key", "published_at"),)
+
+    def __repr__(self):
+        return f"<SimhashBand(band_key={self.band_key}, story_key=\"{self.story_key}\")>"
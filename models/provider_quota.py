@@ -0,0 +1,15 @@
+# Database model for persisted provider quota usage
+from sqlalchemy import Column, Integer, String
+
+from database import Base # Import Base from database.py
+
+class ProviderQuotaUsage(Base):
+    """Requests made to a provider on one UTC day, shared by all workers and restarts."""
+    __tablename__ = "provider_quota_usage"
+
+    provider = Column(String(100), primary_key=True)
+    day = Column(String(10), primary_key=True) # YYYY-MM-DD (UTC)
+    used = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProviderQuotaUsage(provider=\"{self.provider}\", day=\"{self.day}\", used={self.used})>"
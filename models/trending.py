@@ -0,0 +1,32 @@
+# Database models for the trending-topics engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, Text
+
+from database import Base # Import Base from database.py
+
+class TrendBucket(Base):
+    """Title term counts of the articles published in one time bucket, as a count-min sketch."""
+    __tablename__ = "trend_buckets"
+
+    bucket_start = Column(DateTime, primary_key=True) # Naive UTC, a multiple of TRENDING_BUCKET_HOURS
+    sketch = Column(LargeBinary, nullable=False) # zlib-compressed counters, depth rows of width
+    top_terms = Column(Text, nullable=False) # JSON {term: estimated count} of the bucket's most frequent terms
+    articles = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TrendBucket(bucket_start={self.bucket_start}, articles={self.articles})>"
+
+
+class TrendingTerm(Base):
+    """One entry of the current trending list, recomputed whenever the buckets change."""
+    __tablename__ = "trending_terms"
+
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    term = Column(String(255), nullable=False)
+    score = Column(Float, nullable=False)
+    window_count = Column(Integer, nullable=False) # Articles mentioning it in the recent window
+    baseline_count = Column(Integer, nullable=False) # ...and in the baseline period before it
+    computed_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TrendingTerm(rank={self.rank}, term=\"{self.term}\", score={self.score:.2f})>"
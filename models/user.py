@@ -1,18 +1,71 @@
-from flask_sqlalchemy import SQLAlchemy
+# Database models for users, their subscriptions and their materialized feeds
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
+from datetime import datetime
 
-db = SQLAlchemy()
+from database import Base # Import Base from database.py
 
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    username = Column(String(80), unique=True, nullable=False)
+    email = Column(String(120), unique=True, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Set while any subscription isn't materialized: reading the feed then merges those in
+    merge_on_read = Column(Boolean, nullable=False, default=False)
 
     def __repr__(self):
-        return f'<User {self.username}>'
+        return f"<User {self.username}>"
 
     def to_dict(self):
         return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email
+            "id": self.id,
+            "username": self.username,
+            "email": self.email
         }
+
+
+class Subscription(Base):
+    """A user following a category or a source (source_name)."""
+    __tablename__ = "subscriptions"
+
+    user_id = Column(Integer, primary_key=True)
+    kind = Column(String(20), primary_key=True) # "category" or "source"
+    value = Column(String(255), primary_key=True)
+    # True while the category/source has few enough subscribers to be fanned out at ingest
+    materialized = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Fan-out: the materialized subscribers of a category/source, read straight off the index
+        Index("ix_subscriptions_target", "kind", "value", "materialized", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<Subscription(user_id={self.user_id}, kind=\"{self.kind}\", value=\"{self.value}\")>"
+
+
+class FeedItem(Base):
+    """One article in a user's materialized feed, with what the feed page shows of it.
+
+    The primary key keeps each user's entries together in date order (a WITHOUT ROWID table on
+    SQLite), so a page of the feed is one range read.
+    """
+    __tablename__ = "feed_items"
+
+    user_id = Column(Integer, primary_key=True)
+    published_at = Column(DateTime, primary_key=True)
+    article_id = Column(Integer, primary_key=True)
+    title = Column(Text, nullable=False)
+    summary = Column(String(255), nullable=True)
+    url = Column(Text, nullable=False)
+    source_name = Column(String(255), nullable=True)
+    category = Column(String(100), nullable=True)
+
+    __table_args__ = (
+        Index("ix_feed_items_published", "published_at"), # Trimming old entries
+        {"sqlite_with_rowid": False}
+    )
+
+    def __repr__(self):
+        return f"<FeedItem(user_id={self.user_id}, article_id={self.article_id})>"
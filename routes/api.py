@@ -0,0 +1,193 @@
+# Versioned JSON API for the News Aggregator Application
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select, tuple_
+import gzip
+
+from database import get_db
+from models.news_article import NewsArticle, ArticleContent
+from services.jobs import enqueue_ingest, get_job
+from services.snapshots import category_feed, snapshot_response
+from services.trending import get_trending_terms
+from routes.common import json_error, serialize, encode_cursor, decode_cursor
+from config import API_DEFAULT_PAGE_SIZE, API_MAX_PAGE_SIZE, API_GZIP_MIN_BYTES, API_GZIP_LEVEL, CATEGORIES, SNAPSHOTS_ENABLED
+
+api_bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+# Fields clients may request with ?fields=; the content column is only sent when asked for
+ARTICLE_FIELDS = {
+    "id": NewsArticle.id,
+    "title": NewsArticle.title,
+    "summary": NewsArticle.summary,
+    "description": ArticleContent.description,
+    "content": ArticleContent.content,
+    "url": NewsArticle.url,
+    "image_url": ArticleContent.image_url,
+    "published_at": NewsArticle.published_at,
+    "source_name": NewsArticle.source_name,
+    "source_url": NewsArticle.source_url,
+    "category": NewsArticle.category,
+    "api_source": NewsArticle.api_source,
+    "fetched_at": NewsArticle.fetched_at,
+    "story_key": NewsArticle.story_key
+}
+DEFAULT_FIELDS = ["id", "title", "description", "url", "image_url", "published_at", "source_name", "category", "api_source"]
+
+# Fields read from the content table; the hot table is joined to it only when one is requested
+CONTENT_FIELDS = {"description", "content", "image_url"}
+
+# Query parameters mapped to equality filters
+FILTERS = {
+    "category": NewsArticle.category,
+    "source": NewsArticle.source_name,
+    "api_source": NewsArticle.api_source
+}
+
+# --- Helpers ---
+
+def _select_fields(columns, fields):
+    """Returns a SELECT of the columns over articles, joined to their content only if needed."""
+    query = select(*columns).select_from(NewsArticle)
+    if CONTENT_FIELDS.intersection(fields):
+        query = query.outerjoin(ArticleContent, ArticleContent.url_hash == NewsArticle.url_hash)
+    return query
+
+def _requested_fields():
+    """Returns the list of requested fields, or None if any of them is unknown."""
+    raw = request.args.get("fields")
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    if not fields or any(f not in ARTICLE_FIELDS for f in fields):
+        return None
+    return fields
+
+# --- Routes ---
+
+@api_bp.route("/articles")
+def list_articles():
+    """Lists articles newest first, with keyset pagination on (published_at, id)."""
+    fields = _requested_fields()
+    if fields is None:
+        return json_error(400, f"Unknown field requested. Allowed fields: {', '.join(ARTICLE_FIELDS)}")
+    try:
+        limit = min(max(int(request.args.get("limit", API_DEFAULT_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return json_error(400, "limit must be an integer")
+
+    # published_at and id are always selected: the cursor is built from them
+    columns = [ARTICLE_FIELDS[f] for f in fields if f not in ("published_at", "id")]
+    query = _select_fields([NewsArticle.published_at, NewsArticle.id, *columns], fields)
+    for param, column in FILTERS.items():
+        value = request.args.get(param)
+        if value:
+            query = query.where(column == value)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return json_error(400, "Invalid cursor")
+        # Row-value comparison seeks straight to the cursor position on the (published_at, id) index
+        query = query.where(tuple_(NewsArticle.published_at, NewsArticle.id) < tuple_(*position))
+
+    query = query.order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(limit + 1)
+
+    db = next(get_db())
+    try:
+        rows = db.execute(query).mappings().all()
+    finally:
+        db.close()
+
+    data = [{f: serialize(row[f]) for f in fields} for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["published_at"], last["id"])
+    return jsonify({"data": data, "next_cursor": next_cursor})
+
+@api_bp.route("/articles/<int:article_id>")
+def get_article(article_id):
+    """Returns a single article with the requested fields (all fields by default)."""
+    fields = _requested_fields() if request.args.get("fields") else list(ARTICLE_FIELDS)
+    if fields is None:
+        return json_error(400, f"Unknown field requested. Allowed fields: {', '.join(ARTICLE_FIELDS)}")
+
+    db = next(get_db())
+    try:
+        row = db.execute(
+            _select_fields([ARTICLE_FIELDS[f] for f in fields], fields).where(NewsArticle.id == article_id)
+        ).mappings().first()
+        if row is None:
+            # Moved out of the hot table by retention; imported lazily so read-only workers don't
+            # pay for the retention module until an archived article is asked for
+            from services.retention import get_archived_article
+            row = get_archived_article(db, article_id)
+    finally:
+        db.close()
+
+    if row is None:
+        return json_error(404, "Article not found")
+    # get() as archives written before a field existed don't have it
+    return jsonify({"data": {f: serialize(row.get(f)) for f in fields}})
+
+@api_bp.route("/feeds/<category>")
+def get_category_feed(category):
+    """Returns a category's current headlines, from the published snapshot when there is one."""
+    if category not in CATEGORIES:
+        return json_error(404, f"Unknown category. Available categories: {', '.join(CATEGORIES)}")
+    if SNAPSHOTS_ENABLED:
+        response = snapshot_response(f"feeds/{category}.json", "application/json")
+        if response is not None:
+            return response
+
+    db = next(get_db())
+    try:
+        return jsonify(category_feed(db, category))
+    finally:
+        db.close()
+
+@api_bp.route("/trending")
+def get_trending():
+    """Returns the terms trending in recent headlines, best first."""
+    db = next(get_db())
+    try:
+        terms = get_trending_terms(db)
+    finally:
+        db.close()
+    return jsonify({"data": [{"term": t.term, "window_count": t.window_count} for t in terms]})
+
+@api_bp.route("/ingest-jobs", methods=["POST"])
+def create_ingest_job():
+    """Queues an ingest (or returns the one already in progress) and points at its status."""
+    job_id, created = enqueue_ingest(trigger="manual")
+    response = jsonify({"data": get_job(job_id), "created": created})
+    response.status_code = 202
+    response.headers["Location"] = f"{api_bp.url_prefix}/ingest-jobs/{job_id}"
+    return response
+
+@api_bp.route("/ingest-jobs/<int:job_id>")
+def get_ingest_job(job_id):
+    """Reports an ingest job's status, per-provider progress, counts and errors."""
+    job = get_job(job_id)
+    if job is None:
+        return json_error(404, "Job not found")
+    response = jsonify({"data": job})
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+@api_bp.after_request
+def compress_response(response):
+    """Gzips JSON responses for clients that accept it once they are worth compressing."""
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower()):
+        return response
+    body = response.get_data()
+    if len(body) < API_GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=API_GZIP_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
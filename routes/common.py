@@ -0,0 +1,28 @@
+# Helpers shared by the blueprints: JSON error responses, value serialization and keyset cursors
+
+from flask import jsonify
+from datetime import datetime
+import base64
+import json
+
+def json_error(status, message):
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+def serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat() + "Z" # Stored as naive UTC
+    return value
+
+def encode_cursor(published_at, article_id):
+    payload = json.dumps([published_at.isoformat(), article_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    """Returns (published_at, id) from a cursor string, or None if it is malformed."""
+    try:
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(published_at), int(article_id)
+    except Exception:
+        return None
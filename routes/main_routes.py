@@ -1,20 +1,20 @@
 # Flask routes for the News Aggregator Application
 
-from flask import Blueprint, render_template, abort, redirect, url_for, flash
-from sqlalchemy import desc
+from flask import Blueprint, render_template, abort, redirect, url_for, flash, request, jsonify
 from datetime import datetime, timedelta
-import sys
-import os
 import logging
 
-# Ensure src directory is in path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
 from database import get_db
-from models.news_article import NewsArticle
-from config import CATEGORIES
-from services.api_clients import fetch_all_news
-from services.processing import process_and_store_articles
+from config import CATEGORIES, HEADLINES_WINDOW_HOURS
+from services.queries import get_headlines, get_article
+from services.trending import get_trending_terms
+from services.page_cache import cached_page
+from services.snapshots import snapshot_page
+from services.search import search_available, search_articles
+from services.jobs import enqueue_ingest
+from services.feeds import get_user_feed
+from models.user import User
+from routes.common import encode_cursor, decode_cursor
 
 # Create a Blueprint
 main_bp = Blueprint("main", __name__)
@@ -22,42 +22,28 @@ main_bp = Blueprint("main", __name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 @main_bp.route("/")
+@snapshot_page("index.html") # Published after each ingest when SNAPSHOTS_ENABLED
+@cached_page
 def index():
     """Displays the main page with headlines grouped by category."""
     db = next(get_db()) # Get a database session
     try:
-        # Fetch recent articles (e.g., fetched in the last 24 hours)
-        # Adjust timedelta as needed
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        recent_articles = db.query(NewsArticle)\
-                            .filter(NewsArticle.fetched_at >= twenty_four_hours_ago)\
-                            .order_by(desc(NewsArticle.published_at))\
-                            .all()
-
-        # Group articles by category
-        articles_by_category = {category: [] for category in CATEGORIES}
-        for article in recent_articles:
-            # Use the category stored in the DB, which should align with CATEGORIES
-            if article.category in articles_by_category:
-                articles_by_category[article.category].append(article)
-            # Optional: Add articles with unknown/other categories to a default list
-            # elif "other" in articles_by_category:
-            #     articles_by_category["other"].append(article)
-
-        # Remove categories with no articles to avoid empty sections
-        articles_by_category = {k: v for k, v in articles_by_category.items() if v}
-
+        # Newest stories per category among articles fetched in the last 24 hours
+        since = datetime.utcnow() - timedelta(hours=HEADLINES_WINDOW_HOURS)
+        articles_by_category = get_headlines(db, since)
+        trending = get_trending_terms(db)
     finally:
         db.close()
 
-    return render_template("index.html", articles_by_category=articles_by_category)
+    return render_template("index.html", articles_by_category=articles_by_category, trending=trending)
 
 @main_bp.route("/article/<int:article_id>")
+@cached_page
 def article_detail(article_id):
     """Displays the detailed view for a single article."""
     db = next(get_db())
     try:
-        article = db.query(NewsArticle).get(article_id)
+        article = get_article(db, article_id) # The only page that reads the content table
     finally:
         db.close()
 
@@ -66,24 +52,73 @@ def article_detail(article_id):
 
     return render_template("article.html", article=article)
 
+@main_bp.route("/feed/<int:user_id>")
+def personalized_feed(user_id):
+    """Displays a user's personalized front page: the newest articles of their subscriptions."""
+    cursor = request.args.get("cursor")
+    before = decode_cursor(cursor) if cursor else None # A malformed cursor shows the first page
+    db = next(get_db())
+    try:
+        user = db.get(User, user_id)
+        if user is None:
+            abort(404)
+        entries, next_position = get_user_feed(db, user, before=before)
+    finally:
+        db.close()
+
+    next_cursor = encode_cursor(*next_position) if next_position else None
+    return render_template("feed.html", user=user, entries=entries, next_cursor=next_cursor)
+
+def _parse_date_arg(name):
+    """Parses an optional YYYY-MM-DD query argument, ignoring malformed values."""
+    value = request.args.get(name, "").strip()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+@main_bp.route("/search")
+def search():
+    """Full-text search over all stored articles, with category/date filters and cursor paging."""
+    query = request.args.get("q", "").strip()
+    category = request.args.get("category") or None
+    since = _parse_date_arg("from")
+    until = _parse_date_arg("to")
+    if until:
+        until += timedelta(days=1) # Make the end date inclusive
+
+    results, next_cursor = [], None
+    if query and search_available():
+        db = next(get_db())
+        try:
+            results, next_cursor = search_articles(db, query, category=category, since=since, until=until,
+                                                   cursor=request.args.get("cursor"))
+        finally:
+            db.close()
+
+    return render_template("search.html", query=query, category=category, categories=CATEGORIES,
+                           date_from=request.args.get("from", ""), date_to=request.args.get("to", ""),
+                           results=results, next_cursor=next_cursor, search_enabled=search_available())
+
 @main_bp.route("/update", methods=["POST"]) # Use POST to prevent accidental triggers via GET
 def trigger_update():
-    """Manually triggers the news fetching and processing."""
+    """Queues a background ingest job and returns immediately; the worker stays free for reads."""
     logging.info("Manual update triggered.")
     try:
-        # Step 1: Fetch news from all APIs
-        raw_articles = fetch_all_news()
-
-        # Step 2: Process and store the fetched articles
-        if raw_articles:
-            process_and_store_articles(raw_articles)
-            flash(f"News update complete. Processed articles.", "success")
-        else:
-            flash("News update ran, but no new articles were fetched.", "info")
-
+        job_id, created = enqueue_ingest(trigger="manual")
     except Exception as e:
-        logging.error(f"Error during manual update: {e}")
-        flash(f"An error occurred during the update process: {e}", "error")
-
+        logging.error(f"Error queueing manual update: {e}")
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({"error": str(e)}), 500
+        flash(f"An error occurred while queueing the update: {e}", "error")
+        return redirect(url_for("main.index"))
+
+    status_url = url_for("api_v1.get_ingest_job", job_id=job_id)
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"job_id": job_id, "created": created, "status_url": status_url}), 202, {"Location": status_url}
+    if created:
+        flash(f"News update started in the background (job {job_id}). Refresh in a minute to see new articles.", "info")
+    else:
+        flash(f"A news update is already in progress (job {job_id}).", "info")
     return redirect(url_for("main.index")) # Redirect back to the homepage
 
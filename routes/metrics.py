@@ -0,0 +1,69 @@
+# Prometheus /metrics endpoint and per-request timing for the News Aggregator Application
+
+from flask import Blueprint, Response, request
+from sqlalchemy import event
+import threading
+import time
+
+from config import METRICS_ENABLED
+from database import engine, read_engine
+from services import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# Request start time and SQL statement count of the request running on this thread
+_request_state = threading.local()
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_request_state, "started", None) is not None:
+        _request_state.queries += 1
+
+def _before_request():
+    _request_state.started = time.perf_counter()
+    _request_state.queries = 0
+
+def _after_request(response):
+    started = getattr(_request_state, "started", None)
+    if started is None:
+        return response
+    _request_state.started = None
+    # The rule, not the path, so /article/<id> is one series rather than one per article
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.observe("news_http_request_duration_seconds", time.perf_counter() - started, route=route, method=request.method)
+    metrics.inc("news_http_requests_total", route=route, method=request.method, status=response.status_code)
+    metrics.observe("news_http_request_sql_queries", _request_state.queries, route=route)
+    return response
+
+def instrument_app(app):
+    """Times every request and counts the SQL statements it runs."""
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    for bound_engine in {engine, read_engine}:
+        event.listen(bound_engine, "before_cursor_execute", _count_query)
+
+def _quota_lines():
+    """Current provider quota usage (shared by all workers) and this worker's circuit states."""
+    from services.quota import quota_status # Pulls in the HTTP client; only needed when scraped
+    status = quota_status()
+    lines = ["# HELP news_provider_quota_used Requests counted against today's provider quota.",
+             "# TYPE news_provider_quota_used gauge"]
+    lines += [f'news_provider_quota_used{{provider="{p}"}} {s["used"]}' for p, s in status.items()]
+    lines += ["# HELP news_provider_quota_limit Daily request quota per provider.",
+              "# TYPE news_provider_quota_limit gauge"]
+    lines += [f'news_provider_quota_limit{{provider="{p}"}} {s["daily_limit"]}' for p, s in status.items()]
+    lines += ["# HELP news_provider_circuit_state Provider circuit breaker state in the worker serving the scrape.",
+              "# TYPE news_provider_circuit_state gauge"]
+    for provider, s in status.items():
+        for state in ("closed", "open", "half-open"):
+            lines.append(f'news_provider_circuit_state{{provider="{provider}",state="{state}"}} {int(s["circuit"] == state)}')
+    return lines
+
+@metrics_bp.route("/metrics")
+def metrics_endpoint():
+    """Exposes ingest and request metrics of all workers in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        return Response("Metrics are disabled.\n", status=404, mimetype="text/plain")
+    body = metrics.render(_quota_lines())
+    return Response(body, mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -1,39 +1,181 @@
+# JSON API for users, their subscriptions and their personalized feeds
+
 from flask import Blueprint, jsonify, request
-from src.models.user import User, db
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from database import get_db, SessionLocal
+from models.user import User
+from services.feeds import get_subscriptions, subscribe, unsubscribe, delete_user as delete_user_and_feed, get_user_feed
+from routes.common import json_error, serialize, encode_cursor, decode_cursor
+from config import CATEGORIES, FEED_PAGE_SIZE, API_MAX_PAGE_SIZE
+
+user_bp = Blueprint("user", __name__, url_prefix="/api/v1")
+
+SUBSCRIPTION_KINDS = ("category", "source")
+FEED_FIELDS = ("id", "title", "summary", "url", "published_at", "source_name", "category")
+
+# --- Helpers ---
 
-user_bp = Blueprint('user', __name__)
+def _load_user(db, user_id):
+    return db.get(User, user_id)
 
-@user_bp.route('/users', methods=['GET'])
+def _json_object():
+    """Returns the request's JSON body ({} when there is none), or None if it isn't an object."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return {}
+    return data if isinstance(data, dict) else None
+
+def _subscription_error(kind, value):
+    """Returns an error response for an invalid subscription target, or None if it is valid."""
+    if kind not in SUBSCRIPTION_KINDS:
+        return json_error(400, f"kind must be one of: {', '.join(SUBSCRIPTION_KINDS)}")
+    if not isinstance(value, str) or not value or len(value) > 255:
+        return json_error(400, "value must be a non-empty string of at most 255 characters")
+    if kind == "category" and value not in CATEGORIES:
+        return json_error(400, f"Unknown category. Available categories: {', '.join(CATEGORIES)}")
+    return None
+
+# --- Users ---
+
+@user_bp.route("/users", methods=["GET"])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    db = next(get_db())
+    try:
+        users = db.execute(select(User).order_by(User.id)).scalars().all()
+        return jsonify([user.to_dict() for user in users])
+    finally:
+        db.close()
 
-@user_bp.route('/users', methods=['POST'])
+@user_bp.route("/users", methods=["POST"])
 def create_user():
-    
-    data = request.json
-    user = User(username=data['username'], email=data['email'])
-    db.session.add(user)
-    db.session.commit()
-    return jsonify(user.to_dict()), 201
-
-@user_bp.route('/users/<int:user_id>', methods=['GET'])
+    data = _json_object()
+    if data is None:
+        return json_error(400, "Request body must be a JSON object")
+    if not data.get("username") or not data.get("email"):
+        return json_error(400, "username and email are required")
+    if not isinstance(data["username"], str) or not isinstance(data["email"], str):
+        return json_error(400, "username and email must be strings")
+    db = SessionLocal()
+    try:
+        user = User(username=data["username"], email=data["email"])
+        db.add(user)
+        db.commit()
+        return jsonify(user.to_dict()), 201
+    except IntegrityError:
+        db.rollback()
+        return json_error(409, "username or email already taken")
+    finally:
+        db.close()
+
+@user_bp.route("/users/<int:user_id>", methods=["GET"])
 def get_user(user_id):
-    user = User.query.get_or_404(user_id)
-    return jsonify(user.to_dict())
+    db = next(get_db())
+    try:
+        user = _load_user(db, user_id)
+        if user is None:
+            return json_error(404, "User not found")
+        return jsonify(user.to_dict())
+    finally:
+        db.close()
 
-@user_bp.route('/users/<int:user_id>', methods=['PUT'])
+@user_bp.route("/users/<int:user_id>", methods=["PUT"])
 def update_user(user_id):
-    user = User.query.get_or_404(user_id)
-    data = request.json
-    user.username = data.get('username', user.username)
-    user.email = data.get('email', user.email)
-    db.session.commit()
-    return jsonify(user.to_dict())
-
-@user_bp.route('/users/<int:user_id>', methods=['DELETE'])
+    data = _json_object()
+    if data is None:
+        return json_error(400, "Request body must be a JSON object")
+    if any(not isinstance(data[field], str) or not data[field] for field in ("username", "email") if field in data):
+        return json_error(400, "username and email must be non-empty strings")
+    db = SessionLocal()
+    try:
+        user = _load_user(db, user_id)
+        if user is None:
+            return json_error(404, "User not found")
+        user.username = data.get("username", user.username)
+        user.email = data.get("email", user.email)
+        db.commit()
+        return jsonify(user.to_dict())
+    except IntegrityError:
+        db.rollback()
+        return json_error(409, "username or email already taken")
+    finally:
+        db.close()
+
+@user_bp.route("/users/<int:user_id>", methods=["DELETE"])
 def delete_user(user_id):
-    user = User.query.get_or_404(user_id)
-    db.session.delete(user)
-    db.session.commit()
-    return '', 204
+    """Deletes a user together with their subscriptions and feed."""
+    if not delete_user_and_feed(user_id):
+        return json_error(404, "User not found")
+    return "", 204
+
+# --- Subscriptions ---
+
+@user_bp.route("/users/<int:user_id>/subscriptions", methods=["GET"])
+def list_subscriptions(user_id):
+    db = next(get_db())
+    try:
+        if _load_user(db, user_id) is None:
+            return json_error(404, "User not found")
+        subscriptions = get_subscriptions(db, user_id)
+    finally:
+        db.close()
+    return jsonify({"data": [
+        {"kind": s.kind, "value": s.value, "materialized": s.materialized} for s in subscriptions
+    ]})
+
+@user_bp.route("/users/<int:user_id>/subscriptions", methods=["POST"])
+def create_subscription(user_id):
+    """Subscribes a user to a category or source ({"kind": ..., "value": ...})."""
+    data = _json_object()
+    if data is None:
+        return json_error(400, "Request body must be a JSON object")
+    kind, value = data.get("kind"), data.get("value")
+    if isinstance(value, str):
+        value = value.strip()
+    error = _subscription_error(kind, value)
+    if error is not None:
+        return error
+    db = next(get_db())
+    try:
+        if _load_user(db, user_id) is None:
+            return json_error(404, "User not found")
+    finally:
+        db.close()
+    created = subscribe(user_id, kind, value)
+    return jsonify({"data": {"kind": kind, "value": value}, "created": created}), 201 if created else 200
+
+@user_bp.route("/users/<int:user_id>/subscriptions/<kind>/<path:value>", methods=["DELETE"])
+def delete_subscription(user_id, kind, value):
+    if not unsubscribe(user_id, kind, value):
+        return json_error(404, "Subscription not found")
+    return "", 204
+
+# --- Feed ---
+
+@user_bp.route("/users/<int:user_id>/feed")
+def get_feed(user_id):
+    """Returns a user's personalized feed newest first, with keyset pagination on (published_at, id)."""
+    try:
+        limit = min(max(int(request.args.get("limit", FEED_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return json_error(400, "limit must be an integer")
+    before = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        before = decode_cursor(cursor)
+        if before is None:
+            return json_error(400, "Invalid cursor")
+
+    db = next(get_db())
+    try:
+        user = _load_user(db, user_id)
+        if user is None:
+            return json_error(404, "User not found")
+        entries, next_position = get_user_feed(db, user, before=before, limit=limit)
+    finally:
+        db.close()
+
+    data = [{f: serialize(entry[f]) for f in FEED_FIELDS} for entry in entries]
+    next_cursor = encode_cursor(*next_position) if next_position else None
+    return jsonify({"data": data, "next_cursor": next_cursor})
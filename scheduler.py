@@ -0,0 +1,104 @@
+# Background scheduler that runs the news ingest at the configured IST times
+
+import logging
+import threading
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from config import (
+    SCHEDULE_TIMES_IST,
+    SCHEDULE_TIMEZONE,
+    SCHEDULER_JITTER_SECONDS,
+    SCHEDULER_MISFIRE_GRACE_SECONDS,
+    SCHEDULER_LEASE_SECONDS,
+    RETENTION_ENABLED,
+    RETENTION_SCHEDULE_TIME_IST,
+    RETENTION_LEASE_SECONDS
+)
+from services.leases import acquire_lease
+from services.jobs import run_ingest_job_now
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+INGEST_LEASE_NAME = "scheduled-ingest"
+RETENTION_LEASE_NAME = "retention"
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def run_scheduled_ingest():
+    """Fetches and stores news, unless another worker or node already took this slot.
+
+    The lease is deliberately not released when the run finishes: it expires after
+    SCHEDULER_LEASE_SECONDS, which covers the jitter/misfire window of every other
+    worker's copy of this job, so each slot is ingested exactly once.
+    """
+    if not acquire_lease(INGEST_LEASE_NAME, SCHEDULER_LEASE_SECONDS):
+        logging.info("Scheduled ingest skipped: another worker holds the lease for this slot.")
+        return
+
+    logging.info("Scheduled ingest started.")
+    try:
+        # Recorded as an ingest job so it shows up in the job status API, and coalesces
+        # with a manual run that is already in progress
+        run_ingest_job_now(trigger="scheduled")
+    except Exception as e:
+        logging.error(f"Error during scheduled ingest: {e}")
+
+def run_scheduled_retention():
+    """Archives aged articles, unless another worker or node already took today's run."""
+    if not acquire_lease(RETENTION_LEASE_NAME, RETENTION_LEASE_SECONDS):
+        logging.info("Scheduled retention skipped: another worker holds the lease.")
+        return
+
+    # Imported lazily so read-only workers don't pay for the retention module until it runs
+    from services.retention import run_retention
+
+    try:
+        run_retention()
+    except Exception as e:
+        logging.error(f"Error during scheduled retention: {e}")
+
+def start_scheduler():
+    """Starts the background scheduler once per process and returns it."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            return _scheduler
+
+        scheduler = BackgroundScheduler(
+            timezone=SCHEDULE_TIMEZONE,
+            job_defaults={
+                "coalesce": True, # Run once, not once per missed slot
+                "max_instances": 1,
+                "misfire_grace_time": SCHEDULER_MISFIRE_GRACE_SECONDS
+            }
+        )
+        for schedule_time in SCHEDULE_TIMES_IST:
+            hour, minute = (int(part) for part in schedule_time.split(":"))
+            scheduler.add_job(
+                run_scheduled_ingest,
+                CronTrigger(hour=hour, minute=minute, timezone=SCHEDULE_TIMEZONE, jitter=SCHEDULER_JITTER_SECONDS),
+                id=f"ingest-{schedule_time}",
+                replace_existing=True
+            )
+        if RETENTION_ENABLED:
+            hour, minute = (int(part) for part in RETENTION_SCHEDULE_TIME_IST.split(":"))
+            scheduler.add_job(
+                run_scheduled_retention,
+                CronTrigger(hour=hour, minute=minute, timezone=SCHEDULE_TIMEZONE, jitter=SCHEDULER_JITTER_SECONDS),
+                id="retention",
+                replace_existing=True
+            )
+        scheduler.start()
+        logging.info(f"Scheduler started: ingest at {', '.join(SCHEDULE_TIMES_IST)} ({SCHEDULE_TIMEZONE}).")
+        _scheduler = scheduler
+        return scheduler
+
+def shutdown_scheduler():
+    """Stops the scheduler if it is running (e.g. on worker exit)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown(wait=False)
+            _scheduler = None
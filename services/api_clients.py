@@ -2,26 +2,56 @@
 
 import requests
 import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-import sys
-import os
-
-# Ensure src directory is in path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from config import (
     NEWSDATA_API_KEY,
     WORLDNEWS_API_KEY,
     GNEWS_API_KEY,
+    NEWSDATA_BASE_URL,
+    WORLDNEWS_BASE_URL,
+    GNEWS_BASE_URL,
     MAX_ARTICLES_PER_FETCH,
     API_CATEGORY_MAPPING,
-    CATEGORIES
+    CATEGORIES,
+    FETCH_CONCURRENTLY,
+    FETCH_MAX_IN_FLIGHT,
+    FETCH_RUN_DEADLINE_SECONDS,
+    FETCH_PIPELINE_MAX_PENDING,
+    FETCH_INCREMENTAL,
+    FETCH_MAX_PAGES,
+    FETCH_BATCH_CATEGORIES,
+    FETCH_MAX_CATEGORIES_PER_REQUEST,
+    FETCH_MAX_PAGE_SIZE
 )
+from services.quota import provider_get, ProviderUnavailable
+from services.watermarks import published_at, load_fetch_since
+from services import metrics
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Per-thread record of the last fetch error (and of a call cut short by its page budget),
+# so the fetch engine can report it
+_fetch_state = threading.local()
+
 # --- Helper Functions ---
 
+def _record_fetch_error(message, error_type):
+    """Remembers why the current thread's fetch returned nothing."""
+    _fetch_state.error = message
+    _fetch_state.error_type = error_type
+
+def _request_error_type(error):
+    """Names a requests exception for metrics; HTTP errors carry their status code."""
+    response = getattr(error, "response", None)
+    if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+        return f"HTTP {response.status_code}"
+    return type(error).__name__
+
 def get_api_category(api_name, general_category):
     """Maps a general category to the API-specific category name."""
     if api_name in API_CATEGORY_MAPPING and general_category in API_CATEGORY_MAPPING[api_name]:
@@ -41,156 +71,506 @@ def requires_keyword_search(api_name, general_category):
         return True
     return False
 
+# --- Request Planning ---
+
+def plan_calls(categories=None, batch=None):
+    """Returns the provider calls for one run as [(api_name, (category, ...)), ...].
+
+    Categories a provider serves through its category filter are merged into as few calls
+    as FETCH_MAX_CATEGORIES_PER_REQUEST allows. Keyword-search categories, and categories
+    mapping to an API category already in a batch, get calls of their own. Calls are
+    ordered by their first category, then provider, like one call per pair would be.
+    """
+    categories = CATEGORIES if categories is None else categories
+    batch = FETCH_BATCH_CATEGORIES if batch is None else batch
+    calls = []
+    for api_name in API_FUNCTIONS:
+        limit = max(1, FETCH_MAX_CATEGORIES_PER_REQUEST.get(api_name, 1)) if batch else 1
+        batches = []
+        for category in categories:
+            api_category = get_api_category(api_name, category)
+            target = None
+            if not requires_keyword_search(api_name, category):
+                target = next((b for b in batches if len(b) < limit and not _uses_keyword(api_name, b)
+                               and api_category not in {get_api_category(api_name, c) for c in b}), None)
+            if target is None:
+                batches.append([category])
+            else:
+                target.append(category)
+        calls.extend((api_name, tuple(b)) for b in batches)
+    category_order = {category: i for i, category in enumerate(categories)}
+    api_order = {api_name: i for i, api_name in enumerate(API_FUNCTIONS)}
+    return sorted(calls, key=lambda call: (category_order[call[1][0]], api_order[call[0]]))
+
+def _article_category(api_name, categories, article):
+    """Returns which of a batch's categories an article belongs to, or None if it carries none of them.
+
+    Batched results carry their API categories (a list on NewsData.io, a string on WorldNewsAPI).
+    """
+    by_api_category = {get_api_category(api_name, c).lower(): c for c in categories}
+    labels = article.get("category") or []
+    if isinstance(labels, str):
+        labels = [labels]
+    return next((by_api_category[l.lower()] for l in labels if isinstance(l, str) and l.lower() in by_api_category), None)
+
+def route_articles(api_name, categories, articles):
+    """Splits a call's articles by the category they were requested for: {category: [articles]}.
+
+    Articles of a batched call that carry none of its categories are dropped (and counted in
+    the log) rather than filed under a category they may not belong to.
+    """
+    if len(categories) == 1:
+        return {categories[0]: articles}
+    routed = {category: [] for category in categories}
+    unmatched = 0
+    for article in articles:
+        category = _article_category(api_name, categories, article)
+        if category is None:
+            unmatched += 1
+        else:
+            routed[category].append(article)
+    if unmatched:
+        logging.warning(f"[{api_name}] Dropped {unmatched} article(s) of the {_call_label(categories)} batch "
+                        "that carry none of its categories.")
+    return routed
+
+def _as_categories(categories):
+    """Accepts a single category name as well as a planned batch."""
+    return (categories,) if isinstance(categories, str) else tuple(categories)
+
+def _call_label(categories):
+    return "+".join(categories)
+
+def _uses_keyword(api_name, categories):
+    """Keyword-search categories are never batched, so only single-category calls use it."""
+    return len(categories) == 1 and requires_keyword_search(api_name, categories[0])
+
+def _call_since(since, api_name, categories):
+    """Returns the publish time a call fetches from: its oldest category watermark, or None if one has none."""
+    times = [since.get((api_name, category)) for category in categories]
+    return None if None in times else min(times)
+
+# --- Paging Helpers ---
+
+def _count_bytes(response):
+    """Adds a response's body size to the current thread's fetch total (for metrics)."""
+    _fetch_state.bytes = getattr(_fetch_state, "bytes", 0) + len(response.content)
+
+def _page_budget(api_name, since, pages_needed=1, batched=False):
+    """Pages to request: enough for the call's article target, or up to FETCH_MAX_PAGES while
+    catching up to a watermark or filling every category of a batch."""
+    limit = max(1, FETCH_MAX_PAGES.get(api_name, 1))
+    return limit if since or batched else min(pages_needed, limit)
+
+def _page_size(api_name, categories):
+    """Returns (articles per request, pages needed) to get MAX_ARTICLES_PER_FETCH for each category."""
+    target = MAX_ARTICLES_PER_FETCH * len(categories)
+    size = min(target, FETCH_MAX_PAGE_SIZE.get(api_name, target))
+    return size, -(-target // size)
+
+def _short_categories(api_name, categories, articles):
+    """Returns {category: article count} for the categories of a batch with fewer than MAX_ARTICLES_PER_FETCH.
+
+    One busy category can fill a batched page on its own, so a batch keeps paging until
+    this is empty (or its page budget runs out).
+    """
+    if len(categories) == 1:
+        return {}
+    counts = Counter(_article_category(api_name, categories, a) for a in articles)
+    return {c: counts[c] for c in categories if counts[c] < MAX_ARTICLES_PER_FETCH}
+
+def _log_short_categories(api_name, categories, articles, pages):
+    short = _short_categories(api_name, categories, articles)
+    if short:
+        counts = ", ".join(f"{category} ({count})" for category, count in short.items())
+        logging.warning(f"[{api_name}] Fewer than {MAX_ARTICLES_PER_FETCH} articles after {pages} page(s) "
+                        f"of the {_call_label(categories)} batch for: {counts}")
+
+def _newer_than(api_name, articles, since):
+    """Drops articles published before since; returns (kept, whether any were dropped)."""
+    if not since:
+        return articles, False
+    kept = [a for a in articles if (published_at(api_name, a) or since) >= since]
+    return kept, len(kept) < len(articles)
+
+def _record_budget_exhausted(api_name, category, pages):
+    """Marks the current thread's fetch as not having reached its watermark."""
+    _fetch_state.incomplete = True
+    logging.warning(f"[{api_name}] Page budget of {pages} used up before reaching the watermark for "
+                    f"category {category}; the watermark is held so the next run fetches this window again.")
+
 # --- API Client Functions ---
 
-def fetch_newsdata_io(category):
-    """Fetches news from NewsData.io API."""
+def fetch_newsdata_io(categories, since=None):
+    """Fetches news from NewsData.io API for one category or a planned batch of them.
+
+    A batch goes out as one comma-separated category filter and follows nextPage until each
+    of its categories has MAX_ARTICLES_PER_FETCH articles. The latest-news endpoint has no
+    date filter, so with a watermark it follows nextPage until a page reaches articles
+    older than since instead. Either way it stops when the page budget runs out.
+    """
     api_name = "NewsData.io"
-    api_category = get_api_category(api_name, category)
-    use_keyword = requires_keyword_search(api_name, category)
+    categories = _as_categories(categories)
+    category = _call_label(categories)
+    api_category = ",".join(get_api_category(api_name, c) for c in categories)
+    use_keyword = _uses_keyword(api_name, categories)
+    page_size, pages_needed = _page_size(api_name, categories)
 
-    base_url = "https://newsdata.io/api/1/news"
+    base_url = f"{NEWSDATA_BASE_URL}/api/1/news"
     params = {
         "apikey": NEWSDATA_API_KEY,
         "language": "en",
         # "country": "in", # Can add country filter if needed
-        "size": MAX_ARTICLES_PER_FETCH
+        "size": page_size
     }
 
     if use_keyword:
-        params["q"] = category # Use category name as keyword
+        params["q"] = categories[0] # Use category name as keyword
         logging.info(f"[{api_name}] Using keyword search for category: {category}")
     else:
         params["category"] = api_category
         logging.info(f"[{api_name}] Fetching category: {api_category} (mapped from {category})")
 
+    articles = []
+    pages = _page_budget(api_name, since, pages_needed, batched=len(categories) > 1)
     try:
-        response = requests.get(base_url, params=params, timeout=20)
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-        if data.get("status") == "success":
-            logging.info(f"[{api_name}] Successfully fetched {len(data.get('results', []))} articles for category: {category}")
-            return data.get("results", [])
+        for page in range(1, pages + 1):
+            response = provider_get(api_name, base_url, params=params)
+            _count_bytes(response)
+            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            data = response.json()
+            if data.get("status") != "success":
+                logging.error(f"[{api_name}] API error for category {category}: {data.get('results', {}).get('message')}")
+                _record_fetch_error(f"API error: {data.get('results', {}).get('message')}", "APIError")
+                return articles
+            page_articles, reached_watermark = _newer_than(api_name, data.get("results", []), since)
+            articles.extend(page_articles)
+            if reached_watermark or not data.get("nextPage"):
+                break
+            if not since and not _short_categories(api_name, categories, articles):
+                break # Every category of the batch has its share
+            params["page"] = data["nextPage"]
         else:
-            logging.error(f"[{api_name}] API error for category {category}: {data.get('results', {}).get('message')}")
-            return []
+            if since:
+                _record_budget_exhausted(api_name, category, pages)
+        if not since:
+            _log_short_categories(api_name, categories, articles, page)
+        logging.info(f"[{api_name}] Successfully fetched {len(articles)} articles for category: {category}")
+        return articles
+    except ProviderUnavailable as e:
+        logging.warning(f"[{api_name}] Skipped category {category}: {e}")
+        _record_fetch_error(f"Skipped: {e}", "ProviderUnavailable")
+        return articles
     except requests.exceptions.RequestException as e:
         logging.error(f"[{api_name}] Request failed for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", _request_error_type(e))
+        return articles
     except Exception as e:
         logging.error(f"[{api_name}] Unexpected error for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", type(e).__name__)
+        return articles
+
+def fetch_worldnewsapi(categories, since=None):
+    """Fetches news from World News API for one category or a planned batch of them.
 
-def fetch_worldnewsapi(category):
-    """Fetches news from World News API."""
+    A batch goes out as one comma-separated category filter and pages on until each of its
+    categories has MAX_ARTICLES_PER_FETCH articles (within the page budget); with since,
+    only articles published after it are requested.
+    """
     api_name = "WorldNewsAPI"
-    api_category = get_api_category(api_name, category)
-    use_keyword = requires_keyword_search(api_name, category)
+    categories = _as_categories(categories)
+    category = _call_label(categories)
+    api_category = ",".join(get_api_category(api_name, c) for c in categories)
+    use_keyword = _uses_keyword(api_name, categories)
+    page_size, pages_needed = _page_size(api_name, categories)
 
-    base_url = "https://api.worldnewsapi.com/search-news"
+    base_url = f"{WORLDNEWS_BASE_URL}/search-news"
     params = {
         "api-key": WORLDNEWS_API_KEY,
         "language": "en",
         # "source-countries": "in", # Can add country filter
-        "number": MAX_ARTICLES_PER_FETCH,
+        "number": page_size,
         "sort": "publish-time",
         "sort-direction": "DESC"
     }
+    if since:
+        params["earliest-publish-date"] = since.strftime("%Y-%m-%d %H:%M:%S")
 
     if use_keyword:
-        params["text"] = category # Use category name as keyword
+        params["text"] = categories[0] # Use category name as keyword
         logging.info(f"[{api_name}] Using keyword search for category: {category}")
     else:
         params["category-filter"] = api_category
         logging.info(f"[{api_name}] Fetching category: {api_category} (mapped from {category})")
 
+    articles = []
+    pages = _page_budget(api_name, since, pages_needed, batched=len(categories) > 1)
     try:
-        response = requests.get(base_url, params=params, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        # WorldNewsAPI doesn\t seem to have a top-level status field in the same way
-        # Assume success if no exception and data is present
-        articles = data.get("news", [])
+        for page in range(pages):
+            params["offset"] = page * page_size
+            response = provider_get(api_name, base_url, params=params)
+            _count_bytes(response)
+            response.raise_for_status()
+            data = response.json()
+            # WorldNewsAPI doesn\t seem to have a top-level status field in the same way
+            # Assume success if no exception and data is present
+            page_articles = data.get("news", [])
+            articles.extend(page_articles)
+            if len(page_articles) < page_size or len(articles) >= data.get("available", 0):
+                break
+            if not since and not _short_categories(api_name, categories, articles):
+                break # Every category of the batch has its share
+        else:
+            if since:
+                _record_budget_exhausted(api_name, category, pages)
+        if not since:
+            _log_short_categories(api_name, categories, articles, page + 1)
         logging.info(f"[{api_name}] Successfully fetched {len(articles)} articles for category: {category}")
         return articles
+    except ProviderUnavailable as e:
+        logging.warning(f"[{api_name}] Skipped category {category}: {e}")
+        _record_fetch_error(f"Skipped: {e}", "ProviderUnavailable")
+        return articles
     except requests.exceptions.RequestException as e:
         logging.error(f"[{api_name}] Request failed for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", _request_error_type(e))
+        return articles
     except Exception as e:
         logging.error(f"[{api_name}] Unexpected error for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", type(e).__name__)
+        return articles
 
-def fetch_gnews(category):
-    """Fetches news from GNews API."""
+def fetch_gnews(categories, since=None):
+    """Fetches news from GNews API, only articles published after since if given.
+
+    GNews takes one category per request, so the planner never batches its calls.
+    """
     api_name = "GNews"
-    api_category = get_api_category(api_name, category)
-    use_keyword = requires_keyword_search(api_name, category)
+    categories = _as_categories(categories)
+    category = _call_label(categories)
+    api_category = get_api_category(api_name, categories[0])
+    use_keyword = _uses_keyword(api_name, categories)
+    page_size, pages_needed = _page_size(api_name, categories)
 
     # GNews uses different endpoints for category vs keyword
     if use_keyword:
-        base_url = "https://gnews.io/api/v4/search"
+        base_url = f"{GNEWS_BASE_URL}/api/v4/search"
         params = {
-            "q": category,
+            "q": categories[0],
             "apikey": GNEWS_API_KEY,
             "lang": "en",
             # "country": "in",
-            "max": MAX_ARTICLES_PER_FETCH,
+            "max": page_size,
             "sortby": "publishedAt"
         }
         logging.info(f"[{api_name}] Using keyword search for category: {category}")
     else:
-        base_url = "https://gnews.io/api/v4/top-headlines"
+        base_url = f"{GNEWS_BASE_URL}/api/v4/top-headlines"
         params = {
             "category": api_category,
             "apikey": GNEWS_API_KEY,
             "lang": "en",
             # "country": "in",
-            "max": MAX_ARTICLES_PER_FETCH,
+            "max": page_size,
             "sortby": "publishedAt"
         }
         logging.info(f"[{api_name}] Fetching category: {api_category} (mapped from {category})")
+    if since:
+        params["from"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
 
+    articles = []
+    pages = _page_budget(api_name, since, pages_needed)
     try:
-        response = requests.get(base_url, params=params, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        # GNews also doesn\t seem to have a top-level status, relies on HTTP status
-        articles = data.get("articles", [])
+        for page in range(1, pages + 1):
+            if page > 1:
+                params["page"] = page
+            response = provider_get(api_name, base_url, params=params)
+            _count_bytes(response)
+            response.raise_for_status()
+            data = response.json()
+            # GNews also doesn\t seem to have a top-level status, relies on HTTP status
+            page_articles = data.get("articles", [])
+            articles.extend(page_articles)
+            if len(page_articles) < page_size or len(articles) >= data.get("totalArticles", 0):
+                break
+        else:
+            if since:
+                _record_budget_exhausted(api_name, category, pages)
         logging.info(f"[{api_name}] Successfully fetched {len(articles)} articles for category: {category}")
         return articles
+    except ProviderUnavailable as e:
+        logging.warning(f"[{api_name}] Skipped category {category}: {e}")
+        _record_fetch_error(f"Skipped: {e}", "ProviderUnavailable")
+        return articles
     except requests.exceptions.RequestException as e:
         logging.error(f"[{api_name}] Request failed for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", _request_error_type(e))
+        return articles
     except Exception as e:
         logging.error(f"[{api_name}] Unexpected error for category {category}: {e}")
-        return []
+        _record_fetch_error(f"{type(e).__name__}: {e}", type(e).__name__)
+        return articles
 
 # --- Main Fetching Orchestration (Example Usage) ---
 
-def fetch_all_news():
-    """Fetches news from all configured APIs and categories."""
-    all_articles = []
-    api_functions = {
-        "NewsData.io": fetch_newsdata_io,
-        "WorldNewsAPI": fetch_worldnewsapi,
-        "GNews": fetch_gnews
+API_FUNCTIONS = {
+    "NewsData.io": fetch_newsdata_io,
+    "WorldNewsAPI": fetch_worldnewsapi,
+    "GNews": fetch_gnews
+}
+
+def _tag_articles(articles, api_name, category):
+    """Adds the API source and query category to each raw article for the processing step."""
+    for article in articles:
+        article["_api_source"] = api_name
+        article["_query_category"] = category # Store the original category query
+    return articles
+
+def _timed_fetch(api_name, categories, since=None):
+    """Runs one provider call, records its metrics and returns (articles, duration, error message or None, incomplete).
+
+    incomplete is True when the call ran out of pages before reaching its watermark.
+    """
+    _fetch_state.error = _fetch_state.error_type = None
+    _fetch_state.incomplete = False
+    _fetch_state.bytes = 0
+    started = time.monotonic()
+    articles = API_FUNCTIONS[api_name](categories, since=since)
+    duration = time.monotonic() - started
+    category = _call_label(categories)
+
+    metrics.observe("news_fetch_duration_seconds", duration, provider=api_name, category=category)
+    metrics.inc("news_fetch_response_bytes_total", _fetch_state.bytes, provider=api_name, category=category)
+    metrics.inc("news_fetch_articles_total", len(articles or []), provider=api_name, category=category)
+    if _fetch_state.error_type:
+        metrics.inc("news_fetch_errors_total", provider=api_name, category=category, error_type=_fetch_state.error_type)
+    return articles, duration, _fetch_state.error, _fetch_state.incomplete
+
+def _call_results(api_name, categories, articles, error, progress, incomplete=False, on_incomplete=None):
+    """Yields (api_name, category, tagged articles) for each category of a finished call."""
+    for category, category_articles in route_articles(api_name, categories, articles or []).items():
+        if incomplete and on_incomplete:
+            on_incomplete(api_name, category)
+        if progress:
+            progress(api_name, category, len(category_articles), error)
+        yield api_name, category, _tag_articles(category_articles, api_name, category)
+
+def iter_fetch_sequential(progress=None, since=None, on_incomplete=None):
+    """Yields (api_name, category, articles) for every (provider, category), one call at a time.
+
+    since maps (api_name, category) to the publish time to fetch from; on_incomplete is
+    called as in iter_fetch_results.
+    """
+    since = since or {}
+    for api_name, categories in plan_calls():
+        logging.info(f"--- Fetching {api_name}: {_call_label(categories)} ---")
+        articles, _, error, incomplete = _timed_fetch(api_name, categories, _call_since(since, api_name, categories))
+        yield from _call_results(api_name, categories, articles, error, progress, incomplete, on_incomplete)
+
+def iter_fetch_concurrent(max_in_flight=None, deadline=None, max_pending=None, progress=None, since=None,
+                          on_incomplete=None):
+    """Yields (api_name, category, articles) for every (provider, category), in call completion order.
+
+    Calls run on per-provider thread pools, so each provider never has more than its
+    configured number of requests in flight. At most max_pending calls are submitted or
+    completed-but-not-yet-consumed at any time: a new call is only submitted once the
+    consumer has taken a result, so a slow consumer holds back fetching instead of letting
+    responses pile up in memory. Calls still pending when the run deadline expires are
+    abandoned and logged. The optional progress(api_name, category, article_count, error)
+    callback is invoked from the consuming thread as each call completes. since maps
+    (api_name, category) to the publish time to fetch from; on_incomplete is called as in
+    iter_fetch_results.
+    """
+    since = since or {}
+    max_in_flight = max_in_flight or FETCH_MAX_IN_FLIGHT
+    deadline = FETCH_RUN_DEADLINE_SECONDS if deadline is None else deadline
+    max_pending = max(1, max_pending or FETCH_PIPELINE_MAX_PENDING)
+
+    executors = {
+        api_name: ThreadPoolExecutor(max_workers=max(1, max_in_flight.get(api_name, 1)),
+                                     thread_name_prefix=f"fetch-{api_name}")
+        for api_name in API_FUNCTIONS
     }
+    calls = plan_calls()
+    next_call = 0
+    pending = {}
+    started = time.monotonic()
+    completed = 0
+    article_count = 0
+    sequential_estimate = 0.0
+    try:
+        while next_call < len(calls) or pending:
+            while next_call < len(calls) and len(pending) < max_pending:
+                api_name, categories = calls[next_call]
+                future = executors[api_name].submit(_timed_fetch, api_name, categories, _call_since(since, api_name, categories))
+                pending[future] = next_call
+                next_call += 1
+
+            remaining = deadline - (time.monotonic() - started)
+            done = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED).done if remaining > 0 else set()
+            if not done:
+                break # Deadline passed; everything not yet done is abandoned below
+
+            # Report in submission order so the log and progress stay deterministic
+            for future in sorted(done, key=pending.get):
+                api_name, categories = calls[pending.pop(future)]
+                try:
+                    articles, duration, error, incomplete = future.result()
+                except Exception as e:
+                    logging.error(f"[{api_name}] Fetch worker failed for category {_call_label(categories)}: {e}")
+                    articles, duration, error, incomplete = [], 0.0, f"{type(e).__name__}: {e}", False
+                sequential_estimate += duration
+                completed += 1
+                article_count += len(articles or [])
+                yield from _call_results(api_name, categories, articles, error, progress, incomplete, on_incomplete)
+
+        abandoned = sorted(pending.values()) + list(range(next_call, len(calls)))
+        for api_name, categories in (calls[i] for i in abandoned):
+            logging.warning(f"[{api_name}] Abandoned fetch for category {_call_label(categories)}: "
+                            f"run deadline of {deadline}s exceeded")
+            for category in categories:
+                if progress:
+                    progress(api_name, category, 0, f"Abandoned: run deadline of {deadline}s exceeded")
+    finally:
+        for executor in executors.values():
+            # Don't block on stragglers; their results are discarded once the deadline has passed
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    speedup = sequential_estimate / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Total articles fetched across all APIs/categories: {article_count} "
+                 f"(concurrent, {elapsed:.2f}s wall-clock vs {sequential_estimate:.2f}s sequential, "
+                 f"{speedup:.1f}x speedup; {len(calls) - completed} call(s) abandoned)")
+
+def iter_fetch_results(concurrent=None, progress=None, incremental=None, on_incomplete=None):
+    """Yields (api_name, category, tagged raw articles) as each provider call completes.
+
+    When incremental (FETCH_INCREMENTAL by default), each call only asks for articles newer
+    than its stored watermark; advancing the watermarks is up to the caller, once the
+    articles are stored (see services/ingest.py). on_incomplete(api_name, category) is
+    called before the results of a call that used up its page budget without reaching the
+    watermark: articles between the watermark and its last page were not fetched.
+    """
+    if concurrent is None:
+        concurrent = FETCH_CONCURRENTLY
+    if incremental is None:
+        incremental = FETCH_INCREMENTAL
+    since = load_fetch_since() if incremental else {}
+    if concurrent:
+        return iter_fetch_concurrent(progress=progress, since=since, on_incomplete=on_incomplete)
+    return iter_fetch_sequential(progress=progress, since=since, on_incomplete=on_incomplete)
+
+def fetch_all_news(concurrent=None, progress=None, incremental=False):
+    """Fetches news from all configured APIs and categories into one list.
 
-    for category in CATEGORIES:
-        logging.info(f"--- Fetching category: {category} ---")
-        for api_name, fetch_func in api_functions.items():
-            articles = fetch_func(category)
-            if articles:
-                # Add api_name to each article for processing step
-                for article in articles:
-                    article["_api_source"] = api_name
-                    article["_query_category"] = category # Store the original category query
-                all_articles.extend(articles)
-            # Consider adding a small delay here if hitting rate limits
-            # time.sleep(1)
-
-    logging.info(f"Total articles fetched across all APIs/categories: {len(all_articles)}")
-    return all_articles
+    The list keeps category/provider order. Ingest streams iter_fetch_results instead,
+    so it never holds a whole run in memory. Watermarks are only read (never advanced) here.
+    """
+    order = {(category, api_name): i for i, (category, api_name) in
+             enumerate((c, a) for c in CATEGORIES for a in API_FUNCTIONS)}
+    results = sorted(iter_fetch_results(concurrent=concurrent, progress=progress, incremental=incremental),
+                     key=lambda result: order[(result[1], result[0])])
+    return [article for _, _, articles in results for article in articles]
 
 # Example of running the fetch directly (for testing)
 # if __name__ == "__main__":
@@ -0,0 +1,145 @@
+# Cross-provider near-duplicate detection: SimHash signatures with banded LSH lookups
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from models.news_article import SimhashBand
+from config import (
+    CLUSTER_SIMHASH_MAX_DISTANCE,
+    CLUSTER_SIMHASH_BANDS,
+    CLUSTER_WINDOW_HOURS,
+    DEDUP_LOOKUP_CHUNK_SIZE
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+SIMHASH_BITS = 64
+BAND_BITS = SIMHASH_BITS // CLUSTER_SIMHASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+# Only the start of the description is used; long texts drift apart between providers
+DESCRIPTION_WORDS = 40
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have he her his in is it its of on or that the their
+    they this to was were will with after over says said new
+""".split())
+
+# --- Signatures ---
+
+def tokenize(text):
+    """Lowercase words of a text without stopwords and single letters (also used by trending)."""
+    return [w for w in _WORD_RE.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 1]
+
+def _features(title, description):
+    """Weighted word unigram and bigram features; title words count double."""
+    features = defaultdict(int)
+    for words, weight in ((tokenize(title), 2), (tokenize(description)[:DESCRIPTION_WORDS], 1)):
+        for word in words:
+            features[word] += weight
+        for first, second in zip(words, words[1:]):
+            features[f"{first} {second}"] += weight
+    return features
+
+def simhash(title, description=None):
+    """Returns the unsigned 64-bit SimHash of an article's title and description, or None if empty."""
+    features = _features(title, description)
+    if not features:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for feature, weight in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += weight if h >> bit & 1 else -weight
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def to_signed(value):
+    """Maps an unsigned 64-bit value onto the signed range of a BIGINT column."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def band_keys(signature):
+    """Splits a signature into LSH band keys: (band index << band bits) | band value.
+
+    Two signatures within CLUSTER_SIMHASH_MAX_DISTANCE bits of each other are guaranteed
+    to share at least one band as long as there are more bands than differing bits.
+    """
+    return [(band << BAND_BITS) | (signature >> (band * BAND_BITS) & BAND_MASK)
+            for band in range(CLUSTER_SIMHASH_BANDS)]
+
+# --- Clustering ---
+
+def _load_candidates(db, keys, since):
+    """Loads stored band entries for the given keys, grouped by band key."""
+    buckets = defaultdict(list)
+    keys = list(keys)
+    for start in range(0, len(keys), DEDUP_LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + DEDUP_LOOKUP_CHUNK_SIZE]
+        rows = db.query(SimhashBand.band_key, SimhashBand.simhash, SimhashBand.story_key)\
+                 .filter(SimhashBand.band_key.in_(chunk), SimhashBand.published_at >= since)\
+                 .all()
+        for band_key, signature, story_key in rows:
+            buckets[band_key].append((to_unsigned(signature), story_key))
+    return buckets
+
+def assign_story_keys(db, rows, descriptions=None):
+    """Sets "simhash" and "story_key" on each article row and returns the band rows to store.
+
+    descriptions maps url_hash to the full description hashed with the title; rows only
+    carry the shortened summary, which is used when an article has no entry.
+
+    Each article is compared only against entries sharing one of its LSH buckets, both from
+    the DB (within the clustering window) and from earlier rows of the same batch. An article
+    with no match within CLUSTER_SIMHASH_MAX_DISTANCE starts a new story keyed by its url_hash.
+    """
+    signatures = {}
+    for row in rows:
+        description = descriptions.get(row["url_hash"]) if descriptions else None
+        signature = simhash(row.get("title"), description or row.get("summary"))
+        if signature is not None:
+            signatures[row["url_hash"]] = signature
+
+    since = datetime.utcnow() - timedelta(hours=CLUSTER_WINDOW_HOURS)
+    all_keys = {key for signature in signatures.values() for key in band_keys(signature)}
+    buckets = _load_candidates(db, all_keys, since)
+
+    band_rows = []
+    clustered = 0
+    # Oldest first, so the earliest report of a story becomes its representative
+    for row in sorted(rows, key=lambda r: r["published_at"]):
+        signature = signatures.get(row["url_hash"])
+        row["story_key"] = row["url_hash"]
+        if signature is None:
+            row["simhash"] = None
+            continue
+        row["simhash"] = to_signed(signature)
+        keys = band_keys(signature)
+
+        best_distance = None
+        for key in keys:
+            for candidate, story_key in buckets.get(key, ()):
+                distance = (signature ^ candidate).bit_count()
+                if distance <= CLUSTER_SIMHASH_MAX_DISTANCE and (best_distance is None or distance < best_distance):
+                    best_distance = distance
+                    row["story_key"] = story_key
+        if best_distance is not None:
+            clustered += 1
+
+        for key in keys:
+            buckets[key].append((signature, row["story_key"]))
+            band_rows.append({
+                "band_key": key,
+                "url_hash": row["url_hash"],
+                "published_at": row["published_at"],
+                "simhash": row["simhash"],
+                "story_key": row["story_key"]
+            })
+
+    if clustered:
+        logging.info(f"Clustered {clustered} of {len(rows)} new articles into existing stories.")
+    return band_rows
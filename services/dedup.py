@@ -0,0 +1,191 @@
+# URL canonicalization and hash-based duplicate detection for ingested articles
+
+import hashlib
+import logging
+import math
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from models.news_article import NewsArticle
+from models.archived_article import ArchivedArticle
+from config import (
+    DEDUP_TRACKING_PARAMS,
+    DEDUP_TRACKING_PARAM_PREFIXES,
+    DEDUP_LOOKUP_CHUNK_SIZE,
+    DEDUP_BLOOM_FILTER_ENABLED,
+    DEDUP_BLOOM_CAPACITY,
+    DEDUP_BLOOM_ERROR_RATE
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+_TRACKING_PARAMS = frozenset(p.lower() for p in DEDUP_TRACKING_PARAMS)
+_TRACKING_PREFIXES = tuple(p.lower() for p in DEDUP_TRACKING_PARAM_PREFIXES)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# --- Canonicalization ---
+
+def canonicalize_url(url):
+    """Normalizes an article URL so trivially different links to the same page compare equal.
+
+    Lowercases the host, drops "www.", default ports, fragments and tracking parameters,
+    treats http and https as the same scheme, sorts the remaining query parameters and
+    strips trailing slashes from the path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def url_hash(url):
+    """Returns the fixed-width (32 hex chars) hash of an article's canonical URL."""
+    return hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=16).hexdigest()
+
+# --- Probabilistic Pre-filter ---
+
+class BloomFilter:
+    """A fixed-size Bloom filter over url_hash hex strings."""
+
+    def __init__(self, capacity, error_rate):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hex_hash):
+        # url_hash is already uniformly distributed; derive k positions by double hashing its halves
+        h1 = int(hex_hash[:16], 16)
+        h2 = int(hex_hash[16:], 16) | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, hex_hash):
+        for pos in self._positions(hex_hash):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, hex_hash):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hex_hash))
+
+class StoredHashFilter:
+    """Bloom filter of every url_hash stored in the DB, kept current by reading only new rows.
+
+    The first refresh in a process streams the hash column once; after that each refresh reads
+    rows with an id above the last one seen, so rows written by other workers are picked up too.
+    A negative answer is therefore definite and the DB lookup for that hash can be skipped.
+    """
+
+    def __init__(self, capacity=DEDUP_BLOOM_CAPACITY, error_rate=DEDUP_BLOOM_ERROR_RATE):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.capacity = capacity
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def refresh(self, db):
+        with self.lock:
+            rows = db.query(NewsArticle.id, NewsArticle.url_hash)\
+                     .filter(NewsArticle.id > self.last_id)\
+                     .order_by(NewsArticle.id)\
+                     .yield_per(5000)
+            for article_id, hex_hash in rows:
+                if hex_hash:
+                    self.bloom.add(hex_hash)
+                self.last_id = article_id
+            if self.bloom.count > self.capacity:
+                logging.warning(f"Dedup Bloom filter holds {self.bloom.count} hashes (capacity {self.capacity}); "
+                                f"false positives will rise. Consider raising DEDUP_BLOOM_CAPACITY.")
+
+    def might_contain(self, hex_hash):
+        return hex_hash in self.bloom
+
+_stored_hash_filter = None
+
+def _get_stored_hash_filter():
+    global _stored_hash_filter
+    if _stored_hash_filter is None:
+        _stored_hash_filter = StoredHashFilter()
+    return _stored_hash_filter
+
+# --- Batch Lookup ---
+
+def find_existing_hashes(db, hashes):
+    """Returns the subset of the given url_hash values already stored in the DB.
+
+    Only the batch's own hashes are looked up (chunked "IN" queries on the unique index),
+    so the cost depends on the batch size rather than on the size of the table.
+    """
+    candidates = list(set(hashes))
+    if DEDUP_BLOOM_FILTER_ENABLED and candidates:
+        stored_filter = _get_stored_hash_filter()
+        stored_filter.refresh(db)
+        candidates = [h for h in candidates if stored_filter.might_contain(h)]
+
+    existing = set()
+    for start in range(0, len(candidates), DEDUP_LOOKUP_CHUNK_SIZE):
+        chunk = candidates[start:start + DEDUP_LOOKUP_CHUNK_SIZE]
+        rows = db.query(NewsArticle.url_hash).filter(NewsArticle.url_hash.in_(chunk)).all()
+        existing.update(row[0] for row in rows)
+        # Articles moved out by retention still count as stored
+        rows = db.query(ArchivedArticle.url_hash).filter(ArchivedArticle.url_hash.in_(chunk)).all()
+        existing.update(row[0] for row in rows)
+    return existing
+
+def backfill_url_hashes(db, batch_size=1000):
+    """Fills url_hash for rows stored before the column existed.
+
+    Rows whose canonical URL collides with an already hashed row are left NULL: they are
+    duplicates of that row and must not violate the unique index.
+    """
+    updated = 0
+    collisions = 0
+    last_id = 0
+    while True:
+        rows = db.query(NewsArticle.id, NewsArticle.url)\
+                 .filter(NewsArticle.url_hash.is_(None), NewsArticle.id > last_id)\
+                 .order_by(NewsArticle.id)\
+                 .limit(batch_size)\
+                 .all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        hashed = {}
+        for article_id, url in rows:
+            hex_hash = url_hash(url)
+            if hex_hash in hashed:
+                collisions += 1
+                continue
+            hashed[hex_hash] = article_id
+        for hex_hash in find_existing_hashes(db, hashed.keys()):
+            del hashed[hex_hash]
+            collisions += 1
+
+        for hex_hash, article_id in hashed.items():
+            db.query(NewsArticle).filter(NewsArticle.id == article_id).update({"url_hash": hex_hash}, synchronize_session=False)
+        db.commit()
+        updated += len(hashed)
+
+    if updated:
+        logging.info(f"Backfilled url_hash for {updated} articles ({collisions} canonical duplicates left unhashed).")
+    return updated
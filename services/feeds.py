@@ -0,0 +1,333 @@
+# Personalized feeds: category/source subscriptions, fanned out to per-user feeds at ingest
+
+import heapq
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, update, func, exists, or_, not_, tuple_, literal
+
+from database import engine
+from models.news_article import NewsArticle
+from models.user import User, Subscription, FeedItem
+from config import (
+    FEED_FANOUT_MAX_SUBSCRIBERS,
+    FEED_BACKFILL_ITEMS,
+    FEED_ITEM_DAYS,
+    FEED_PAGE_SIZE,
+    FEED_FANOUT_CHUNK_SIZE,
+    INGEST_CHUNK_SIZE
+)
+from services.storage import insert_ignore_statement, bulk_insert
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Article column each subscription kind matches on
+TARGET_COLUMNS = {
+    "category": NewsArticle.category,
+    "source": NewsArticle.source_name
+}
+FEED_ITEM_TARGET_COLUMNS = {
+    "category": FeedItem.category,
+    "source": FeedItem.source_name
+}
+
+# Article columns copied into feed entries (and read when merging a heavy subscription in)
+FEED_ARTICLE_COLUMNS = (
+    NewsArticle.id, NewsArticle.published_at, NewsArticle.title, NewsArticle.summary,
+    NewsArticle.url, NewsArticle.source_name, NewsArticle.category
+)
+
+# Keeps IN lists under SQLite's bound-parameter limit
+_ID_CHUNK = 500
+
+def _feed_row(user_id, article):
+    """Builds a feed_items row for one user from an article row (FEED_ARTICLE_COLUMNS)."""
+    return {
+        "user_id": user_id,
+        "published_at": article["published_at"],
+        "article_id": article["id"],
+        "title": article["title"],
+        "summary": article["summary"],
+        "url": article["url"],
+        "source_name": article["source_name"],
+        "category": article["category"]
+    }
+
+def _feed_cutoff(now=None):
+    return (now or datetime.utcnow()) - timedelta(days=FEED_ITEM_DAYS)
+
+# --- Subscriptions ---
+
+def _is_light(conn, kind, value):
+    """True if a category/source has few enough subscribers to be fanned out at ingest.
+
+    Counts at most FEED_FANOUT_MAX_SUBSCRIBERS + 1 entries of the subscriptions index.
+    """
+    bounded = (
+        select(literal(1)).select_from(Subscription)
+        .where(Subscription.kind == kind, Subscription.value == value)
+        .limit(FEED_FANOUT_MAX_SUBSCRIBERS + 1)
+        .subquery()
+    )
+    return conn.execute(select(func.count()).select_from(bounded)).scalar() <= FEED_FANOUT_MAX_SUBSCRIBERS
+
+def _backfill(conn, user_ids, kind, value, now=None):
+    """Copies a category's/source's newest articles into the feeds of the given users."""
+    column = TARGET_COLUMNS[kind]
+    articles = conn.execute(
+        select(*FEED_ARTICLE_COLUMNS)
+        .where(column == value, NewsArticle.published_at >= _feed_cutoff(now))
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+        .limit(FEED_BACKFILL_ITEMS)
+    ).mappings().all()
+    rows = [_feed_row(user_id, article) for user_id in user_ids for article in articles]
+    statement = insert_ignore_statement(conn.dialect.name, FeedItem.__table__)
+    for start in range(0, len(rows), INGEST_CHUNK_SIZE):
+        conn.execute(statement, rows[start:start + INGEST_CHUNK_SIZE])
+
+def _refresh_merge_flags(conn, user_ids):
+    """Sets users.merge_on_read to whether the user has any subscription that isn't materialized."""
+    user_ids = list(user_ids)
+    heavy = exists().where(Subscription.user_id == User.id, not_(Subscription.materialized))
+    for start in range(0, len(user_ids), _ID_CHUNK):
+        conn.execute(
+            update(User).where(User.id.in_(user_ids[start:start + _ID_CHUNK])).values(merge_on_read=heavy)
+        )
+
+def _rebalance(conn, kind, value):
+    """Materializes a category's/source's subscriptions or stops doing so, as its subscriber count says.
+
+    Subscriptions that start being materialized get the target's recent articles copied
+    into their feeds; ones that stop keep their entries, which age out. Returns the ids of
+    the users whose subscription changed.
+    """
+    light = _is_light(conn, kind, value)
+    target = (Subscription.kind == kind, Subscription.value == value)
+    changed = conn.execute(
+        select(Subscription.user_id).where(*target, Subscription.materialized != light)
+    ).scalars().all()
+    if not changed:
+        return []
+    conn.execute(update(Subscription).where(*target).values(materialized=light))
+    if light:
+        _backfill(conn, changed, kind, value)
+    logging.info(f"Feeds of {len(changed)} subscribers of {kind} \"{value}\" are now "
+                 f"{'materialized' if light else 'merged on read'}.")
+    return changed
+
+def get_subscriptions(db, user_id):
+    return db.execute(
+        select(Subscription).where(Subscription.user_id == user_id)
+        .order_by(Subscription.kind, Subscription.value)
+    ).scalars().all()
+
+def subscribe(user_id, kind, value, bind=None):
+    """Subscribes a user to a category or source; returns False if they already were."""
+    bind = bind if bind is not None else engine
+    with bind.begin() as conn:
+        # The insert comes first: it takes the write lock before the subscriber count is read.
+        # Stored as not materialized; _rebalance flips it (and backfills) while the target is light.
+        statement = insert_ignore_statement(conn.dialect.name, Subscription.__table__)
+        added = conn.execute(statement, {
+            "user_id": user_id, "kind": kind, "value": value,
+            "materialized": False, "created_at": datetime.utcnow()
+        }).rowcount
+        if not added:
+            return False
+        changed = _rebalance(conn, kind, value)
+        _refresh_merge_flags(conn, {user_id, *changed})
+    return True
+
+def _drop_target_items(conn, user_id, kind, value):
+    """Deletes a user's feed entries from a category/source their other subscriptions don't cover."""
+    statement = delete(FeedItem).where(FeedItem.user_id == user_id, FEED_ITEM_TARGET_COLUMNS[kind] == value)
+    for other_kind, column in FEED_ITEM_TARGET_COLUMNS.items():
+        if other_kind == kind:
+            continue
+        covered = select(Subscription.value).where(Subscription.user_id == user_id, Subscription.kind == other_kind)
+        statement = statement.where(or_(column.is_(None), column.not_in(covered)))
+    conn.execute(statement)
+
+def unsubscribe(user_id, kind, value, bind=None):
+    """Removes a subscription and its entries from the user's feed; returns False if there was none."""
+    bind = bind if bind is not None else engine
+    with bind.begin() as conn:
+        removed = conn.execute(
+            delete(Subscription).where(
+                Subscription.user_id == user_id, Subscription.kind == kind, Subscription.value == value
+            )
+        ).rowcount
+        if not removed:
+            return False
+        _drop_target_items(conn, user_id, kind, value)
+        changed = _rebalance(conn, kind, value)
+        _refresh_merge_flags(conn, {user_id, *changed})
+    return True
+
+def delete_user(user_id, bind=None):
+    """Deletes a user with their subscriptions and feed; returns False if there is no such user."""
+    bind = bind if bind is not None else engine
+    with bind.begin() as conn:
+        if not conn.execute(delete(User).where(User.id == user_id)).rowcount:
+            return False
+        targets = conn.execute(
+            select(Subscription.kind, Subscription.value).where(Subscription.user_id == user_id)
+        ).all()
+        conn.execute(delete(Subscription).where(Subscription.user_id == user_id))
+        conn.execute(delete(FeedItem).where(FeedItem.user_id == user_id))
+        changed = set()
+        for kind, value in targets:
+            changed.update(_rebalance(conn, kind, value))
+        _refresh_merge_flags(conn, changed)
+    return True
+
+def rebalance_subscriptions(bind=None):
+    """Re-decides which subscriptions are materialized (after changing FEED_FANOUT_MAX_SUBSCRIBERS).
+
+    Returns the number of subscriptions that changed.
+    """
+    bind = bind if bind is not None else engine
+    changed_count = 0
+    with bind.connect() as conn:
+        targets = conn.execute(select(Subscription.kind, Subscription.value).distinct()).all()
+    for kind, value in targets:
+        with bind.begin() as conn: # One short transaction per category/source
+            changed = _rebalance(conn, kind, value)
+            _refresh_merge_flags(conn, changed)
+        changed_count += len(changed)
+    return changed_count
+
+# --- Fan-out ---
+
+def fan_out(rows, now=None, bind=None):
+    """Copies newly stored articles into the feeds of their materialized subscribers; returns the entries added.
+
+    rows are article rows ({"url_hash", "category", "source_name", ...}). Only the
+    subscriptions of the batch's categories and sources are read, and each has at most
+    FEED_FANOUT_MAX_SUBSCRIBERS materialized subscribers, so the cost grows with the batch,
+    never with the number of users. A failure is only logged, so it never fails the ingest
+    that stored the articles.
+    """
+    if not rows:
+        return 0
+    try:
+        return _fan_out(rows, now or datetime.utcnow(), bind if bind is not None else engine)
+    except Exception as e:
+        logging.error(f"Could not fan out articles to personalized feeds: {e}")
+        return 0
+
+def _fan_out(rows, now, bind):
+    targets = {
+        "category": {row["category"] for row in rows if row.get("category")},
+        "source": {row["source_name"] for row in rows if row.get("source_name")}
+    }
+    with bind.connect() as conn:
+        subscribers = {}
+        for kind, values in targets.items():
+            values = list(values)
+            for start in range(0, len(values), _ID_CHUNK):
+                for value, user_id in conn.execute(
+                    select(Subscription.value, Subscription.user_id).where(
+                        Subscription.kind == kind,
+                        Subscription.value.in_(values[start:start + _ID_CHUNK]),
+                        Subscription.materialized
+                    )
+                ):
+                    subscribers.setdefault((kind, value), []).append(user_id)
+        if not subscribers:
+            return 0
+
+        # Ids are assigned on insert; read them back with the columns feeds show
+        hashes = [row["url_hash"] for row in rows]
+        articles = []
+        for start in range(0, len(hashes), _ID_CHUNK):
+            articles.extend(conn.execute(
+                select(*FEED_ARTICLE_COLUMNS).where(
+                    NewsArticle.url_hash.in_(hashes[start:start + _ID_CHUNK]),
+                    NewsArticle.published_at >= _feed_cutoff(now)
+                )
+            ).mappings().all())
+
+    feed_rows = []
+    for article in articles:
+        # A user subscribed to both the category and the source gets one entry
+        user_ids = set(subscribers.get(("category", article["category"]), ()))
+        user_ids.update(subscribers.get(("source", article["source_name"]), ()))
+        feed_rows.extend(_feed_row(user_id, article) for user_id in user_ids)
+    # In primary key order, so each chunk dirties neighbouring pages of feed_items, not random ones
+    feed_rows.sort(key=lambda row: (row["user_id"], row["published_at"], row["article_id"]))
+    return bulk_insert(FeedItem.__table__, feed_rows, chunk_size=FEED_FANOUT_CHUNK_SIZE, bind=bind)["added"]
+
+# --- Reading ---
+
+def get_user_feed(db, user, before=None, limit=FEED_PAGE_SIZE, now=None):
+    """Returns (entries, next_position) of a user's feed, newest first.
+
+    Entries are dicts with the article's id, published_at, title, summary, url, source_name
+    and category. The materialized part is one range read on the feed_items primary key.
+    Users with subscriptions too popular to fan out (merge_on_read) also get those
+    categories'/sources' newest articles, each one range read on an articles index, merged
+    in by date. before is the (published_at, id) position to continue after; next_position
+    is that of the page's last entry, or None on the last page.
+    """
+    cutoff = _feed_cutoff(now)
+    query = (
+        select(FeedItem.article_id.label("id"), FeedItem.published_at, FeedItem.title, FeedItem.summary,
+               FeedItem.url, FeedItem.source_name, FeedItem.category)
+        .where(FeedItem.user_id == user.id, FeedItem.published_at >= cutoff)
+        .order_by(FeedItem.published_at.desc(), FeedItem.article_id.desc())
+        .limit(limit + 1)
+    )
+    if before:
+        query = query.where(tuple_(FeedItem.published_at, FeedItem.article_id) < tuple_(*before))
+    streams = [db.execute(query).mappings().all()]
+
+    if user.merge_on_read:
+        heavy = db.execute(
+            select(Subscription.kind, Subscription.value)
+            .where(Subscription.user_id == user.id, not_(Subscription.materialized))
+        ).all()
+        for kind, value in heavy:
+            query = (
+                select(*FEED_ARTICLE_COLUMNS)
+                .where(TARGET_COLUMNS[kind] == value, NewsArticle.published_at >= cutoff)
+                .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+                .limit(limit + 1)
+            )
+            if before:
+                query = query.where(tuple_(NewsArticle.published_at, NewsArticle.id) < tuple_(*before))
+            streams.append(db.execute(query).mappings().all())
+
+    entries, seen = [], set()
+    for entry in heapq.merge(*streams, key=lambda e: (e["published_at"], e["id"]), reverse=True):
+        if entry["id"] in seen:
+            continue # Also fanned out, or in both a heavy category and a heavy source
+        seen.add(entry["id"])
+        entries.append(dict(entry))
+        if len(entries) > limit:
+            break
+
+    next_position = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_position = (entries[-1]["published_at"], entries[-1]["id"])
+    return entries, next_position
+
+# --- Maintenance ---
+
+def trim_feeds(days=FEED_ITEM_DAYS, batch_size=INGEST_CHUNK_SIZE * 10, bind=None):
+    """Deletes feed entries published more than days ago, in batches; returns how many."""
+    bind = bind if bind is not None else engine
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    key = tuple_(FeedItem.user_id, FeedItem.published_at, FeedItem.article_id)
+    trimmed = 0
+    while True:
+        with bind.begin() as conn:
+            batch = (
+                select(FeedItem.user_id, FeedItem.published_at, FeedItem.article_id)
+                .where(FeedItem.published_at < cutoff).limit(batch_size)
+            )
+            deleted = conn.execute(delete(FeedItem).where(key.in_(batch))).rowcount
+        trimmed += deleted
+        if deleted < batch_size:
+            break
+    return trimmed
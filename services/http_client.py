@@ -0,0 +1,218 @@
+# Shared HTTP client layer for the News API clients
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit, urlencode
+import hashlib
+import json
+import logging
+import threading
+import time
+import os
+
+from config import (
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_TOTAL,
+    HTTP_RETRY_BACKOFF_FACTOR,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_DEFAULT_MAX_AGE,
+    HTTP_CACHE_MAX_ENTRY_AGE,
+    HTTP_CACHE_IGNORED_PARAMS
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Response headers kept in the cache (enough to revalidate and decode the body)
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# --- Pooled Sessions ---
+
+class _ProviderRetry(Retry):
+    """urllib3 retry that leaves 429s to the quota layer (which may decide not to wait)."""
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+def _build_session():
+    """Creates a keep-alive session with a tuned connection pool and retry policy."""
+    retry = _ProviderRetry(
+        total=HTTP_RETRY_TOTAL,
+        backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(url):
+    """Returns the shared session for the URL's host, creating it on first use."""
+    host = urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _build_session()
+                _sessions[host] = session
+    return session
+
+def close_sessions():
+    """Closes all pooled sessions (e.g. after forking a worker)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+# --- On-disk Response Cache ---
+
+def cache_key(url, params=None):
+    """Builds a stable cache key from the normalized URL and sorted query parameters."""
+    parts = urlsplit(url)
+    normalized_url = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path or '/'}"
+    items = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items()
+        if v is not None and k not in HTTP_CACHE_IGNORED_PARAMS
+    )
+    return hashlib.sha256(f"{normalized_url}?{urlencode(items)}".encode("utf-8")).hexdigest()
+
+def _cache_path(key):
+    return os.path.join(HTTP_CACHE_DIR, key[:2], f"{key}.cache")
+
+def _read_entry(key):
+    """Loads a cached entry as (meta, body), or None if missing or unreadable."""
+    path = _cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            meta = json.loads(f.readline())
+            body = f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Discarding unreadable HTTP cache entry {path}: {e}")
+        return None
+    if time.time() - meta["stored_at"] > HTTP_CACHE_MAX_ENTRY_AGE:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return meta, body
+
+def _write_entry(key, meta, body):
+    """Atomically writes a cache entry: one JSON metadata line followed by the raw body."""
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            f.write(body)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write HTTP cache entry {path}: {e}")
+
+def _parse_cache_control(headers):
+    """Returns (cacheable, max_age) from a response's Cache-Control header."""
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    # This cache belongs to one client, so "private" responses may be stored like any other
+    if "no-store" in directives:
+        return False, 0
+    if "no-cache" in directives:
+        return True, 0
+    try:
+        return True, int(directives["max-age"])
+    except (KeyError, ValueError):
+        return True, HTTP_CACHE_DEFAULT_MAX_AGE
+
+def _meta_from_response(response, url):
+    cacheable, max_age = _parse_cache_control(response.headers)
+    meta = {
+        "url": url,
+        "stored_at": time.time(),
+        "max_age": max_age,
+        "headers": {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+    }
+    return cacheable, meta
+
+def _response_from_cache(meta, body, url):
+    """Builds a requests.Response from a cached entry so callers can't tell the difference."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    response.from_cache = True
+    return response
+
+# --- Public API ---
+
+def get_fresh(url, params=None):
+    """Returns the cached response if it is still fresh (no request needed), else None."""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    entry = _read_entry(cache_key(url, params))
+    if entry is None:
+        return None
+    meta, body = entry
+    if time.time() - meta["stored_at"] >= meta["max_age"]:
+        return None
+    return _response_from_cache(meta, body, url)
+
+def cached_get(url, params=None, timeout=HTTP_TIMEOUT_SECONDS):
+    """GETs a URL through the pooled session for its host and the on-disk response cache.
+
+    Fresh entries are answered locally; stale ones are revalidated with If-None-Match /
+    If-Modified-Since so an unchanged response costs a 304 instead of a full payload.
+    Raises the same requests exceptions as requests.get.
+    """
+    session = get_session(url)
+    if not HTTP_CACHE_ENABLED:
+        return session.get(url, params=params, timeout=timeout)
+
+    key = cache_key(url, params)
+    entry = _read_entry(key)
+    headers = {}
+    if entry:
+        meta, body = entry
+        if time.time() - meta["stored_at"] < meta["max_age"]:
+            logging.info(f"HTTP cache hit (fresh) for {meta['url']}")
+            return _response_from_cache(meta, body, url)
+        if "ETag" in meta["headers"]:
+            headers["If-None-Match"] = meta["headers"]["ETag"]
+        if "Last-Modified" in meta["headers"]:
+            headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and entry:
+        meta, body = entry
+        _, refreshed = _meta_from_response(response, meta["url"])
+        # A 304 may omit headers; keep the stored validators unless new ones were sent
+        meta["headers"].update(refreshed["headers"])
+        meta["stored_at"] = refreshed["stored_at"]
+        meta["max_age"] = refreshed["max_age"]
+        _write_entry(key, meta, body)
+        logging.info(f"HTTP cache revalidated (304) for {meta['url']}")
+        return _response_from_cache(meta, body, url)
+
+    if response.status_code == 200:
+        cacheable, meta = _meta_from_response(response, urlsplit(response.url)._replace(query="").geturl())
+        if cacheable:
+            _write_entry(key, meta, response.content)
+    return response
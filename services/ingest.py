@@ -0,0 +1,88 @@
+# End-to-end ingest: fetch from every provider, then standardize, dedup and store
+
+import logging
+from contextlib import closing
+
+from config import INGEST_STREAM_BATCH_SIZE
+from services.api_clients import iter_fetch_results
+from services.processing import standardize_articles, store_standardized_articles
+from services.watermarks import newest_published, advance_watermarks
+from services.snapshots import publish_snapshots
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def run_ingest(progress=None, on_stage=None, batch_size=None):
+    """Runs one full ingest and returns {"fetched", "added", "duplicates", "errors"}.
+
+    Ingest is a stream: each provider response is standardized as soon as it arrives
+    (its raw JSON is dropped right away) and articles are stored in batches of
+    batch_size, each committed on its own. Fetching is held back while a batch is being
+    stored, so memory stays bounded by the batch size and the fetch window no matter how
+    many providers or categories there are, and a failure keeps every batch stored before it.
+
+    Fetch watermarks are advanced only after the whole run is stored, and only for calls
+    that finished without an error and reached their watermark, so a failed call, or one
+    whose page budget ran out first, is fetched again from the same point next time.
+
+    progress(api_name, category, article_count, error) is called as each provider call
+    completes; on_stage(stage) is called with "fetching" at the start and "storing" before
+    each batch is written.
+    """
+    batch_size = batch_size or INGEST_STREAM_BATCH_SIZE
+    counts = {"fetched": 0, "added": 0, "duplicates": 0, "errors": 0}
+    batch = []
+    failed_calls = set()
+    incomplete_calls = set()
+    newest = {}
+
+    def track_progress(api_name, category, article_count, error):
+        if error:
+            failed_calls.add((api_name, category))
+        if progress:
+            progress(api_name, category, article_count, error)
+
+    def flush():
+        if on_stage:
+            on_stage("storing")
+        stored = store_standardized_articles(batch)
+        if stored is None:
+            raise RuntimeError("Article processing failed; see the log for details.")
+        for key in ("added", "duplicates", "errors"):
+            counts[key] += stored[key]
+        batch.clear()
+        if on_stage:
+            on_stage("fetching")
+
+    if on_stage:
+        on_stage("fetching")
+    def hold_watermark(api_name, category):
+        incomplete_calls.add((api_name, category))
+
+    with closing(iter_fetch_results(progress=track_progress, on_incomplete=hold_watermark)) as results:
+        for api_name, category, raw_articles in results:
+            counts["fetched"] += len(raw_articles)
+            published = newest_published(api_name, raw_articles)
+            if published:
+                newest[(api_name, category)] = published
+            batch.extend(standardize_articles(raw_articles))
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    if counts["errors"]:
+        logging.warning("Some articles failed to store; fetch watermarks are left as they were.")
+    else:
+        held = failed_calls | incomplete_calls
+        if incomplete_calls:
+            logging.warning(f"Fetch watermarks held for {len(incomplete_calls)} call(s) that ran out of pages "
+                            "before reaching them.")
+        advance_watermarks({call: published for call, published in newest.items() if call not in held})
+    # Opt-in (SNAPSHOTS_ENABLED); once per run, not per batch. Also when nothing was added:
+    # headlines still age out of the window, so the published page must follow
+    publish_snapshots()
+
+    if not counts["fetched"]:
+        logging.info("Ingest ran, but no new articles were fetched.")
+    else:
+        logging.info(f"Ingest complete: {counts}")
+    return counts
@@ -0,0 +1,167 @@
+# Background ingest jobs: enqueue from web requests, run off the request thread, report progress
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database import SessionLocal, ReadSessionLocal
+from models.ingest_job import IngestJob
+from config import JOB_STALE_SECONDS, JOB_LEASE_SECONDS
+from services.leases import acquire_lease, release_lease, holder_id
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+JOB_LEASE_NAME = "ingest-job"
+ACTIVE_STATUSES = ("queued", "running")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """One ingest thread per process, created lazily (after gunicorn forks the worker)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-job")
+        return _executor
+
+def _update_job(job_id, **values):
+    db = SessionLocal()
+    try:
+        values.setdefault("updated_at", datetime.utcnow())
+        db.query(IngestJob).filter(IngestJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def _find_active_job(db):
+    """Returns the oldest queued/running job that still has a recent heartbeat, if any."""
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    return db.query(IngestJob)\
+             .filter(IngestJob.status.in_(ACTIVE_STATUSES), IngestJob.updated_at >= cutoff)\
+             .order_by(IngestJob.id)\
+             .first()
+
+def _job_holder(job_id):
+    """The lease holder for one job: per job, so two jobs in the same process still exclude each other."""
+    return f"{holder_id()}:{job_id}"
+
+class LeaseLost(RuntimeError):
+    """The job's lease expired and was taken over, so another ingest may be running."""
+
+def _create_job(db, trigger, status="queued"):
+    job = IngestJob(trigger=trigger, status=status)
+    db.add(job)
+    db.commit()
+    return job.id
+
+class JobProgress:
+    """Collects per-provider progress for a job and persists it as the job's heartbeat."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.holder = _job_holder(job_id)
+        self.lock = threading.Lock()
+        self.state = {"stage": "queued", "providers": {}}
+
+    def _save(self):
+        _update_job(self.job_id, progress=json.dumps(self.state))
+        # Renew while we're making progress; stop if another job took the lease meanwhile
+        if not acquire_lease(JOB_LEASE_NAME, JOB_LEASE_SECONDS, holder=self.holder):
+            raise LeaseLost(f"Ingest job {self.job_id} lost its lease; stopping.")
+
+    def on_stage(self, stage):
+        with self.lock:
+            self.state["stage"] = stage
+            self._save()
+
+    def on_fetch(self, api_name, category, article_count, error):
+        with self.lock:
+            provider = self.state["providers"].setdefault(
+                api_name, {"calls_done": 0, "articles": 0, "errors": []}
+            )
+            provider["calls_done"] += 1
+            provider["articles"] += article_count
+            if error:
+                provider["errors"].append({"category": category, "error": error})
+            self._save()
+
+def run_job(job_id):
+    """Runs an ingest job in the current thread, unless another job is already ingesting.
+
+    The job fails with LeaseLost if its lease can't be renewed (it expired and another job
+    took it), rather than ingesting alongside that job.
+    """
+    # Imported lazily so read-only workers don't pay for the ingest modules until a job runs
+    from services.ingest import run_ingest
+
+    holder = _job_holder(job_id)
+    if not acquire_lease(JOB_LEASE_NAME, JOB_LEASE_SECONDS, holder=holder):
+        db = SessionLocal()
+        try:
+            running = db.query(IngestJob.id)\
+                        .filter(IngestJob.status == "running", IngestJob.id != job_id)\
+                        .order_by(IngestJob.id.desc())\
+                        .first()
+        finally:
+            db.close()
+        logging.info(f"Ingest job {job_id} coalesced: another ingest is already running.")
+        _update_job(job_id, status="coalesced", finished_at=datetime.utcnow(),
+                    coalesced_into=running[0] if running else None)
+        return
+
+    progress = JobProgress(job_id)
+    try:
+        _update_job(job_id, status="running", started_at=datetime.utcnow())
+        logging.info(f"Ingest job {job_id} started.")
+        counts = run_ingest(progress=progress.on_fetch, on_stage=progress.on_stage)
+        progress.state["stage"] = "done"
+        _update_job(job_id, status="succeeded", finished_at=datetime.utcnow(), progress=json.dumps(progress.state),
+                    added=counts["added"], duplicates=counts["duplicates"], errors=counts["errors"])
+        logging.info(f"Ingest job {job_id} finished: {counts}")
+    except Exception as e:
+        logging.error(f"Ingest job {job_id} failed: {e}")
+        _update_job(job_id, status="failed", finished_at=datetime.utcnow(), error=str(e))
+    finally:
+        release_lease(JOB_LEASE_NAME, holder=holder) # A no-op if the lease was lost
+
+def enqueue_ingest(trigger="manual"):
+    """Queues an ingest on this worker's background thread and returns (job_id, created).
+
+    If an ingest is already queued or running anywhere, its id is returned instead, so
+    repeated clicks on "Fetch Latest News" don't start duplicate runs. The check and the
+    insert aren't atomic across workers: two workers may both create a job, and the
+    duplicate is then coalesced by the job lease in run_job.
+    """
+    db = SessionLocal()
+    try:
+        active = _find_active_job(db)
+        if active is not None:
+            return active.id, False
+        job_id = _create_job(db, trigger)
+    finally:
+        db.close()
+
+    _get_executor().submit(run_job, job_id)
+    return job_id, True
+
+def run_ingest_job_now(trigger="scheduled"):
+    """Creates a job record and runs it synchronously in the calling thread (used by the scheduler)."""
+    db = SessionLocal()
+    try:
+        job_id = _create_job(db, trigger)
+    finally:
+        db.close()
+    run_job(job_id)
+    return job_id
+
+def get_job(job_id):
+    """Returns a job's status as a dict, or None if it doesn't exist."""
+    db = ReadSessionLocal()
+    try:
+        job = db.get(IngestJob, job_id)
+        return job.to_dict() if job else None
+    finally:
+        db.close()
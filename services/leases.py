@@ -0,0 +1,48 @@
+# DB-backed leases so only one worker/node runs a given job at a time
+
+import logging
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import update, delete, or_
+import os
+
+from database import engine
+from models.job_lease import JobLease
+from services.storage import insert_ignore_statement
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def holder_id():
+    """Identifies this process across hosts and gunicorn workers."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def acquire_lease(name, ttl_seconds, holder=None):
+    """Tries to take (or extend) the named lease; returns True if this holder now owns it.
+
+    The lease row is created if missing, otherwise taken over only when it has expired or is
+    already ours. Both steps are single atomic statements, so exactly one contender wins.
+    """
+    holder = holder or holder_id()
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    table = JobLease.__table__
+    with engine.begin() as conn:
+        inserted = conn.execute(
+            insert_ignore_statement(engine.dialect.name, table),
+            {"name": name, "holder": holder, "acquired_at": now, "expires_at": expires_at}
+        ).rowcount
+        if inserted == 1:
+            return True
+        taken = conn.execute(
+            update(table)
+            .where(table.c.name == name, or_(table.c.expires_at < now, table.c.holder == holder))
+            .values(holder=holder, acquired_at=now, expires_at=expires_at)
+        ).rowcount
+    return taken == 1
+
+def release_lease(name, holder=None):
+    """Gives up the named lease if this holder owns it."""
+    holder = holder or holder_id()
+    table = JobLease.__table__
+    with engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.name == name, table.c.holder == holder))
@@ -0,0 +1,184 @@
+# Counters and histograms for ingest stages and requests, aggregated across workers in Prometheus format
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import os
+
+from config import (
+    METRICS_ENABLED,
+    METRICS_PATH,
+    METRICS_FLUSH_SECONDS,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_FETCH_BUCKETS,
+    METRICS_QUERY_COUNT_BUCKETS
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# name -> (type, help, label names, histogram buckets)
+METRICS = {
+    "news_fetch_duration_seconds": ("histogram", "Provider call latency per provider and category, including retries.",
+                                    ("provider", "category"), METRICS_FETCH_BUCKETS),
+    "news_fetch_response_bytes_total": ("counter", "Response body bytes received from providers.",
+                                        ("provider", "category"), None),
+    "news_fetch_articles_total": ("counter", "Raw articles returned by providers.", ("provider", "category"), None),
+    "news_fetch_errors_total": ("counter", "Provider calls that returned no articles because of an error.",
+                                ("provider", "category", "error_type"), None),
+    "news_ingest_stage_duration_seconds": ("histogram", "Time spent in each ingest stage per batch.",
+                                           ("stage",), METRICS_LATENCY_BUCKETS),
+    "news_ingest_articles_total": ("counter", "Standardized articles by storage outcome.", ("outcome",), None),
+    "news_http_requests_total": ("counter", "HTTP requests handled.", ("route", "method", "status"), None),
+    "news_http_request_duration_seconds": ("histogram", "HTTP request latency per route.",
+                                           ("route", "method"), METRICS_LATENCY_BUCKETS),
+    "news_http_request_sql_queries": ("histogram", "SQL statements executed per HTTP request.",
+                                      ("route",), METRICS_QUERY_COUNT_BUCKETS),
+}
+
+# Unflushed increments of this process: (name, suffix, labels) -> delta
+_pending = {}
+_lock = threading.Lock()
+_flusher_pid = None
+
+# --- Recording ---
+
+def _label_string(names, values):
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, escaped))
+
+def _add(name, suffix, labels, amount):
+    key = (name, suffix, labels)
+    _pending[key] = _pending.get(key, 0) + amount
+
+def inc(name, amount=1, **labels):
+    """Adds amount to a counter."""
+    if not METRICS_ENABLED:
+        return
+    _, _, label_names, _ = METRICS[name]
+    labels = _label_string(label_names, (labels[n] for n in label_names))
+    with _lock:
+        _add(name, "", labels, amount)
+    _ensure_flusher()
+
+def observe(name, value, **labels):
+    """Records one observation in a histogram."""
+    if not METRICS_ENABLED:
+        return
+    _, _, label_names, buckets = METRICS[name]
+    labels = _label_string(label_names, (labels[n] for n in label_names))
+    separator = "," if labels else ""
+    with _lock:
+        for bound in buckets: # Every bucket is written, so each series has the full set
+            _add(name, "_bucket", f'{labels}{separator}le="{bound}"', 1 if value <= bound else 0)
+        _add(name, "_bucket", f'{labels}{separator}le="+Inf"', 1)
+        _add(name, "_sum", labels, value)
+        _add(name, "_count", labels, 1)
+    _ensure_flusher()
+
+@contextmanager
+def timer(name, **labels):
+    """Observes the duration of the with-block in a histogram (also when it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+# --- Storage ---
+# Every worker adds its increments to one small SQLite file (like the page cache), so a
+# scrape of any worker sees the totals of all of them
+
+def _connect():
+    os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+    conn = sqlite3.connect(METRICS_PATH, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS samples (
+                        name TEXT NOT NULL,
+                        suffix TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (name, suffix, labels))""")
+    return conn
+
+def flush():
+    """Adds this process's pending increments to the shared file."""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return
+    try:
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO samples (name, suffix, labels, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (name, suffix, labels) DO UPDATE SET value = value + excluded.value",
+                [(name, suffix, labels, value) for (name, suffix, labels), value in pending.items()]
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.warning(f"Could not flush metrics: {e}")
+        with _lock: # Keep them for the next flush
+            for key, value in pending.items():
+                _pending[key] = _pending.get(key, 0) + value
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        flush()
+
+def _ensure_flusher():
+    """Starts this process's background flush thread on first use (again after a fork)."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+atexit.register(flush)
+
+# --- Exposition ---
+
+def _sort_key(sample):
+    """Orders a histogram's samples per label set as buckets (by bound), then _sum and _count."""
+    suffix, labels, _ = sample
+    base, _, bound = labels.partition('le="')
+    bound = bound.rstrip('"')
+    return (base.rstrip(","), ("_bucket", "_sum", "_count", "").index(suffix),
+            float("inf") if bound == "+Inf" else float(bound or 0))
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def render(extra_lines=()):
+    """Returns all metrics in the Prometheus text exposition format."""
+    flush()
+    rows = {}
+    if os.path.exists(METRICS_PATH):
+        conn = _connect()
+        try:
+            for name, suffix, labels, value in conn.execute(
+                    "SELECT name, suffix, labels, value FROM samples"):
+                rows.setdefault(name, []).append((suffix, labels, value))
+        finally:
+            conn.close()
+
+    lines = []
+    for name, (metric_type, help_text, _, _) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for suffix, labels, value in sorted(rows.get(name, []), key=_sort_key):
+            label_part = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}{suffix}{label_part} {_format_value(value)}")
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
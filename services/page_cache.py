@@ -0,0 +1,141 @@
+# Rendered page cache shared across workers, invalidated by an ingest generation counter
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, session, make_response
+import os
+
+from config import PAGE_CACHE_ENABLED, PAGE_CACHE_PATH, PAGE_CACHE_MAX_AGE, PAGE_CACHE_MAX_ENTRIES
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+_local = threading.local()
+
+# --- Storage ---
+
+def _connect():
+    """Returns this thread's connection to the cache file, creating the schema on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        os.makedirs(os.path.dirname(PAGE_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(PAGE_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO generation (id, value) VALUES (1, 1)")
+        conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+                            key TEXT PRIMARY KEY,
+                            generation INTEGER NOT NULL,
+                            etag TEXT NOT NULL,
+                            mimetype TEXT NOT NULL,
+                            body BLOB NOT NULL,
+                            created_at REAL NOT NULL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_pages_created_at ON pages (created_at)") # Eviction order
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def current_generation():
+    """Returns the data generation; it changes every time ingest stores new articles."""
+    return _connect().execute("SELECT value FROM generation WHERE id = 1").fetchone()[0]
+
+def bump_generation():
+    """Invalidates every cached page. Called by ingest after it commits new articles."""
+    try:
+        conn = _connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE generation SET value = value + 1 WHERE id = 1")
+        generation = conn.execute("SELECT value FROM generation WHERE id = 1").fetchone()[0]
+        conn.execute("DELETE FROM pages WHERE generation < ?", (generation,))
+        conn.execute("COMMIT")
+        logging.info(f"Page cache invalidated (generation {generation}).")
+        return generation
+    except sqlite3.Error as e:
+        logging.error(f"Could not bump page cache generation: {e}")
+        return None
+
+def _get(key, generation):
+    return _connect().execute(
+        "SELECT etag, mimetype, body FROM pages WHERE key = ? AND generation = ?", (key, generation)
+    ).fetchone()
+
+def _put(key, generation, etag, mimetype, body, max_entries=None):
+    """Stores a page, evicting the oldest ones beyond max_entries (PAGE_CACHE_MAX_ENTRIES)."""
+    max_entries = PAGE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO pages (key, generation, etag, mimetype, body, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, generation, etag, mimetype, body, time.time())
+        )
+        conn.execute(
+            "DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (max(1, max_entries),)
+        )
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+# --- View Decorator ---
+
+def _finalize(response, etag):
+    """Adds the strong ETag and Cache-Control, turning a matching If-None-Match into a 304."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={PAGE_CACHE_MAX_AGE}"
+    return response.make_conditional(request)
+
+def _cache_key(params):
+    """The request path plus only the query parameters the view reads, in a fixed order.
+
+    Other parameters (tracking tags, cache busters) can't change the page, so they must not
+    create entries of their own.
+    """
+    query = sorted((name, value) for name in params for value in request.args.getlist(name))
+    return f"{request.path}?{urlencode(query)}" if query else request.path
+
+def cached_page(view=None, params=()):
+    """Serves a GET view from the shared page cache for the current data generation.
+
+    Use as @cached_page, or @cached_page(params=("page",)) for a view that reads query
+    parameters: only those are part of the cache key. Cache hits (and 304s for matching
+    ETags) never open a session on the news database. Requests carrying flash messages
+    bypass the cache so the messages are rendered.
+    """
+    if view is None:
+        return lambda view: cached_page(view, params)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not PAGE_CACHE_ENABLED or request.method != "GET" or "_flashes" in session:
+            return view(*args, **kwargs)
+
+        key = _cache_key(params)
+        try:
+            generation = current_generation()
+            cached = _get(key, generation)
+        except sqlite3.Error as e:
+            logging.error(f"Page cache unavailable, rendering {key} directly: {e}")
+            return view(*args, **kwargs)
+
+        if cached:
+            etag, mimetype, body = cached
+            return _finalize(make_response(body, 200, {"Content-Type": mimetype}), etag)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+        body = response.get_data()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        try:
+            _put(key, generation, etag, response.content_type, body)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not store {key} in the page cache: {e}")
+        return _finalize(response, etag)
+    return wrapper
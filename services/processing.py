@@ -2,63 +2,34 @@
 
 import logging
 from datetime import datetime
-from dateutil import parser as date_parser # Use dateutil for robust parsing
-import sys
-import os
-
-# Ensure src directory is in path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from database import SessionLocal, engine, Base
 from models.news_article import NewsArticle
 from config import CATEGORIES # Import categories if needed for assignment
+from services.dates import parse_datetime
+from services.dedup import url_hash, find_existing_hashes
+from services.storage import (
+    article_row,
+    content_row,
+    bulk_insert_articles,
+    bulk_insert_article_contents,
+    bulk_insert_simhash_bands
+)
+from services.clustering import assign_story_keys
+from services.page_cache import bump_generation
+from services.search import index_new_articles
+from services.trending import record_titles
+from services.feeds import fan_out
+from services.snapshots import publish_snapshots
+from services import metrics
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# --- Helper Functions ---
-
-def parse_datetime(date_string):
-    """Parses various date string formats into UTC datetime objects."""
-    if not date_string:
-        return None
-    try:
-        # Use dateutil.parser.isoparse for ISO 8601 formats primarily
-        # It handles timezone offsets like Z or +00:00 correctly
-        dt = date_parser.isoparse(date_string)
-        # Ensure the datetime object is timezone-aware and convert to UTC
-        if dt.tzinfo is None:
-            # If no timezone info, assume UTC (or make a different assumption if needed)
-            # This is less ideal; APIs should provide timezone info.
-            # dt = dt.replace(tzinfo=pytz.utc)
-            # For simplicity without adding pytz dependency here, we might rely on APIs providing TZ
-            # Or just store as naive, assuming UTC if not specified
-            logging.warning(f"Parsed datetime '{date_string}' has no timezone info. Assuming UTC.")
-            # Let\s just return the naive datetime for now, assuming DB stores it okay.
-            # Or better, use default=datetime.utcnow in the model if parsing fails.
-            return dt # Return naive
-        else:
-            return dt.astimezone(datetime.timezone.utc)
-    except ValueError:
-        try:
-            # Fallback to generic dateutil.parser.parse for other formats
-            dt = date_parser.parse(date_string)
-            if dt.tzinfo is None:
-                logging.warning(f"Fallback parsed datetime '{date_string}' has no timezone info. Assuming UTC.")
-                return dt # Return naive
-            else:
-                return dt.astimezone(datetime.timezone.utc)
-        except Exception as e:
-            logging.error(f"Could not parse date string: {date_string} - Error: {e}")
-            return None
-    except Exception as e:
-        logging.error(f"Could not parse date string (isoparse): {date_string} - Error: {e}")
-        return None
-
 # --- Standardization Functions ---
 
 def standardize_newsdata(article, query_category):
     """Standardizes an article from NewsData.io."""
-    published_dt = parse_datetime(article.get("pubDate"))
+    published_dt = parse_datetime(article.get("pubDate"), "NewsData.io")
     if not published_dt:
         published_dt = datetime.utcnow() # Fallback
 
@@ -77,7 +48,7 @@ def standardize_newsdata(article, query_category):
 
 def standardize_worldnews(article, query_category):
     """Standardizes an article from World News API."""
-    published_dt = parse_datetime(article.get("publish_date"))
+    published_dt = parse_datetime(article.get("publish_date"), "WorldNewsAPI")
     if not published_dt:
         published_dt = datetime.utcnow() # Fallback
 
@@ -96,7 +67,7 @@ def standardize_worldnews(article, query_category):
 
 def standardize_gnews(article, query_category):
     """Standardizes an article from GNews API."""
-    published_dt = parse_datetime(article.get("publishedAt"))
+    published_dt = parse_datetime(article.get("publishedAt"), "GNews")
     if not published_dt:
         published_dt = datetime.utcnow() # Fallback
 
@@ -115,94 +86,113 @@ def standardize_gnews(article, query_category):
 
 # --- Main Processing Function ---
 
-def process_and_store_articles(raw_articles):
-    """Processes raw articles, standardizes them, and stores unique ones in the DB."""
-    if not raw_articles:
-        logging.info("No articles fetched to process.")
-        return
+STANDARDIZATION_MAP = {
+    "NewsData.io": standardize_newsdata,
+    "WorldNewsAPI": standardize_worldnews,
+    "GNews": standardize_gnews
+}
 
-    db = SessionLocal()
-    added_count = 0
-    skipped_count = 0
-    processed_urls = set(item[0] for item in db.query(NewsArticle.url).all()) # Load existing URLs
+def standardize_articles(raw_articles):
+    """Standardizes raw API articles, dropping invalid ones and tagging each with its url_hash."""
+    with metrics.timer("news_ingest_stage_duration_seconds", stage="standardize"):
+        return _standardize_articles(raw_articles)
 
-    standardization_map = {
-        "NewsData.io": standardize_newsdata,
-        "WorldNewsAPI": standardize_worldnews,
-        "GNews": standardize_gnews
-    }
+def _standardize_articles(raw_articles):
+    standardized = []
+    for raw_article in raw_articles:
+        api_source = raw_article.get("_api_source")
+        query_category = raw_article.get("_query_category", "general") # Get category used in query
 
-    try:
-        for raw_article in raw_articles:
-            api_source = raw_article.get("_api_source")
-            query_category = raw_article.get("_query_category", "general") # Get category used in query
+        if not api_source or api_source not in STANDARDIZATION_MAP:
+            logging.warning(f"Skipping article with unknown or unsupported API source: {api_source}")
+            continue
 
-            if not api_source or api_source not in standardization_map:
-                logging.warning(f"Skipping article with unknown or unsupported API source: {api_source}")
-                continue
+        standardizer = STANDARDIZATION_MAP[api_source]
+        try:
+            standardized_data = standardizer(raw_article, query_category)
+        except Exception as e:
+            logging.error(f"Failed to standardize article from {api_source}: {e} - Data: {raw_article}")
+            continue
 
-            standardizer = standardization_map[api_source]
-            try:
-                standardized_data = standardizer(raw_article, query_category)
-            except Exception as e:
-                logging.error(f"Failed to standardize article from {api_source}: {e} - Data: {raw_article}")
-                continue
+        # Basic validation
+        if not standardized_data.get("url") or not standardized_data.get("title"):
+            logging.warning(f"Skipping article from {api_source} due to missing URL or title.")
+            continue
 
-            # Basic validation
-            if not standardized_data.get("url") or not standardized_data.get("title"):
-                logging.warning(f"Skipping article from {api_source} due to missing URL or title.")
-                continue
+        standardized_data["category"] = standardized_data.get("category") or query_category # Use standardized or query category
+        standardized_data["url_hash"] = url_hash(standardized_data["url"])
+        standardized.append(standardized_data)
+    return standardized
 
-            article_url = standardized_data["url"]
+def process_and_store_articles(raw_articles):
+    """Processes raw articles, standardizes them, and stores unique ones in the DB."""
+    if not raw_articles:
+        logging.info("No articles fetched to process.")
+        return
+    try:
+        standardized_articles = standardize_articles(raw_articles)
+    except Exception as e:
+        logging.error(f"An error occurred during article processing: {e}")
+        return
+    counts = store_standardized_articles(standardized_articles)
+    if counts is not None:
+        publish_snapshots() # Opt-in (SNAPSHOTS_ENABLED); headlines age out even when nothing was added
+    return counts
 
-            # Check for duplicates using the in-memory set and database check
-            if article_url in processed_urls:
+def store_standardized_articles(standardized_articles):
+    """Dedups, clusters and stores one batch of standardized articles; returns the counts.
+
+    Each batch is committed on its own, so a run that fails later keeps what it stored.
+    Returns None if the batch could not be prepared (nothing was written).
+    """
+    db = SessionLocal()
+    try:
+        # Check only this batch's hashes against the DB; the set also catches duplicates within the batch
+        with metrics.timer("news_ingest_stage_duration_seconds", stage="dedup_lookup"):
+            seen_hashes = find_existing_hashes(db, [a["url_hash"] for a in standardized_articles])
+
+        skipped_count = 0
+        rows = []
+        content_rows = []
+        fetched_at = datetime.utcnow()
+        for standardized_data in standardized_articles:
+            if standardized_data["url_hash"] in seen_hashes:
                 skipped_count += 1
                 continue
+            seen_hashes.add(standardized_data["url_hash"]) # Prevent adding duplicates from the same batch
+            rows.append(article_row(standardized_data, fetched_at))
+            content_rows.append(content_row(standardized_data))
 
-            # Check DB again just in case (though set should be sufficient if loaded correctly)
-            # exists = db.query(NewsArticle.id).filter(NewsArticle.url == article_url).first()
-            # if exists:
-            #     skipped_count += 1
-            #     processed_urls.add(article_url) # Ensure set is updated
-            #     continue
-
-            # Create NewsArticle object
-            try:
-                news_item = NewsArticle(
-                    title=standardized_data["title"],
-                    description=standardized_data.get("description"),
-                    content=standardized_data.get("content"),
-                    url=article_url,
-                    image_url=standardized_data.get("image_url"),
-                    published_at=standardized_data["published_at"],
-                    source_name=standardized_data.get("source_name"),
-                    source_url=standardized_data.get("source_url"),
-                    category=standardized_data.get("category", query_category), # Use standardized or query category
-                    api_source=api_source,
-                    fetched_at=datetime.utcnow()
-                )
-                db.add(news_item)
-                processed_urls.add(article_url) # Add to set to prevent adding duplicates from the same batch
-                added_count += 1
-            except Exception as e:
-                 logging.error(f"Error creating NewsArticle object for URL {article_url}: {e}")
-                 skipped_count += 1 # Count as skipped if creation fails
-
-            # Commit periodically to avoid large transactions (optional)
-            # if added_count % 50 == 0:
-            #     db.commit()
-            #     logging.info("Committed batch of 50 articles.")
-
-        db.commit() # Commit any remaining changes
-        logging.info(f"Processing complete. Added: {added_count}, Skipped (duplicates/errors): {skipped_count}")
-
+        # Group near-duplicate stories from different providers/URLs under one story_key
+        with metrics.timer("news_ingest_stage_duration_seconds", stage="cluster"):
+            band_rows = assign_story_keys(db, rows, {c["url_hash"]: c["description"] for c in content_rows})
     except Exception as e:
         logging.error(f"An error occurred during article processing: {e}")
-        db.rollback() # Rollback in case of error during the loop
+        return
     finally:
         db.close()
 
+    # Chunked INSERT-or-ignore transactions; rows raced in by another writer count as duplicates
+    with metrics.timer("news_ingest_stage_duration_seconds", stage="commit"):
+        # Content first, so a stored article always has its body (and the search index sees it)
+        bulk_insert_article_contents(content_rows)
+        counts = bulk_insert_articles(rows)
+        bulk_insert_simhash_bands(band_rows)
+    if counts["added"]:
+        with metrics.timer("news_ingest_stage_duration_seconds", stage="index"):
+            index_new_articles() # Only rows above the search index watermark are read
+        with metrics.timer("news_ingest_stage_duration_seconds", stage="trending"):
+            record_titles(rows) # Counts only this batch's headlines into the trend sketches
+        with metrics.timer("news_ingest_stage_duration_seconds", stage="fan_out"):
+            fan_out(rows) # Copies the new articles into the feeds of their (materialized) subscribers
+        bump_generation() # Cached pages now show stale headlines
+    counts["duplicates"] += skipped_count
+    for outcome in ("added", "duplicates", "errors"):
+        metrics.inc("news_ingest_articles_total", counts[outcome], outcome=outcome)
+    logging.info(f"Processing complete. Added: {counts['added']}, "
+                 f"Skipped (duplicates): {counts['duplicates']}, Errors: {counts['errors']}")
+    return counts
+
 # Example of running the processing directly (for testing)
 # if __name__ == "__main__":
 #     # Create dummy data matching the output of fetch_all_news()
@@ -0,0 +1,92 @@
+# Read-side queries for the web pages
+
+from sqlalchemy import select, union_all, func, cast, String
+
+from models.news_article import NewsArticle, ArticleContent
+from config import CATEGORIES, HEADLINES_PER_CATEGORY, HEADLINE_STORY_OVERFETCH
+
+def get_headlines(db, since, per_category=HEADLINES_PER_CATEGORY, categories=CATEGORIES):
+    """Returns {category: [headline rows]} for articles fetched since the given time.
+
+    Candidates come from one scan per category of the
+    (category, published_at, id, fetched_at, story_key) index, newest first, which stops at
+    the first per_category * HEADLINE_STORY_OVERFETCH entries fetched since then; fetched_at
+    is checked in the index, without touching table rows. Recently fetched articles are the
+    recently published ones, so the scan stays that short however many articles a day brings;
+    only a category with fewer recent articles than that is read further back.
+    Window functions over that small set keep the newest report of each story cluster and
+    then the newest per_category stories per category. Only the winning rows are loaded,
+    and only the columns the index page renders (the stored summary; the content table is never read).
+    """
+    candidate_limit = per_category * HEADLINE_STORY_OVERFETCH
+    per_category_candidates = [
+        select(NewsArticle.id, NewsArticle.category, NewsArticle.published_at, NewsArticle.story_key)
+        .where(NewsArticle.category == category, NewsArticle.fetched_at >= since)
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+        .limit(candidate_limit)
+        .subquery()
+        for category in categories
+    ]
+    if not per_category_candidates:
+        return {}
+    candidates = union_all(*(select(sub) for sub in per_category_candidates)).subquery("candidates")
+
+    story = func.coalesce(candidates.c.story_key, cast(candidates.c.id, String))
+    stories = select(
+        candidates.c.id,
+        candidates.c.category,
+        candidates.c.published_at,
+        func.row_number().over(
+            partition_by=story,
+            order_by=(candidates.c.published_at.desc(), candidates.c.id.desc())
+        ).label("story_rank")
+    ).subquery("stories")
+
+    ranked = select(
+        stories.c.id,
+        func.row_number().over(
+            partition_by=stories.c.category,
+            order_by=(stories.c.published_at.desc(), stories.c.id.desc())
+        ).label("category_rank")
+    ).where(stories.c.story_rank == 1).subquery("ranked")
+
+    top_ids = select(ranked.c.id).where(ranked.c.category_rank <= per_category)
+
+    rows = db.execute(
+        select(
+            NewsArticle.id,
+            NewsArticle.title,
+            NewsArticle.summary,
+            NewsArticle.url,
+            NewsArticle.source_name,
+            NewsArticle.source_url,
+            NewsArticle.published_at,
+            NewsArticle.category
+        )
+        .where(NewsArticle.id.in_(top_ids))
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+    ).all()
+
+    # Keep the configured category order and drop empty categories
+    headlines = {category: [] for category in categories}
+    for row in rows:
+        headlines[row.category].append(row)
+    return {category: items for category, items in headlines.items() if items}
+
+def get_article(db, article_id):
+    """Returns one article with its full text as a mapping, or None if it doesn't exist.
+
+    The hot row is joined with its content row by primary key; articles moved out by
+    retention are read back from the archive.
+    """
+    row = db.execute(
+        select(NewsArticle.__table__, ArticleContent.description, ArticleContent.content, ArticleContent.image_url)
+        .outerjoin(ArticleContent, ArticleContent.url_hash == NewsArticle.url_hash)
+        .where(NewsArticle.id == article_id)
+    ).mappings().first()
+    if row is None:
+        # Moved out of the hot table by retention; imported lazily so read-only workers don't
+        # pay for the retention module until an archived article is asked for
+        from services.retention import get_archived_article
+        return get_archived_article(db, article_id)
+    return row
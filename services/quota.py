@@ -0,0 +1,218 @@
+# Provider quota and health layer: daily quotas, rate limiting, 429 backoff and circuit breakers
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, update
+import requests
+
+from database import engine
+from models.provider_quota import ProviderQuotaUsage
+from config import (
+    PROVIDER_QUOTAS,
+    QUOTA_MAX_ATTEMPTS,
+    QUOTA_BACKOFF_BASE_SECONDS,
+    QUOTA_MAX_RETRY_WAIT_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN_SECONDS
+)
+from services.http_client import cached_get, get_fresh
+from services.storage import insert_ignore_statement
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Statuses that count against a provider's health (auth failures repeat on every call too)
+FAILURE_STATUSES = {401, 403, 429}
+
+class ProviderUnavailable(Exception):
+    """Raised instead of making a request when a provider is out of quota or its circuit is open."""
+
+# --- Rate Limiting ---
+
+class TokenBucket:
+    """Paces requests to rate_per_second on average, allowing bursts of up to burst requests."""
+
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# --- Circuit Breaker ---
+
+class CircuitBreaker:
+    """Skips a provider for a cooldown after repeated failures, then lets one trial call through."""
+
+    def __init__(self, name, threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half-open"
+
+    def before_call(self):
+        """Raises ProviderUnavailable while the circuit is open (or a half-open trial is running)."""
+        with self.lock:
+            state = self.state
+            if state == "open":
+                remaining = self.open_until - time.monotonic()
+                raise ProviderUnavailable(f"{self.name} circuit open for another {remaining:.0f}s")
+            if state == "half-open":
+                if self.trial_in_flight:
+                    raise ProviderUnavailable(f"{self.name} circuit half-open; trial call in progress")
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            if self.open_until:
+                logging.info(f"[{self.name}] Circuit closed: provider is healthy again.")
+            self.failures = 0
+            self.open_until = 0.0
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """Ends a half-open trial without a verdict (the call was skipped for another reason)."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self, open_for=None):
+        """Counts a failure; opens the circuit at the threshold, or right away if open_for is given."""
+        with self.lock:
+            self.failures += 1
+            half_open_trial = self.trial_in_flight
+            self.trial_in_flight = False
+            if open_for is None and not half_open_trial and self.failures < self.threshold:
+                return
+            duration = self.cooldown if open_for is None else open_for
+            self.open_until = time.monotonic() + duration
+            logging.warning(f"[{self.name}] Circuit opened for {duration:.0f}s after {self.failures} failure(s).")
+
+_buckets = {name: TokenBucket(q["rate_per_second"], q["burst"]) for name, q in PROVIDER_QUOTAS.items()}
+_breakers = {name: CircuitBreaker(name) for name in PROVIDER_QUOTAS}
+
+# --- Persisted Daily Quota ---
+
+def _today():
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+def reserve_request(provider, bind=None):
+    """Atomically counts one request against today's quota; returns False if it is used up."""
+    limit = PROVIDER_QUOTAS.get(provider, {}).get("daily_limit")
+    if limit is None:
+        return True
+    bind = bind if bind is not None else engine
+    table = ProviderQuotaUsage.__table__
+    day = _today()
+    with bind.begin() as conn:
+        conn.execute(insert_ignore_statement(bind.dialect.name, table), {"provider": provider, "day": day, "used": 0})
+        reserved = conn.execute(
+            update(table)
+            .where(table.c.provider == provider, table.c.day == day, table.c.used < limit)
+            .values(used=table.c.used + 1)
+        ).rowcount
+    return reserved == 1
+
+def quota_status(bind=None):
+    """Returns {provider: {"used", "daily_limit", "circuit"}} for today."""
+    bind = bind if bind is not None else engine
+    table = ProviderQuotaUsage.__table__
+    with bind.connect() as conn:
+        used = dict(conn.execute(select(table.c.provider, table.c.used).where(table.c.day == _today())).all())
+    return {
+        provider: {"used": used.get(provider, 0), "daily_limit": quota["daily_limit"], "circuit": _breakers[provider].state}
+        for provider, quota in PROVIDER_QUOTAS.items()
+    }
+
+# --- Requests ---
+
+def _retry_after_seconds(response):
+    """Parses Retry-After (delta seconds or an HTTP date); returns None if absent or invalid."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def provider_get(provider, url, params=None):
+    """GETs a provider URL within its quota, rate limit and circuit breaker.
+
+    Fresh cached responses are returned without touching the quota. Otherwise each
+    attempt reserves one request from the persisted daily quota and a token from the
+    provider's bucket. 429s are retried after Retry-After (or exponential backoff with
+    jitter); a longer Retry-After opens the circuit for that long instead of waiting.
+    Raises ProviderUnavailable when the call is skipped, and requests exceptions as usual.
+    """
+    cached = get_fresh(url, params)
+    if cached is not None:
+        logging.info(f"HTTP cache hit (fresh) for {url}")
+        return cached
+
+    breaker = _breakers.get(provider)
+    if breaker:
+        breaker.before_call()
+    bucket = _buckets.get(provider)
+    for attempt in range(QUOTA_MAX_ATTEMPTS):
+        if not reserve_request(provider):
+            if breaker:
+                breaker.release_trial() # Not a health problem
+            raise ProviderUnavailable(f"{provider} daily quota of {PROVIDER_QUOTAS[provider]['daily_limit']} requests used up")
+        if bucket:
+            bucket.acquire()
+
+        try:
+            response = cached_get(url, params=params)
+        except requests.exceptions.RequestException:
+            if breaker:
+                breaker.record_failure()
+            raise
+
+        if response.status_code == 429:
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = QUOTA_BACKOFF_BASE_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if delay > QUOTA_MAX_RETRY_WAIT_SECONDS:
+                if breaker:
+                    breaker.record_failure(open_for=delay)
+                raise ProviderUnavailable(f"{provider} rate limited us for {delay:.0f}s")
+            if attempt + 1 < QUOTA_MAX_ATTEMPTS:
+                logging.warning(f"[{provider}] 429 Too Many Requests; retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+        if breaker:
+            if response.status_code >= 500 or response.status_code in FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
@@ -0,0 +1,209 @@
+# Retention: move aged articles into compressed daily archive files and reclaim their space
+
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+import os
+
+from database import engine
+from models.news_article import NewsArticle, ArticleContent, SimhashBand
+from models.archived_article import ArchivedArticle
+from config import (
+    RETENTION_HOT_DAYS,
+    RETENTION_BATCH_SIZE,
+    RETENTION_VACUUM_PAGES_PER_STEP,
+    ARCHIVE_FOLDER_PATH,
+    ARCHIVE_BLOCK_SIZE,
+    ARCHIVE_COMPRESSION_LEVEL
+)
+from services.storage import insert_ignore_statement
+from services.search import remove_from_index
+from services.feeds import trim_feeds
+from services.snapshots import publish_snapshots
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Every column of the article and its content row is archived, so an archived article renders
+# exactly like a live one
+ARCHIVE_COLUMNS = [column.name for column in NewsArticle.__table__.columns]
+ARCHIVE_CONTENT_COLUMNS = [column.name for column in ArticleContent.__table__.columns if column.name != "url_hash"]
+DATETIME_COLUMNS = ("published_at", "fetched_at")
+
+# --- Archive Files ---
+# Layout: ARCHIVE_FOLDER_PATH/YYYY/MM/YYYY-MM-DD.ndjson.gz, partitioned by published date.
+# Each file is a series of concatenated gzip members ("blocks") of up to ARCHIVE_BLOCK_SIZE
+# NDJSON lines; together they still form a valid .gz file (zcat reads the whole day), and
+# archived_articles records each article's block offset so one article costs one block read.
+
+def archive_path_for(published_at):
+    return published_at.strftime("%Y/%m/%Y-%m-%d.ndjson.gz")
+
+def _encode(row):
+    record = dict(row)
+    for column in DATETIME_COLUMNS:
+        if record.get(column) is not None:
+            record[column] = record[column].isoformat()
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+def _decode(line):
+    record = json.loads(line)
+    for column in DATETIME_COLUMNS:
+        if record.get(column) is not None:
+            record[column] = datetime.fromisoformat(record[column])
+    return record
+
+def _append_blocks(relative_path, rows):
+    """Appends rows to an archive file in gzip blocks and returns their offset index entries."""
+    path = os.path.join(ARCHIVE_FOLDER_PATH, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entries = []
+    with open(path, "ab") as archive:
+        offset = archive.seek(0, os.SEEK_END)
+        for start in range(0, len(rows), ARCHIVE_BLOCK_SIZE):
+            block_rows = rows[start:start + ARCHIVE_BLOCK_SIZE]
+            payload = "".join(_encode(row) + "\n" for row in block_rows).encode("utf-8")
+            block = gzip.compress(payload, compresslevel=ARCHIVE_COMPRESSION_LEVEL, mtime=0)
+            archive.write(block)
+            entries.extend({
+                "id": row["id"],
+                "url_hash": row["url_hash"],
+                "published_at": row["published_at"],
+                "archive_path": relative_path,
+                "block_offset": offset,
+                "block_length": len(block)
+            } for row in block_rows)
+            offset += len(block)
+        archive.flush()
+        os.fsync(archive.fileno()) # The rows are deleted from the DB right after this
+    return entries
+
+def read_archived_article(archive_path, block_offset, block_length, article_id):
+    """Reads one article back from its archive block; returns a dict or None."""
+    with open(os.path.join(ARCHIVE_FOLDER_PATH, archive_path), "rb") as archive:
+        archive.seek(block_offset)
+        block = archive.read(block_length)
+    for line in gzip.decompress(block).decode("utf-8").splitlines():
+        record = _decode(line)
+        if record["id"] == article_id:
+            return record
+    return None
+
+def get_archived_article(db, article_id):
+    """Returns an archived article as a dict of NewsArticle columns, or None if it isn't archived."""
+    entry = db.get(ArchivedArticle, article_id)
+    if entry is None:
+        return None
+    try:
+        return read_archived_article(entry.archive_path, entry.block_offset, entry.block_length, article_id)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not read archived article {article_id} from {entry.archive_path}: {e}")
+        return None
+
+# --- Archiving ---
+
+def archive_batch(cutoff, batch_size=RETENTION_BATCH_SIZE, bind=None):
+    """Moves up to batch_size articles published before cutoff to the archive; returns how many.
+
+    Rows are written (and fsynced) to the archive files first, then one short transaction
+    records their offsets, drops them from the search index and deletes them with their
+    content rows and LSH bands. If that transaction fails, the rows stay live and the blocks just written are
+    unreferenced; the next run archives the rows again.
+    """
+    bind = bind if bind is not None else engine
+    columns = [NewsArticle.__table__.c[name] for name in ARCHIVE_COLUMNS]
+    columns += [ArticleContent.__table__.c[name] for name in ARCHIVE_CONTENT_COLUMNS]
+    with bind.connect() as conn:
+        # Oldest first, straight off the (published_at, id) index
+        rows = conn.execute(
+            select(*columns)
+            .outerjoin(ArticleContent, ArticleContent.url_hash == NewsArticle.url_hash)
+            .where(NewsArticle.published_at < cutoff)
+            .order_by(NewsArticle.published_at, NewsArticle.id)
+            .limit(batch_size)
+        ).mappings().all()
+    if not rows:
+        return 0
+
+    partitions = {}
+    for row in rows:
+        partitions.setdefault(archive_path_for(row["published_at"]), []).append(row)
+    entries = []
+    for relative_path, partition_rows in partitions.items():
+        entries.extend(_append_blocks(relative_path, partition_rows))
+
+    ids = [row["id"] for row in rows]
+    url_hashes = [row["url_hash"] for row in rows if row["url_hash"]]
+    with bind.begin() as conn:
+        conn.execute(insert_ignore_statement(bind.dialect.name, ArchivedArticle.__table__), entries)
+        remove_from_index(conn, ids)
+        conn.execute(delete(NewsArticle.__table__).where(NewsArticle.id.in_(ids)))
+        if url_hashes:
+            conn.execute(delete(ArticleContent.__table__).where(ArticleContent.url_hash.in_(url_hashes)))
+            conn.execute(delete(SimhashBand.__table__).where(SimhashBand.url_hash.in_(url_hashes)))
+    return len(rows)
+
+def incremental_vacuum(bind=None, pages_per_step=RETENTION_VACUUM_PAGES_PER_STEP):
+    """Returns free pages to the filesystem in small steps; returns how many pages were freed.
+
+    Only works on SQLite databases in auto_vacuum=INCREMENTAL mode (see
+    enable_incremental_vacuum). Each step is its own short transaction, so readers and
+    ingest are never blocked for long, unlike a full VACUUM.
+    """
+    bind = bind if bind is not None else engine
+    if bind.dialect.name != "sqlite":
+        return 0
+    with bind.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            logging.info("Skipping incremental vacuum: auto_vacuum is not INCREMENTAL "
+                         "(run 'flask enable-incremental-vacuum' once to convert the database).")
+            return 0
+    freed = 0
+    while True:
+        with bind.begin() as conn:
+            free_before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if not free_before:
+                break
+            conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages_per_step)})")
+            step_freed = free_before - conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if step_freed <= 0:
+            break
+        freed += step_freed
+    return freed
+
+def enable_incremental_vacuum(bind=None):
+    """One-time conversion of an existing SQLite database to auto_vacuum=INCREMENTAL.
+
+    Needs a full VACUUM, which locks the database while it rewrites the file: run it
+    during a quiet period. New databases are created in incremental mode already.
+    """
+    bind = bind if bind is not None else engine
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            return False
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+    logging.info("Database converted to auto_vacuum=INCREMENTAL.")
+    return True
+
+def run_retention(hot_days=RETENTION_HOT_DAYS, batch_size=RETENTION_BATCH_SIZE, bind=None):
+    """Archives every article older than hot_days, batch by batch, trims old feed entries, then reclaims the space.
+
+    The snapshot is republished afterwards, so the published pages never show an archived article.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=hot_days)
+    archived = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size, bind)
+        archived += moved
+        if moved < batch_size:
+            break
+    trimmed = trim_feeds(bind=bind) # Personalized feed entries age out on their own schedule
+    freed = incremental_vacuum(bind) if archived or trimmed else 0
+    logging.info(f"Retention complete: archived {archived} articles published before {cutoff:%Y-%m-%d}, "
+                 f"trimmed {trimmed} feed entries, freed {freed} database pages.")
+    publish_snapshots() # Opt-in (SNAPSHOTS_ENABLED)
+    return {"archived": archived, "feed_items_trimmed": trimmed, "freed_pages": freed}
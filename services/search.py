@@ -0,0 +1,167 @@
+# Full-text search over articles, backed by an SQLite FTS5 index
+
+import base64
+import json
+import logging
+from markupsafe import Markup, escape
+from sqlalchemy import text, bindparam, DateTime
+
+from database import engine
+from config import SEARCH_RESULTS_PER_PAGE, SEARCH_SNIPPET_TOKENS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Column weights for bm25(): title matches count most, then description, then body text
+BM25_WEIGHTS = "10.0, 3.0, 1.0"
+# The indexed text: title from the hot table, description and body from the content table.
+# The FTS table reads snippets from this view (its external content) by article id.
+SEARCH_DOCS_VIEW = "article_search_docs"
+# Control characters used as snippet highlight markers, swapped for <mark> after escaping
+_MARK_OPEN = "\x02"
+_MARK_CLOSE = "\x03"
+
+# --- Index Maintenance ---
+
+def search_available(bind=None):
+    """FTS5 search is only available on SQLite databases."""
+    bind = bind if bind is not None else engine
+    return bind.dialect.name == "sqlite"
+
+def ensure_search_index(bind=None):
+    """Creates the FTS5 table (external content over the search docs view) and its indexing watermark.
+
+    An index built by older versions over the articles table itself is dropped and its
+    watermark reset, so index_new_articles rebuilds it from the view.
+    """
+    bind = bind if bind is not None else engine
+    if not search_available(bind):
+        return
+    with bind.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIEW IF NOT EXISTS {SEARCH_DOCS_VIEW} AS "
+            "SELECT a.id AS id, a.title AS title, c.description AS description, c.content AS content "
+            "FROM articles a LEFT JOIN article_contents c ON c.url_hash = a.url_hash"
+        ))
+        existing = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'")).scalar()
+        if existing and f"content='{SEARCH_DOCS_VIEW}'" not in existing:
+            conn.execute(text("DROP TABLE articles_fts"))
+            conn.execute(text("UPDATE search_index_state SET last_indexed_id = 0 WHERE id = 1"))
+            logging.info("Dropped the search index built over the articles table; it is rebuilt from the content table.")
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            f"title, description, content, content='{SEARCH_DOCS_VIEW}', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        ))
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_index_state ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), last_indexed_id INTEGER NOT NULL)"
+        ))
+        conn.execute(text("INSERT OR IGNORE INTO search_index_state (id, last_indexed_id) VALUES (1, 0)"))
+
+def index_new_articles(bind=None):
+    """Adds articles stored since the last run to the FTS index and returns how many were added.
+
+    Only rows above the last indexed id are read, so each ingest pays for its own rows.
+    The watermark update comes first to take SQLite's write lock before reading it,
+    so two concurrent ingests can't index the same rows twice.
+    """
+    bind = bind if bind is not None else engine
+    if not search_available(bind):
+        return 0
+    with bind.begin() as conn:
+        conn.execute(text("UPDATE search_index_state SET last_indexed_id = last_indexed_id WHERE id = 1"))
+        last_id = conn.execute(text("SELECT last_indexed_id FROM search_index_state WHERE id = 1")).scalar()
+        max_id = conn.execute(text("SELECT max(id) FROM articles WHERE id > :last_id"), {"last_id": last_id}).scalar()
+        if max_id is None:
+            return 0
+        indexed = conn.execute(text(
+            "INSERT INTO articles_fts (rowid, title, description, content) "
+            f"SELECT id, title, description, content FROM {SEARCH_DOCS_VIEW} WHERE id > :last_id AND id <= :max_id"
+        ), {"last_id": last_id, "max_id": max_id}).rowcount
+        conn.execute(text("UPDATE search_index_state SET last_indexed_id = :max_id WHERE id = 1"), {"max_id": max_id})
+    logging.info(f"Indexed {indexed} new articles for search.")
+    return indexed
+
+def remove_from_index(conn, article_ids):
+    """Drops articles from the FTS index; call in the same transaction that deletes their rows.
+
+    An external-content FTS5 table must be given the exact indexed values to delete, so this
+    reads them from the search docs view and must run before the article and content rows
+    are deleted. Rows above the
+    indexing watermark were never indexed and are skipped.
+    """
+    if not article_ids or not search_available(conn):
+        return
+    conn.execute(text(
+        "INSERT INTO articles_fts (articles_fts, rowid, title, description, content) "
+        f"SELECT 'delete', id, title, description, content FROM {SEARCH_DOCS_VIEW} "
+        "WHERE id IN :ids AND id <= (SELECT last_indexed_id FROM search_index_state WHERE id = 1)"
+    ).bindparams(bindparam("ids", expanding=True)), {"ids": list(article_ids)})
+
+# --- Querying ---
+
+def build_match_query(user_query):
+    """Turns free text into an FTS5 query: every word must match, operators are taken literally."""
+    terms = [term.replace('"', '""') for term in user_query.split()]
+    return " ".join(f'"{term}"' for term in terms if term.strip('"'))
+
+def encode_cursor(rank, article_id):
+    return base64.urlsafe_b64encode(json.dumps([rank, article_id]).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    """Returns (rank, id) from a cursor string, or None if it is malformed."""
+    try:
+        rank, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(rank), int(article_id)
+    except Exception:
+        return None
+
+def _highlight(snippet):
+    return Markup(str(escape(snippet or "")).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>"))
+
+def search_articles(db, user_query, category=None, since=None, until=None, cursor=None, limit=SEARCH_RESULTS_PER_PAGE):
+    """Runs a ranked full-text search and returns (results, next_cursor).
+
+    Results are ordered by bm25 relevance, then id, and paginated with a keyset cursor on
+    that pair, so later pages cost the same as the first. Each result carries an
+    HTML-safe snippet with the matching terms wrapped in <mark>.
+    """
+    match = build_match_query(user_query)
+    if not match:
+        return [], None
+
+    rank = f"bm25(articles_fts, {BM25_WEIGHTS})"
+    conditions = ["articles_fts MATCH :match"]
+    params = {"match": match, "limit": limit + 1, "mark_open": _MARK_OPEN, "mark_close": _MARK_CLOSE,
+              "snippet_tokens": SEARCH_SNIPPET_TOKENS}
+    if category:
+        conditions.append("a.category = :category")
+        params["category"] = category
+    if since:
+        conditions.append("a.published_at >= :since")
+        params["since"] = since
+    if until:
+        conditions.append("a.published_at < :until")
+        params["until"] = until
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        conditions.append(f"({rank} > :after_rank OR ({rank} = :after_rank AND a.id > :after_id))")
+        params["after_rank"], params["after_id"] = position
+
+    statement = text(
+        f"SELECT a.id, a.title, a.url, a.source_name, a.category, a.published_at, "
+        f"snippet(articles_fts, -1, :mark_open, :mark_close, '…', :snippet_tokens) AS snippet, "
+        f"{rank} AS rank "
+        f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY rank, a.id LIMIT :limit"
+    ).columns(published_at=DateTime)
+    statement = statement.bindparams(*(bindparam(name, type_=DateTime) for name in ("since", "until") if name in params))
+    rows = db.execute(statement, params).mappings().all()
+
+    results = [dict(row, snippet=_highlight(row["snippet"])) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["rank"], last["id"])
+    return results, next_cursor
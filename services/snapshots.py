@@ -0,0 +1,183 @@
+# Static snapshots of the index page and per-category JSON feeds, published after each ingest
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, session, make_response, render_template
+
+from database import ReadSessionLocal
+from config import (
+    SNAPSHOTS_ENABLED,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP_VERSIONS,
+    SNAPSHOT_GZIP_LEVEL,
+    CATEGORIES,
+    HEADLINES_WINDOW_HOURS,
+    PAGE_CACHE_MAX_AGE
+)
+from services.queries import get_headlines
+from services.trending import get_trending_terms
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# SNAPSHOT_DIR/versions/<version>/ holds one complete snapshot; SNAPSHOT_DIR/current is a
+# symlink to the live one, replaced atomically, so a front proxy can serve it directly too
+VERSIONS_DIR = os.path.join(SNAPSHOT_DIR, "versions")
+CURRENT_LINK = os.path.join(SNAPSHOT_DIR, "current")
+
+# Flask app used to render templates outside a request (set by init_app)
+_app = None
+_publish_lock = threading.Lock()
+# Bytes of the live version's files read so far: (version, name) -> bytes
+_file_cache = {}
+
+def init_app(app):
+    """Registers the app whose templates snapshots are rendered with."""
+    global _app
+    _app = app
+
+# --- Publishing ---
+
+def category_feed(db, category, now=None):
+    """Returns the JSON feed for one category: its current headlines, as on the index page."""
+    now = now or datetime.utcnow()
+    rows = get_headlines(db, now - timedelta(hours=HEADLINES_WINDOW_HOURS), categories=[category]).get(category, [])
+    return _feed(category, rows, now)
+
+def _feed(category, rows, now):
+    return {"category": category, "generated_at": now.isoformat() + "Z", "data": [_feed_item(r) for r in rows]}
+
+def _feed_item(row):
+    return {
+        "id": row.id,
+        "title": row.title,
+        "summary": row.summary,
+        "url": row.url,
+        "source_name": row.source_name,
+        "source_url": row.source_url,
+        "published_at": row.published_at.isoformat() + "Z" if row.published_at else None, # Stored as naive UTC
+        "category": row.category
+    }
+
+def _write(directory, name, body):
+    """Writes a file and its precompressed .gz variant."""
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(body)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(body, compresslevel=SNAPSHOT_GZIP_LEVEL, mtime=0))
+
+def _swap_current(version):
+    """Points the current link at a version; readers see either the old or the new one, never a mix."""
+    temp_link = f"{CURRENT_LINK}.{version}.tmp"
+    os.symlink(os.path.join("versions", version), temp_link)
+    os.replace(temp_link, CURRENT_LINK)
+
+def _prune_versions(keep):
+    """Removes all but the newest versions (requests may still be reading the previous ones)."""
+    versions = sorted(os.listdir(VERSIONS_DIR))
+    for version in versions[:-keep]:
+        shutil.rmtree(os.path.join(VERSIONS_DIR, version), ignore_errors=True)
+
+def publish_snapshots(force=False):
+    """Renders the index page and per-category feeds into a new version and makes it live.
+
+    Returns the version name, or None when snapshots are disabled, no app is registered or
+    publishing failed (the previous version then stays live; the failure is only logged so
+    it never fails the ingest that triggered it).
+    """
+    if not (SNAPSHOTS_ENABLED or force):
+        return None
+    if _app is None:
+        logging.info("Snapshots not published: no Flask app registered (snapshots.init_app).")
+        return None
+
+    try:
+        with _publish_lock:
+            now = datetime.utcnow()
+            db = ReadSessionLocal()
+            try:
+                articles_by_category = get_headlines(db, now - timedelta(hours=HEADLINES_WINDOW_HOURS))
+                trending = get_trending_terms(db)
+            finally:
+                db.close()
+
+            version = now.strftime("%Y%m%dT%H%M%S%fZ")
+            directory = os.path.join(VERSIONS_DIR, version)
+            with _app.test_request_context("/"):
+                html = render_template("index.html", articles_by_category=articles_by_category, trending=trending)
+            _write(directory, "index.html", html.encode("utf-8"))
+            for category in CATEGORIES: # Empty categories get an empty feed
+                feed = _feed(category, articles_by_category.get(category, []), now)
+                _write(directory, f"feeds/{category}.json", json.dumps(feed).encode("utf-8"))
+
+            _swap_current(version)
+            _prune_versions(max(2, SNAPSHOT_KEEP_VERSIONS))
+    except Exception as e:
+        logging.error(f"Could not publish snapshot: {e}")
+        return None
+    logging.info(f"Published snapshot {version}.")
+    return version
+
+# --- Serving ---
+
+def current_version():
+    """Returns the live snapshot version, or None if nothing has been published."""
+    try:
+        return os.path.basename(os.readlink(CURRENT_LINK))
+    except OSError:
+        return None
+
+def _read(version, name):
+    key = (version, name)
+    body = _file_cache.get(key)
+    if body is None:
+        try:
+            with open(os.path.join(VERSIONS_DIR, version, name), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        if any(v != version for v, _ in list(_file_cache)):
+            _file_cache.clear() # A new version went live; drop the old bytes
+        _file_cache[key] = body
+    return body
+
+def snapshot_response(name, mimetype):
+    """Returns a response serving a file of the live snapshot (gzipped if accepted), or None."""
+    version = current_version()
+    if version is None:
+        return None
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "").lower()
+    body = _read(version, name + ".gz") if gzipped else None
+    if body is None:
+        gzipped = False
+        body = _read(version, name)
+        if body is None:
+            return None
+
+    response = make_response(body, 200, {"Content-Type": mimetype})
+    if gzipped:
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    response.set_etag(f"{version}-{name}{'-gz' if gzipped else ''}")
+    response.headers["Cache-Control"] = f"public, max-age={PAGE_CACHE_MAX_AGE}"
+    return response.make_conditional(request)
+
+def snapshot_page(name, mimetype="text/html; charset=utf-8"):
+    """Serves a GET view from the live snapshot file when one is published, else runs the view."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if SNAPSHOTS_ENABLED and request.method == "GET" and not request.args and "_flashes" not in session:
+                response = snapshot_response(name, mimetype)
+                if response is not None:
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+# Bulk write path for storing standardized articles
+
+import logging
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+
+from database import engine
+from models.news_article import NewsArticle, ArticleContent, SimhashBand
+from config import INGEST_CHUNK_SIZE
+from services.summaries import summarize
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Columns written from a standardized article dict, to the hot table and to the content table
+ARTICLE_COLUMNS = (
+    "title", "url", "url_hash", "published_at",
+    "source_name", "source_url", "category", "api_source", "simhash", "story_key"
+)
+CONTENT_COLUMNS = ("url_hash", "description", "content", "image_url")
+
+def article_row(standardized_data, fetched_at=None):
+    """Builds an insertable row for the articles table from a standardized article."""
+    row = {column: standardized_data.get(column) for column in ARTICLE_COLUMNS}
+    row["summary"] = summarize(standardized_data.get("description") or standardized_data.get("content"))
+    row["fetched_at"] = fetched_at or datetime.utcnow()
+    return row
+
+def content_row(standardized_data):
+    """Builds an insertable row for the article_contents table from a standardized article."""
+    return {column: standardized_data.get(column) for column in CONTENT_COLUMNS}
+
+def insert_ignore_statement(dialect_name, table=None):
+    """Returns an INSERT that silently skips rows violating a unique constraint.
+
+    SQLite (and PostgreSQL) use ON CONFLICT DO NOTHING; MySQL uses INSERT IGNORE, whose
+    affected-row count, unlike ON DUPLICATE KEY UPDATE, reports only the rows inserted.
+    Returns None for dialects without such a statement.
+    """
+    table = table if table is not None else NewsArticle.__table__
+    if dialect_name == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialect_name == "mysql":
+        return mysql_insert(table).prefix_with("IGNORE")
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing()
+    return None
+
+def _insert_chunk(bind, table, statement, rows):
+    """Inserts one chunk in its own transaction and returns the number of rows added."""
+    with bind.begin() as conn:
+        if statement is not None:
+            return max(conn.execute(statement, rows).rowcount, 0)
+        # Generic fallback: plain INSERT per row inside a savepoint, skipping duplicates
+        added = 0
+        for row in rows:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(table), row)
+                added += 1
+            except IntegrityError:
+                pass
+        return added
+
+def bulk_insert(table, rows, chunk_size=INGEST_CHUNK_SIZE, bind=None):
+    """Writes rows into a table in chunked INSERT-or-ignore transactions.
+
+    Each chunk commits on its own, so a bad row only costs its chunk; a failed chunk is then
+    retried row by row to isolate the offending rows. Returns a dict with accurate
+    "added", "duplicates" and "errors" counts.
+    """
+    bind = bind if bind is not None else engine
+    statement = insert_ignore_statement(bind.dialect.name, table)
+    counts = {"added": 0, "duplicates": 0, "errors": 0}
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            added = _insert_chunk(bind, table, statement, chunk)
+        except Exception as e:
+            logging.error(f"Bulk insert into {table.name} at offset {start} ({len(chunk)} rows) failed, retrying row by row: {e}")
+            added = 0
+            for row in chunk:
+                try:
+                    row_added = _insert_chunk(bind, table, statement, [row])
+                except Exception as row_error:
+                    logging.error(f"Failed to insert row into {table.name}: {row_error}")
+                    counts["errors"] += 1
+                    continue
+                added += row_added
+                counts["duplicates"] += 1 - row_added
+        else:
+            counts["duplicates"] += len(chunk) - added
+        counts["added"] += added
+
+    return counts
+
+def bulk_insert_articles(rows, chunk_size=INGEST_CHUNK_SIZE, bind=None):
+    """Writes article rows in chunked INSERT-or-ignore transactions (see bulk_insert)."""
+    return bulk_insert(NewsArticle.__table__, rows, chunk_size=chunk_size, bind=bind)
+
+def bulk_insert_article_contents(rows, chunk_size=INGEST_CHUNK_SIZE, bind=None):
+    """Writes the content rows of new articles (see bulk_insert)."""
+    return bulk_insert(ArticleContent.__table__, rows, chunk_size=chunk_size, bind=bind)
+
+def bulk_insert_simhash_bands(rows, chunk_size=INGEST_CHUNK_SIZE, bind=None):
+    """Writes LSH band rows for newly stored articles (see bulk_insert)."""
+    return bulk_insert(SimhashBand.__table__, rows, chunk_size=chunk_size, bind=bind)
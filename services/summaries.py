@@ -0,0 +1,34 @@
+# Plain-text article summaries, computed once at ingest instead of on every page render
+
+import re
+from html import unescape
+
+from config import ARTICLE_SUMMARY_CHARS
+
+# Elements whose text is never part of the visible description
+_HIDDEN_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+def strip_html(text):
+    """Returns text with tags removed, entities decoded and whitespace collapsed."""
+    if not text:
+        return ""
+    text = _TAG_RE.sub(" ", _HIDDEN_RE.sub(" ", text))
+    return _SPACE_RE.sub(" ", unescape(text)).strip()
+
+def summarize(text, limit=ARTICLE_SUMMARY_CHARS):
+    """Returns the plain-text start of a description, cut at a word boundary to at most limit chars.
+
+    Longer texts end in "...", as the index template's truncate filter used to render them.
+    Returns None if there is no text.
+    """
+    text = strip_html(text)
+    if not text:
+        return None
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 3]
+    if " " in cut and not text[limit - 3].isspace():
+        cut = cut.rsplit(" ", 1)[0] # Don't end mid-word
+    return cut.rstrip(" ,;:.-") + "..."
@@ -0,0 +1,328 @@
+# Trending topics: sliding-window counts of headline terms in count-min sketches, scored by acceleration
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, insert, update
+
+from database import engine
+from models.news_article import NewsArticle
+from models.trending import TrendBucket, TrendingTerm
+from config import (
+    TRENDING_ENABLED,
+    TRENDING_BUCKET_HOURS,
+    TRENDING_WINDOW_HOURS,
+    TRENDING_BASELINE_HOURS,
+    TRENDING_SKETCH_WIDTH,
+    TRENDING_SKETCH_DEPTH,
+    TRENDING_TOP_K,
+    TRENDING_MIN_COUNT,
+    TRENDING_MIN_SCORE,
+    TRENDING_TERMS_SHOWN,
+    INGEST_CHUNK_SIZE
+)
+from services.clustering import tokenize
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Headline words that say nothing about the topic (on top of the clustering stopwords)
+_HEADLINE_STOPWORDS = frozenset("""
+    about after against all amid an any back but can could did does first get gets how into just
+    last latest live make more most much news not now off one only out over report reports than
+    top two up update updates us video vs watch what when where which who why would year years
+    you your day days week today
+""".split())
+
+# --- Terms ---
+
+def title_terms(title):
+    """Returns the distinct words and two-word phrases of a headline that can trend."""
+    words = [w for w in tokenize(title) if w not in _HEADLINE_STOPWORDS and not w.isdigit()]
+    terms = set(words)
+    terms.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return terms
+
+# --- Sketches ---
+
+class CountMinSketch:
+    """Approximate per-term counts in fixed memory; estimates never undercount.
+
+    Updates are conservative (only the counters at the current minimum are raised), which
+    keeps overestimates from hash collisions well below those of a plain count-min sketch.
+    """
+
+    def __init__(self, width=TRENDING_SKETCH_WIDTH, depth=TRENDING_SKETCH_DEPTH, counters=None):
+        self.width = width
+        self.depth = depth
+        self.counters = counters if counters is not None else array("I", bytes(4 * width * depth))
+
+    @classmethod
+    def from_bytes(cls, data, width=TRENDING_SKETCH_WIDTH, depth=TRENDING_SKETCH_DEPTH):
+        counters = array("I")
+        counters.frombytes(zlib.decompress(data))
+        if len(counters) != width * depth:
+            raise ValueError(f"Sketch has {len(counters)} counters, expected {width * depth}")
+        return cls(width, depth, counters)
+
+    def to_bytes(self):
+        return zlib.compress(self.counters.tobytes(), 6)
+
+    def positions(self, term):
+        """Counter indexes of a term, one per row; the same for every sketch of this shape."""
+        # Two 64-bit halves of one hash, combined per row (double hashing)
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, term, count=1):
+        """Counts a term count more times and returns its new estimate."""
+        positions = self.positions(term)
+        estimate = min(self.counters[p] for p in positions) + count
+        for p in positions:
+            if self.counters[p] < estimate:
+                self.counters[p] = estimate
+        return estimate
+
+    def estimate(self, term, positions=None):
+        return min(self.counters[p] for p in positions or self.positions(term))
+
+class TopK:
+    """The k terms with the highest estimates offered so far: a min-heap with lazy deletion."""
+
+    def __init__(self, k=TRENDING_TOP_K, counts=None):
+        self.k = k
+        self.counts = dict(counts or {})
+        self._heap = [(count, term) for term, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def offer(self, term, estimate):
+        if term not in self.counts and len(self.counts) >= self.k and estimate <= self._heap[0][0]:
+            return # Not above the current minimum; nothing to do
+        self.counts[term] = estimate
+        heapq.heappush(self._heap, (estimate, term))
+        while len(self.counts) > self.k:
+            count, evicted = heapq.heappop(self._heap)
+            if self.counts.get(evicted) == count: # Skip entries superseded by a later offer
+                del self.counts[evicted]
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, term) for term, count in self.counts.items()]
+            heapq.heapify(self._heap)
+        while self._heap[0][1] not in self.counts or self.counts[self._heap[0][1]] != self._heap[0][0]:
+            heapq.heappop(self._heap) # Keep a live entry on top for the minimum check
+
+# --- Buckets ---
+
+def bucket_start(when):
+    """Returns the start of the TRENDING_BUCKET_HOURS bucket a (naive UTC) time falls in."""
+    hour = when.hour - when.hour % TRENDING_BUCKET_HOURS
+    return when.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+def _window_start(now):
+    """Start of the recent window: the current bucket and the ones before it, TRENDING_WINDOW_HOURS in all."""
+    return bucket_start(now) - timedelta(hours=TRENDING_WINDOW_HOURS - TRENDING_BUCKET_HOURS)
+
+def _oldest_bucket(now):
+    """Start of the baseline period; older buckets are dropped."""
+    return _window_start(now) - timedelta(hours=TRENDING_BASELINE_HOURS)
+
+def _load_bucket(row):
+    if row is None:
+        return CountMinSketch(), TopK(), 0
+    return CountMinSketch.from_bytes(row.sketch), TopK(counts=json.loads(row.top_terms)), row.articles
+
+def record_titles(rows, now=None, bind=None):
+    """Adds the headlines of newly stored articles to the trend buckets; returns how many were counted.
+
+    rows are article rows ({"title", "published_at", ...}). Only the buckets the batch falls
+    in are read and rewritten, so the cost grows with the batch, never with the articles
+    table. Articles older than the baseline period are skipped. The trending list is
+    recomputed from the buckets in the same transaction. A failure is only logged, so it
+    never fails the ingest that stored the articles.
+    """
+    if not TRENDING_ENABLED or not rows:
+        return 0
+    try:
+        return _record_titles(rows, now or datetime.utcnow(), bind if bind is not None else engine)
+    except Exception as e:
+        logging.error(f"Could not update trend buckets: {e}")
+        return 0
+
+def _record_titles(rows, now, bind):
+    oldest = _oldest_bucket(now)
+
+    terms_by_bucket = defaultdict(Counter)
+    articles_by_bucket = Counter()
+    for row in rows:
+        bucket = bucket_start(min(row.get("published_at") or now, now)) # Future timestamps count as now
+        if bucket < oldest:
+            continue
+        terms_by_bucket[bucket].update(title_terms(row.get("title")))
+        articles_by_bucket[bucket] += 1
+    if not articles_by_bucket:
+        return 0
+
+    table = TrendBucket.__table__
+    with bind.begin() as conn:
+        # Write first: takes SQLite's write lock before the buckets are read, so two
+        # concurrent updates can't both read the same sketch and lose each other's counts
+        conn.execute(delete(table).where(table.c.bucket_start < oldest))
+        stored = {row.bucket_start: row for row in conn.execute(
+            select(table).where(table.c.bucket_start.in_(list(articles_by_bucket)))
+        )}
+        for bucket, term_counts in terms_by_bucket.items():
+            sketch, top, articles = _load_bucket(stored.get(bucket))
+            for term, count in term_counts.items():
+                top.offer(term, sketch.add(term, count))
+            values = {
+                "sketch": sketch.to_bytes(),
+                "top_terms": json.dumps(top.counts, separators=(",", ":")),
+                "articles": articles + articles_by_bucket[bucket],
+                "updated_at": now
+            }
+            if bucket in stored:
+                conn.execute(update(table).where(table.c.bucket_start == bucket).values(**values))
+            else:
+                conn.execute(insert(table).values(bucket_start=bucket, **values))
+        refresh_trending(conn, now)
+    return sum(articles_by_bucket.values())
+
+# --- Scoring ---
+
+def score(window_count, baseline_count, window_hours=TRENDING_WINDOW_HOURS, baseline_hours=TRENDING_BASELINE_HOURS):
+    """Acceleration of a term: how far its window count exceeds the baseline rate, in standard deviations.
+
+    The baseline count is scaled to the window's length and taken as the expected count of a
+    Poisson process, so a jump from 2 to 10 outranks a steady 40 per window.
+    """
+    expected = baseline_count * window_hours / baseline_hours if baseline_hours > 0 else 0
+    return (window_count - expected) / math.sqrt(expected + 1)
+
+def _same_topic(words, window_count, other_words, other_count):
+    """True if two terms are about one topic.
+
+    That is the case when one is a word of the other ("fed" and "fed rate"), or when they
+    share a word and are mentioned about as often: the overlapping phrases of one headline
+    ("volcano eruption", "eruption iceland", "iceland evacuations").
+    """
+    if words <= other_words or other_words <= words:
+        return True
+    return bool(words & other_words) and min(window_count, other_count) >= 0.8 * max(window_count, other_count)
+
+def _group_topics(scored):
+    """Groups scored terms (best first) into topics; returns each topic's best term, best first."""
+    groups = [] # [best entry, [(words, window_count), ...]]
+    for entry in scored:
+        words, window_count = set(entry[3].split()), entry[2]
+        joined = None
+        for group in list(groups):
+            if not any(_same_topic(words, window_count, w, c) for w, c in group[1]):
+                continue
+            if joined is None:
+                joined = group
+                group[1].append((words, window_count))
+            else: # The term links two topics (a headline's phrase chain): keep the better one
+                joined[1].extend(group[1])
+                groups.remove(group)
+        if joined is None:
+            groups.append([entry, [(words, window_count)]])
+    return [group[0] for group in groups]
+
+def compute_trending(buckets, now, limit=TRENDING_TERMS_SHOWN):
+    """Ranks the candidate terms of the window buckets; returns [(term, score, window, baseline)].
+
+    buckets is {bucket_start: (sketch, top)}. Candidates are the most frequent terms of each
+    bucket in the window; their counts come from the sketches of every bucket.
+    """
+    window_start = _window_start(now)
+    window = [b for start, b in buckets.items() if start >= window_start]
+    baseline = [b for start, b in buckets.items() if _oldest_bucket(now) <= start < window_start]
+    candidates = {term for _, top in window for term in top.counts}
+    # Rates over the time actually covered: the current bucket is still filling, and a young
+    # database has less baseline than TRENDING_BASELINE_HOURS
+    window_hours = (now - window_start).total_seconds() / 3600
+    baseline_starts = [start for start in buckets if start < window_start]
+    baseline_hours = (window_start - min(baseline_starts)).total_seconds() / 3600 if baseline_starts else 0
+
+    scored = []
+    for term in candidates:
+        positions = window[0][0].positions(term) # Hashed once for all buckets
+        window_count = sum(sketch.estimate(term, positions) for sketch, _ in window)
+        if window_count < TRENDING_MIN_COUNT:
+            continue
+        baseline_count = sum(sketch.estimate(term, positions) for sketch, _ in baseline)
+        term_score = score(window_count, baseline_count, window_hours, baseline_hours)
+        if term_score >= TRENDING_MIN_SCORE:
+            # Phrases first on ties: "interest rates" says more than "rates"
+            scored.append((term_score, len(term.split()), window_count, term, baseline_count))
+    scored.sort(reverse=True)
+
+    return [(term, term_score, window_count, baseline_count)
+            for term_score, _, window_count, term, baseline_count in _group_topics(scored)[:limit]]
+
+def refresh_trending(conn, now=None):
+    """Recomputes the trending list from the stored buckets (in the caller's transaction)."""
+    now = now or datetime.utcnow()
+    rows = conn.execute(
+        select(TrendBucket.__table__).where(TrendBucket.bucket_start >= _oldest_bucket(now))
+    ).all()
+    buckets = {row.bucket_start: _load_bucket(row)[:2] for row in rows}
+    trending = compute_trending(buckets, now)
+
+    table = TrendingTerm.__table__
+    conn.execute(delete(table))
+    if trending:
+        conn.execute(insert(table), [{
+            "rank": rank,
+            "term": term,
+            "score": term_score,
+            "window_count": window_count,
+            "baseline_count": baseline_count,
+            "computed_at": now
+        } for rank, (term, term_score, window_count, baseline_count) in enumerate(trending, start=1)])
+    return trending
+
+def get_trending_terms(db, limit=TRENDING_TERMS_SHOWN):
+    """Returns the current trending terms, best first (empty when trending is disabled)."""
+    if not TRENDING_ENABLED:
+        return []
+    return db.execute(
+        select(TrendingTerm.term, TrendingTerm.window_count).order_by(TrendingTerm.rank).limit(limit)
+    ).all()
+
+# --- Rebuild ---
+
+def rebuild_trends(bind=None, batch_size=INGEST_CHUNK_SIZE):
+    """Recounts the trend buckets from the articles of the window and baseline period.
+
+    The one operation that reads the articles table: for databases that existed before
+    trending did, or after changing the bucket or sketch settings. Returns the articles counted.
+    """
+    bind = bind if bind is not None else engine
+    now = datetime.utcnow()
+    with bind.begin() as conn:
+        conn.execute(delete(TrendBucket.__table__))
+        conn.execute(delete(TrendingTerm.__table__))
+
+    counted = 0
+    last_id = 0
+    while True:
+        with bind.connect() as conn:
+            rows = conn.execute(
+                select(NewsArticle.id, NewsArticle.title, NewsArticle.published_at)
+                .where(NewsArticle.id > last_id, NewsArticle.published_at >= _oldest_bucket(now))
+                .order_by(NewsArticle.id)
+                .limit(batch_size)
+            ).mappings().all()
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        counted += record_titles(rows, now=now, bind=bind)
+    logging.info(f"Rebuilt trend buckets from {counted} articles.")
+    return counted
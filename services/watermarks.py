@@ -0,0 +1,60 @@
+# Per-provider/category high-watermarks for incremental fetching
+
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+
+from database import engine
+from models.fetch_watermark import FetchWatermark
+from config import FETCH_WATERMARK_OVERLAP_MINUTES
+from services.dates import parse_datetime
+from services.storage import insert_ignore_statement
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Raw article field holding the publish time, per provider
+PUBLISHED_FIELDS = {
+    "NewsData.io": "pubDate",
+    "WorldNewsAPI": "publish_date",
+    "GNews": "publishedAt"
+}
+
+def published_at(api_name, raw_article):
+    """Returns a raw article's publish time as naive UTC, or None if it has none."""
+    return parse_datetime(raw_article.get(PUBLISHED_FIELDS[api_name]), api_name)
+
+def newest_published(api_name, raw_articles):
+    """Returns the newest publish time among raw articles, or None."""
+    times = [t for t in (published_at(api_name, a) for a in raw_articles) if t is not None]
+    return max(times, default=None)
+
+def load_fetch_since(bind=None):
+    """Returns {(provider, category): datetime} to fetch from, i.e. each watermark minus the overlap.
+
+    The overlap re-requests a short window before the watermark, so articles that providers
+    index a little after their publish time are still picked up; dedup drops the repeats.
+    """
+    bind = bind if bind is not None else engine
+    table = FetchWatermark.__table__
+    overlap = timedelta(minutes=FETCH_WATERMARK_OVERLAP_MINUTES)
+    with bind.connect() as conn:
+        rows = conn.execute(select(table.c.provider, table.c.category, table.c.published_at)).all()
+    return {(provider, category): watermark - overlap for provider, category, watermark in rows}
+
+def advance_watermarks(newest, bind=None):
+    """Moves each (provider, category) watermark forward to the given publish time; never back."""
+    if not newest:
+        return
+    bind = bind if bind is not None else engine
+    table = FetchWatermark.__table__
+    now = datetime.utcnow()
+    with bind.begin() as conn:
+        for (provider, category), published in newest.items():
+            conn.execute(insert_ignore_statement(bind.dialect.name, table),
+                         {"provider": provider, "category": category, "published_at": published, "updated_at": now})
+            conn.execute(
+                update(table)
+                .where(table.c.provider == provider, table.c.category == category, table.c.published_at < published)
+                .values(published_at=published, updated_at=now)
+            )
+    logging.info(f"Advanced {len(newest)} fetch watermark(s).")
@@ -0,0 +1,88 @@
+# Shared fixtures: the app runs against a scratch instance folder and the local provider stub
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "benchmarks"))
+
+from stub_providers import StubSettings, start_stub
+from bench_suite import configure_app
+
+INSTANCE_DIR = tempfile.mkdtemp(prefix="news-tests-")
+# No latency or repeats, so every ingest in a test sees the same, predictable responses
+STUB_DEFAULTS = dict(latency_ms=0, latency_jitter_ms=0, duplicate_rate=0.0, articles=5)
+STUB_SERVER, STUB_URL, STUB = start_stub(StubSettings(**STUB_DEFAULTS))
+configure_app(INSTANCE_DIR, STUB_URL) # Before anything imports config
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    app.config["TESTING"] = True
+    yield app
+    STUB_SERVER.shutdown()
+    shutil.rmtree(INSTANCE_DIR, ignore_errors=True)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def stub():
+    """The running provider stub's settings; tests may change them (they are reset afterwards)."""
+    return STUB
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    """Leaves every test with an empty database, index, archive, page cache and no snapshots."""
+    yield
+    from sqlalchemy import inspect, text
+    from database import Base, engine
+    from config import ARCHIVE_FOLDER_PATH, SNAPSHOT_DIR
+    from services import quota, snapshots
+    from services.page_cache import bump_generation
+
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES('delete-all')"))
+        conn.execute(text("UPDATE search_index_state SET last_indexed_id = 0"))
+        if inspect(conn).has_table("sqlite_sequence"):
+            conn.execute(text("DELETE FROM sqlite_sequence"))
+    shutil.rmtree(ARCHIVE_FOLDER_PATH, ignore_errors=True)
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    snapshots._file_cache.clear()
+    bump_generation()
+    for name in list(quota._breakers):
+        quota._breakers[name] = quota.CircuitBreaker(name)
+    STUB.__init__(**STUB_DEFAULTS)
+
+@pytest.fixture
+def store_articles():
+    """Returns store(articles): stores GNews-style raw articles through the ingest pipeline.
+
+    Each article is a dict with at least "title" and "url"; "published_at" (naive UTC),
+    "category", "description" and "source" are optional.
+    """
+    from datetime import datetime
+    from services.processing import standardize_articles, store_standardized_articles
+
+    def store(articles):
+        raw_articles = [{
+            "_api_source": "GNews",
+            "_query_category": article.get("category", "technology"),
+            "title": article["title"],
+            "description": article.get("description", f"About {article['title']}."),
+            "content": article.get("content", f"Full text about {article['title']}."),
+            "url": article["url"],
+            "image": None,
+            "publishedAt": article.get("published_at", datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": {"name": article.get("source", "Test Wire"), "url": "https://wire.example"}
+        } for article in articles]
+        return store_standardized_articles(standardize_articles(raw_articles))
+    return store
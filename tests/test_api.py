@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+def _store_many(store_articles, count, category="technology"):
+    now = datetime.utcnow()
+    store_articles([
+        # Pairs share a publish time, so the id has to break the tie in the cursor
+        {"title": f"Headline number {i} about {category}", "url": f"https://example.com/{category}/{i}",
+         "published_at": now - timedelta(minutes=i // 2), "category": category}
+        for i in range(count)
+    ])
+
+def test_articles_keyset_pagination_walks_every_article_once(client, store_articles):
+    _store_many(store_articles, 25)
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/v1/articles", query_string={"limit": 10, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(body["data"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert pages == 3
+    assert len({a["id"] for a in seen}) == 25
+    order = [(a["published_at"], a["id"]) for a in seen]
+    assert order == sorted(order, reverse=True)
+
+def test_articles_filters_and_fields(client, store_articles):
+    _store_many(store_articles, 3, "science")
+    _store_many(store_articles, 2, "sports")
+    body = client.get("/api/v1/articles?category=sports&fields=id,title,content").get_json()
+    assert len(body["data"]) == 2
+    assert set(body["data"][0]) == {"id", "title", "content"}
+    assert body["data"][0]["content"].startswith("Full text about")
+    assert body["next_cursor"] is None
+
+def test_articles_rejects_bad_parameters(client):
+    assert client.get("/api/v1/articles?cursor=not-a-cursor").status_code == 400
+    assert client.get("/api/v1/articles?limit=ten").status_code == 400
+    assert client.get("/api/v1/articles?fields=id,password").status_code == 400
+
+def test_unknown_article_is_404(client):
+    assert client.get("/api/v1/articles/12345").status_code == 404
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from services import dates
+
+@pytest.mark.parametrize("value, provider", [
+    ("2024-05-01T12:34:56Z", "GNews"),
+    ("2024-05-01 12:34:56", "NewsData.io"),
+    ("2024-05-01 12:34:56", "WorldNewsAPI"),
+    # Another provider's format (or a generic one) still parses through the slower paths
+    ("2024-05-01 12:34:56", "GNews"),
+    ("2024-05-01T14:34:56+02:00", "NewsData.io"),
+    ("Wed, 01 May 2024 12:34:56 GMT", "WorldNewsAPI"),
+])
+def test_every_provider_format_parses_to_naive_utc(value, provider):
+    assert dates.parse_datetime(value, provider) == datetime(2024, 5, 1, 12, 34, 56)
+
+def test_fast_paths_match_only_their_own_format():
+    assert dates._parse_gnews("2024-05-01 12:34:56") is None
+    assert dates._parse_sql("2024-05-01T12:34:56Z") is None
+    assert dates._parse_sql("2024-05-01 12:34:56.5") is None
+    assert dates.parse_datetime("2024-13-01 12:34:56", "NewsData.io") is None
+
+def test_providers_with_the_same_format_share_a_parser():
+    assert dates._PARSERS["NewsData.io"] is dates._PARSERS["WorldNewsAPI"]
+    assert dates._PARSERS["GNews"] is not dates._PARSERS["NewsData.io"]
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import feeds
+
+def _user(client, name):
+    response = client.post("/api/v1/users", json={"username": name, "email": f"{name}@example.com"})
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def _subscribe(client, user_id, kind, value):
+    return client.post(f"/api/v1/users/{user_id}/subscriptions", json={"kind": kind, "value": value})
+
+def _feed_titles(client, user_id, **params):
+    body = client.get(f"/api/v1/users/{user_id}/feed", query_string=params).get_json()
+    return [entry["title"] for entry in body["data"]], body["next_cursor"]
+
+def _articles(count, category="science", source="Test Wire", prefix="Story", start=None):
+    start = start or datetime.utcnow()
+    return [{"title": f"{prefix} {i}", "url": f"https://example.com/{prefix.lower()}/{i}", "category": category,
+             "source": source, "published_at": start - timedelta(minutes=i)} for i in range(count)]
+
+# --- Validation ---
+
+@pytest.mark.parametrize("body", [
+    {"kind": "category", "value": 5},
+    {"kind": "category", "value": ["science"]},
+    {"kind": "category", "value": "   "},
+    {"kind": "category", "value": "gardening"},
+    {"kind": "planet", "value": "mars"},
+    [1, 2],
+    "science",
+])
+def test_invalid_subscriptions_are_rejected(client, body):
+    user_id = _user(client, "ada")
+    response = client.post(f"/api/v1/users/{user_id}/subscriptions", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+@pytest.mark.parametrize("body", [[1, 2], "ada", {"username": 5, "email": "ada@example.com"}, {"username": "ada"}])
+def test_invalid_users_are_rejected(client, body):
+    assert client.post("/api/v1/users", json=body).status_code == 400
+
+def test_invalid_user_updates_are_rejected(client):
+    user_id = _user(client, "ada")
+    assert client.put(f"/api/v1/users/{user_id}", json=[1]).status_code == 400
+    assert client.put(f"/api/v1/users/{user_id}", json={"email": 7}).status_code == 400
+    assert client.put(f"/api/v1/users/{user_id}", json={"email": "ada@new.example"}).get_json()["email"] == "ada@new.example"
+
+def test_unknown_user_is_404(client):
+    assert _subscribe(client, 999, "category", "science").status_code == 404
+    assert client.get("/api/v1/users/999/feed").status_code == 404
+
+# --- Materialized feeds ---
+
+def test_subscription_backfills_and_new_articles_are_fanned_out(client, store_articles):
+    store_articles(_articles(3, prefix="Earlier"))
+    user_id = _user(client, "ada")
+    response = _subscribe(client, user_id, "category", " science ")
+    assert response.status_code == 201 and response.get_json()["data"]["value"] == "science"
+    assert _subscribe(client, user_id, "category", "science").status_code == 200 # Already subscribed
+
+    subscriptions = client.get(f"/api/v1/users/{user_id}/subscriptions").get_json()["data"]
+    assert subscriptions == [{"kind": "category", "value": "science", "materialized": True}]
+    assert _feed_titles(client, user_id)[0] == ["Earlier 0", "Earlier 1", "Earlier 2"]
+
+    store_articles(_articles(2, prefix="Later", start=datetime.utcnow() + timedelta(minutes=1)))
+    store_articles(_articles(2, category="sports", prefix="Match"))
+    assert _feed_titles(client, user_id)[0] == ["Later 0", "Later 1", "Earlier 0", "Earlier 1", "Earlier 2"]
+
+def test_feed_pages_with_a_cursor(client, store_articles):
+    user_id = _user(client, "ada")
+    _subscribe(client, user_id, "source", "Test Wire")
+    store_articles(_articles(7))
+    titles, cursor = _feed_titles(client, user_id, limit=3)
+    seen = list(titles)
+    while cursor:
+        titles, cursor = _feed_titles(client, user_id, limit=3, cursor=cursor)
+        seen += titles
+    assert seen == [f"Story {i}" for i in range(7)]
+    assert client.get(f"/api/v1/users/{user_id}/feed?cursor=broken").status_code == 400
+
+def test_category_and_source_overlap_gives_one_entry(client, store_articles):
+    user_id = _user(client, "ada")
+    _subscribe(client, user_id, "category", "science")
+    _subscribe(client, user_id, "source", "Test Wire")
+    store_articles(_articles(2))
+    assert _feed_titles(client, user_id)[0] == ["Story 0", "Story 1"]
+
+def test_unsubscribing_drops_only_uncovered_entries(client, store_articles):
+    user_id = _user(client, "ada")
+    _subscribe(client, user_id, "category", "science")
+    _subscribe(client, user_id, "source", "Other Wire")
+    store_articles(_articles(2) + _articles(1, source="Other Wire", prefix="Covered"))
+    assert client.delete(f"/api/v1/users/{user_id}/subscriptions/category/science").status_code == 204
+    assert _feed_titles(client, user_id)[0] == ["Covered 0"] # Still covered by the source subscription
+    assert client.delete(f"/api/v1/users/{user_id}/subscriptions/category/science").status_code == 404
+
+# --- Merge on read ---
+
+def test_popular_targets_are_merged_on_read(client, store_articles, monkeypatch):
+    monkeypatch.setattr(feeds, "FEED_FANOUT_MAX_SUBSCRIBERS", 1)
+    first, second = _user(client, "ada"), _user(client, "bob")
+    _subscribe(client, first, "category", "science")
+    _subscribe(client, second, "category", "science") # Now two subscribers: too many to fan out
+    _subscribe(client, second, "source", "Niche Wire")
+    now = datetime.utcnow()
+    store_articles(_articles(2, start=now) + _articles(1, category="sports", source="Niche Wire", prefix="Niche",
+                                                       start=now - timedelta(seconds=30)))
+
+    for user_id in (first, second):
+        subscriptions = client.get(f"/api/v1/users/{user_id}/subscriptions").get_json()["data"]
+        assert {(s["value"], s["materialized"]) for s in subscriptions} >= {("science", False)}
+    from database import engine
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM feed_items WHERE user_id = :u"), {"u": first}).scalar() == 0
+    # Merged by date with the materialized part
+    assert _feed_titles(client, first)[0] == ["Story 0", "Story 1"]
+    assert _feed_titles(client, second)[0] == ["Story 0", "Niche 0", "Story 1"]
+
+    # Dropping back to one subscriber materializes the remaining subscription again
+    assert client.delete(f"/api/v1/users/{second}").status_code == 204
+    subscriptions = client.get(f"/api/v1/users/{first}/subscriptions").get_json()["data"]
+    assert subscriptions == [{"kind": "category", "value": "science", "materialized": True}]
+    assert _feed_titles(client, first)[0] == ["Story 0", "Story 1"]
+
+# --- Maintenance ---
+
+def test_old_entries_are_trimmed(client, store_articles):
+    user_id = _user(client, "ada")
+    _subscribe(client, user_id, "category", "science")
+    store_articles(_articles(1, prefix="Recent") + _articles(1, prefix="Stale", start=datetime.utcnow() - timedelta(days=10)))
+    assert feeds.trim_feeds(days=5) == 1
+    assert _feed_titles(client, user_id)[0] == ["Recent 0"]
@@ -0,0 +1,124 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import api_clients
+from services.watermarks import advance_watermarks, load_fetch_since
+from config import FETCH_WATERMARK_OVERLAP_MINUTES
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+        self.status_code = 200
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+@pytest.fixture
+def worldnews(monkeypatch):
+    """Serves WorldNewsAPI pages of full size, newest first, from a list of publish times."""
+    published = []
+    requests = []
+
+    def provider_get(provider, url, params=None):
+        requests.append(dict(params))
+        offset, number = params["offset"], params["number"]
+        news = [{"id": i, "title": f"Story {i}", "text": "Body", "url": f"https://example.com/{i}",
+                 "publish_date": published[i].strftime("%Y-%m-%d %H:%M:%S"), "category": "science"}
+                for i in range(offset, min(offset + number, len(published)))]
+        return FakeResponse({"offset": offset, "number": len(news), "available": len(published), "news": news})
+
+    monkeypatch.setattr(api_clients, "provider_get", provider_get)
+    monkeypatch.setattr(api_clients, "plan_calls", lambda: [("WorldNewsAPI", ("science",))])
+    return published, requests
+
+def _watermark():
+    since = load_fetch_since().get(("WorldNewsAPI", "science"))
+    return since + timedelta(minutes=FETCH_WATERMARK_OVERLAP_MINUTES) if since else None
+
+def test_watermark_is_held_when_the_page_budget_runs_out(worldnews):
+    from services.ingest import run_ingest
+    published, requests = worldnews
+    now = datetime.utcnow().replace(microsecond=0)
+    watermark = now - timedelta(days=1)
+    advance_watermarks({("WorldNewsAPI", "science"): watermark})
+    # Far more new articles than two pages hold: the oldest of them are never reached
+    published.extend(now - timedelta(minutes=i) for i in range(500))
+
+    counts = run_ingest()
+    assert len(requests) == 2 # FETCH_MAX_PAGES
+    assert counts["added"] == 40
+    assert _watermark() == watermark
+
+def test_watermark_advances_once_a_call_reaches_it(worldnews):
+    from services.ingest import run_ingest
+    published, requests = worldnews
+    now = datetime.utcnow().replace(microsecond=0)
+    watermark = now - timedelta(hours=1)
+    advance_watermarks({("WorldNewsAPI", "science"): watermark})
+    published.extend(now - timedelta(minutes=i) for i in range(30))
+
+    counts = run_ingest()
+    assert requests[0]["earliest-publish-date"] == (watermark - timedelta(minutes=FETCH_WATERMARK_OVERLAP_MINUTES)).strftime("%Y-%m-%d %H:%M:%S")
+    assert counts["added"] == 30
+    assert _watermark() == now
+
+# --- Batched calls ---
+
+@pytest.fixture
+def newsdata(monkeypatch):
+    """Serves NewsData.io pages (followed with nextPage) from a list of article categories."""
+    labels = []
+    requests = []
+
+    def provider_get(provider, url, params=None):
+        requests.append(dict(params))
+        start, size = int(params.get("page", 0)), params["size"]
+        results = [{"article_id": str(i), "title": f"Story {i}", "link": f"https://example.com/{i}",
+                    "pubDate": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), "category": [labels[i]]}
+                   for i in range(start, min(start + size, len(labels)))]
+        next_page = str(start + size) if start + size < len(labels) else None
+        return FakeResponse({"status": "success", "results": results, "nextPage": next_page})
+
+    monkeypatch.setattr(api_clients, "provider_get", provider_get)
+    return labels, requests
+
+BATCH = ("business", "science", "technology")
+
+def _routed_counts(articles):
+    return {category: len(routed) for category, routed in api_clients.route_articles("NewsData.io", BATCH, articles).items()}
+
+def test_batch_pages_until_every_category_has_its_share(newsdata):
+    labels, requests = newsdata
+    # A busy category fills the whole first page
+    labels.extend(["business"] * 50 + ["science"] * 20 + ["technology"] * 20 + ["business"] * 50)
+    articles = api_clients.fetch_newsdata_io(BATCH)
+    assert len(requests) == 2
+    assert requests[0]["category"] == "business,science,technology"
+    assert _routed_counts(articles) == {"business": 60, "science": 20, "technology": 20}
+
+def test_batch_stops_at_the_page_budget_and_reports_short_categories(newsdata, caplog):
+    labels, requests = newsdata
+    labels.extend(["business"] * 150 + ["technology"] * 5 + ["science"] * 50)
+    articles = api_clients.fetch_newsdata_io(BATCH)
+    assert len(requests) == 3 # FETCH_MAX_PAGES
+    assert _routed_counts(articles) == {"business": 150, "science": 0, "technology": 0}
+    assert "science (0), technology (0)" in caplog.text
+
+def test_single_category_call_takes_one_page(newsdata):
+    labels, requests = newsdata
+    labels.extend(["business"] * 100)
+    assert len(api_clients.fetch_newsdata_io(("business",))) == 20
+    assert len(requests) == 1
+
+def test_articles_matching_no_batch_category_are_dropped(caplog):
+    articles = [{"category": ["business"]}, {"category": ["world"]}, {"category": None}, {"category": ["Science", "top"]}]
+    assert _routed_counts(articles) == {"business": 1, "science": 1, "technology": 0}
+    assert "Dropped 2 article(s)" in caplog.text
+    # A single-category call keeps everything it asked for
+    assert len(api_clients.route_articles("NewsData.io", ("business",), articles)["business"]) == 4
@@ -0,0 +1,16 @@
+import pytest
+
+from services.http_client import _parse_cache_control
+from config import HTTP_CACHE_DEFAULT_MAX_AGE
+
+@pytest.mark.parametrize("header, expected", [
+    ("private, max-age=60", (True, 60)),
+    ("private", (True, HTTP_CACHE_DEFAULT_MAX_AGE)),
+    ("public, max-age=300", (True, 300)),
+    ("no-cache", (True, 0)),
+    ("private, no-cache", (True, 0)),
+    ("no-store", (False, 0)),
+    ("private, no-store, max-age=60", (False, 0)),
+])
+def test_only_no_store_responses_are_skipped(header, expected):
+    assert _parse_cache_control({"Cache-Control": header}) == expected
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from database import SessionLocal
+from models.news_article import NewsArticle, ArticleContent
+
+def _articles():
+    db = SessionLocal()
+    try:
+        return db.execute(select(NewsArticle).order_by(NewsArticle.id)).scalars().all()
+    finally:
+        db.close()
+
+# --- End to end ---
+
+def test_ingest_stores_articles_from_every_provider(stub):
+    from services.ingest import run_ingest
+    counts = run_ingest()
+    assert counts["fetched"] > 0
+    assert counts["added"] > 0 and counts["errors"] == 0
+    articles = _articles()
+    assert len(articles) == counts["added"]
+    assert {a.api_source for a in articles} == {"NewsData.io", "WorldNewsAPI", "GNews"}
+    # Every stored article is hashed and clustered
+    assert all(a.url_hash and a.story_key for a in articles)
+
+def test_ingest_advances_watermarks_per_provider_and_category(stub):
+    from services.ingest import run_ingest
+    from services.watermarks import load_fetch_since
+    assert load_fetch_since() == {}
+    run_ingest()
+    since = load_fetch_since()
+    assert {provider for provider, _ in since} == {"NewsData.io", "WorldNewsAPI", "GNews"}
+    newest = max(a.published_at for a in _articles())
+    assert max(since.values()) <= newest
+
+def test_failed_call_keeps_its_watermark(stub):
+    from services.ingest import run_ingest
+    from services.watermarks import load_fetch_since
+    stub.error_rate = 1.0 # Every request fails
+    counts = run_ingest()
+    assert counts["added"] == 0
+    assert load_fetch_since() == {}
+
+# --- Dedup ---
+
+def test_duplicate_urls_are_stored_once(store_articles):
+    published = datetime.utcnow() - timedelta(hours=1)
+    first = store_articles([
+        {"title": "Chip maker unveils new processor", "url": "https://www.example.com/chips/?utm_source=rss", "published_at": published},
+        {"title": "Chip maker unveils new processor", "url": "http://example.com/chips#top", "published_at": published}
+    ])
+    assert first["added"] == 1 and first["duplicates"] == 1
+
+    again = store_articles([
+        {"title": "Chip maker unveils new processor", "url": "https://example.com/chips?fbclid=x", "published_at": published}
+    ])
+    assert again["added"] == 0 and again["duplicates"] == 1
+
+    db = SessionLocal()
+    try:
+        assert db.execute(select(func.count()).select_from(NewsArticle)).scalar() == 1
+        assert db.execute(select(func.count()).select_from(ArticleContent)).scalar() == 1
+    finally:
+        db.close()
+
+def test_canonicalize_url():
+    from services.dedup import canonicalize_url, url_hash
+    assert canonicalize_url("HTTP://WWW.Example.com:80/a//b/?b=2&utm_medium=x&a=1#frag") == "https://example.com/a/b?a=1&b=2"
+    assert url_hash("https://example.com/a?ref=home") == url_hash("http://www.example.com/a/")
+    assert url_hash("https://example.com/a?id=1") != url_hash("https://example.com/a?id=2")
+
+# --- Clustering ---
+
+def test_near_duplicate_stories_share_a_story_key(store_articles):
+    published = datetime.utcnow() - timedelta(hours=2)
+    description = "The central bank raised interest rates by a quarter point on Tuesday, citing persistent inflation."
+    store_articles([
+        {"title": "Central bank raises interest rates by a quarter point", "description": description,
+         "url": "https://one.example/rates", "published_at": published},
+        {"title": "Central bank raises interest rates by a quarter point", "description": description,
+         "url": "https://two.example/markets/rates", "published_at": published + timedelta(minutes=5)},
+        {"title": "Local team wins the championship after extra time",
+         "description": "The home side scored in the final minute of extra time to lift the trophy.",
+         "url": "https://three.example/sports", "published_at": published}
+    ])
+    by_url = {a.url: a for a in _articles()}
+    first, second, other = by_url["https://one.example/rates"], by_url["https://two.example/markets/rates"], by_url["https://three.example/sports"]
+    # The earliest report is the story's representative
+    assert first.story_key == first.url_hash
+    assert second.story_key == first.story_key
+    assert other.story_key == other.url_hash
@@ -0,0 +1,55 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from database import engine
+from models.job_lease import JobLease
+from services import ingest, jobs
+from services.leases import acquire_lease
+
+COUNTS = {"fetched": 0, "added": 0, "duplicates": 0, "errors": 0}
+
+def _lease_holder():
+    with engine.connect() as conn:
+        return conn.execute(
+            JobLease.__table__.select().where(JobLease.__table__.c.name == jobs.JOB_LEASE_NAME)
+        ).first()
+
+def test_scheduled_job_coalesces_with_a_manual_job_in_the_same_process(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    def slow_ingest(progress=None, on_stage=None):
+        started.set()
+        assert release.wait(10)
+        on_stage("storing") # Renews the manual job's lease after the scheduled one gave up
+        return dict(COUNTS)
+    monkeypatch.setattr(ingest, "run_ingest", slow_ingest)
+
+    manual_id, created = jobs.enqueue_ingest()
+    assert created and started.wait(10)
+    scheduled_id = jobs.run_ingest_job_now()
+
+    scheduled = jobs.get_job(scheduled_id)
+    assert scheduled["status"] == "coalesced"
+    assert scheduled["coalesced_into"] == manual_id
+    assert _lease_holder().holder == jobs._job_holder(manual_id) # Not released under the manual job
+
+    release.set()
+    jobs._get_executor().submit(lambda: None).result(10)
+    assert jobs.get_job(manual_id)["status"] == "succeeded"
+    assert _lease_holder() is None
+
+def test_job_stops_when_its_lease_is_taken_over(monkeypatch):
+    def ingest_outliving_its_lease(progress=None, on_stage=None):
+        table = JobLease.__table__
+        with engine.begin() as conn:
+            conn.execute(update(table).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        assert acquire_lease(jobs.JOB_LEASE_NAME, 60, holder="other-node:1")
+        on_stage("storing")
+        raise AssertionError("the job kept ingesting without its lease")
+    monkeypatch.setattr(ingest, "run_ingest", ingest_outliving_its_lease)
+
+    job = jobs.get_job(jobs.run_ingest_job_now())
+    assert job["status"] == "failed"
+    assert "lost its lease" in job["error"]
+    assert _lease_holder().holder == "other-node:1"
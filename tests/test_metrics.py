@@ -0,0 +1,52 @@
+import re
+
+def _samples(client):
+    """Returns {series: value} from a /metrics scrape."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            series, _, value = line.rpartition(" ")
+            samples[series] = float(value)
+    return samples
+
+def test_requests_are_counted_per_route_rule(client):
+    series = 'news_http_requests_total{route="/api/v1/articles/<int:article_id>",method="GET",status="404"}'
+    before = _samples(client).get(series, 0)
+    client.get("/api/v1/articles/111")
+    client.get("/api/v1/articles/222")
+    samples = _samples(client)
+    assert samples[series] == before + 2
+    assert 'news_http_request_duration_seconds_count{route="/api/v1/articles/<int:article_id>",method="GET"}' in samples
+
+def test_ingest_stages_and_provider_calls_are_timed(client):
+    from services.ingest import run_ingest
+    before = _samples(client)
+    counts = run_ingest()
+    samples = _samples(client)
+
+    added = 'news_ingest_articles_total{outcome="added"}'
+    assert samples[added] == before.get(added, 0) + counts["added"]
+    for stage in ("standardize", "dedup_lookup", "cluster", "commit", "index"):
+        assert samples[f'news_ingest_stage_duration_seconds_count{{stage="{stage}"}}'] > before.get(
+            f'news_ingest_stage_duration_seconds_count{{stage="{stage}"}}', 0)
+    fetched = sum(v for k, v in samples.items() if k.startswith("news_fetch_articles_total"))
+    assert fetched - sum(v for k, v in before.items() if k.startswith("news_fetch_articles_total")) == counts["fetched"]
+
+def test_histogram_buckets_are_cumulative(client):
+    client.get("/api/v1/articles")
+    samples = _samples(client)
+    pattern = re.compile(r'news_http_request_duration_seconds_bucket\{route="/api/v1/articles",method="GET",le="([^"]+)"\}')
+    buckets = sorted((float(m.group(1)), value) for series, value in samples.items() if (m := pattern.fullmatch(series)))
+    counts = [value for _, value in buckets]
+    assert buckets[-1][0] == float("inf")
+    assert counts == sorted(counts)
+    assert counts[-1] == samples['news_http_request_duration_seconds_count{route="/api/v1/articles",method="GET"}']
+
+def test_quota_gauges_are_exported(client):
+    samples = _samples(client)
+    for provider in ("NewsData.io", "WorldNewsAPI", "GNews"):
+        assert f'news_provider_circuit_state{{provider="{provider}",state="closed"}}' in samples
+        assert f'news_provider_quota_limit{{provider="{provider}"}}' in samples
@@ -0,0 +1,128 @@
+from sqlalchemy import create_engine, inspect, text
+
+from models.news_article import ArticleContent
+
+def _legacy_database(tmp_path, rows):
+    """An articles table as older versions created it, with the text stored inline."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT NOT NULL, description TEXT, content TEXT, "
+            "url TEXT NOT NULL UNIQUE, url_hash VARCHAR(32), image_url TEXT, summary VARCHAR(255), "
+            "published_at DATETIME NOT NULL, source_name VARCHAR(255), source_url TEXT, category VARCHAR(100), "
+            "api_source VARCHAR(50), fetched_at DATETIME NOT NULL, simhash BIGINT, story_key VARCHAR(32))"
+        )
+        conn.execute(text(
+            "INSERT INTO articles (id, title, description, content, url, url_hash, image_url, published_at, fetched_at) "
+            "VALUES (:id, :title, :description, :content, :url, :url_hash, :image_url, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ), rows)
+    ArticleContent.__table__.create(bind=engine)
+    return engine
+
+def test_split_moves_article_text_to_the_content_table(tmp_path):
+    from migrations import split_article_content
+    engine = _legacy_database(tmp_path, [
+        {"id": i, "title": f"Story {i}", "description": f"<p>Description {i}</p>", "content": f"Content {i}",
+         "url": f"https://example.com/{i}", "url_hash": f"{i:032x}", "image_url": f"https://example.com/{i}.jpg"}
+        for i in range(1, 6)
+    ] + [
+        # Duplicate left without a url_hash: only gets its summary
+        {"id": 6, "title": "Story 6", "description": "Description 6", "content": None,
+         "url": "https://example.com/6?dup", "url_hash": None, "image_url": None}
+    ])
+
+    assert split_article_content(engine, batch_size=2) == 6
+
+    with engine.connect() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("articles")}
+        assert not columns & {"description", "content", "image_url"}
+        summaries = dict(conn.execute(text("SELECT id, summary FROM articles")).all())
+        contents = {row.url_hash: row for row in conn.execute(text("SELECT * FROM article_contents"))}
+    assert summaries[1] == "Description 1" # Markup stripped
+    assert summaries[6] == "Description 6"
+    assert len(contents) == 5
+    assert contents[f"{3:032x}"].content == "Content 3"
+    assert contents[f"{3:032x}"].image_url == "https://example.com/3.jpg"
+
+    # Nothing left to move on the next start
+    assert split_article_content(engine) == 0
+
+def test_stored_articles_keep_their_text_out_of_the_hot_table(client, store_articles):
+    from database import engine
+    store_articles([{"title": "Climate summit ends", "url": "https://example.com/climate",
+                     "description": "Leaders agreed on a new target.", "content": "The full report of the summit."}])
+    with engine.connect() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("articles")}
+        article_id, summary = conn.execute(text("SELECT id, summary FROM articles")).one()
+    assert "content" not in columns and "description" not in columns
+    assert summary == "Leaders agreed on a new target."
+    # The detail page and the API read the text from article_contents
+    assert "The full report of the summit." in client.get(f"/article/{article_id}").get_data(as_text=True)
+    data = client.get(f"/api/v1/articles/{article_id}?fields=id,content").get_json()["data"]
+    assert data["content"] == "The full report of the summit."
+
+def test_articles_table_is_rebuilt_with_autoincrement_ids(tmp_path):
+    from migrations import use_autoincrement_ids
+    from models.archived_article import ArchivedArticle
+    from models.news_article import NewsArticle
+    engine = create_engine(f"sqlite:///{tmp_path / 'rowid.db'}")
+    with engine.begin() as conn:
+        # As created before AUTOINCREMENT: an index, the search docs view and archived ids above the live ones
+        conn.exec_driver_sql(
+            "CREATE TABLE articles (id INTEGER NOT NULL PRIMARY KEY, title TEXT NOT NULL, summary VARCHAR(255), "
+            "url TEXT NOT NULL UNIQUE, url_hash VARCHAR(32), published_at DATETIME NOT NULL, "
+            "source_name VARCHAR(255), source_url TEXT, category VARCHAR(100), api_source VARCHAR(100), "
+            "fetched_at DATETIME NOT NULL, simhash BIGINT, story_key VARCHAR(32))"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_articles_published_id ON articles (published_at, id)")
+        conn.exec_driver_sql("CREATE VIEW article_search_docs AS SELECT id, title FROM articles")
+        conn.execute(text(
+            "INSERT INTO articles (id, title, url, url_hash, published_at, fetched_at) "
+            "VALUES (:id, :title, :url, :url_hash, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ), [{"id": i, "title": f"Story {i}", "url": f"https://example.com/{i}", "url_hash": f"{i:032x}"} for i in (1, 2)])
+    ArchivedArticle.__table__.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO archived_articles (id, url_hash, published_at, archive_path, block_offset, block_length) "
+            "VALUES (7, :hash, '2023-01-01 00:00:00', 'x', 0, 1)"
+        ), {"hash": f"{7:032x}"})
+
+    assert use_autoincrement_ids(engine)
+    assert not use_autoincrement_ids(engine) # Already rebuilt
+
+    with engine.begin() as conn:
+        assert "AUTOINCREMENT" in conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'articles'")).scalar()
+        assert conn.execute(text("SELECT id, title, url_hash FROM articles ORDER BY id")).all() == [
+            (1, "Story 1", f"{1:032x}"), (2, "Story 2", f"{2:032x}")]
+        indexes = {index["name"] for index in inspect(conn).get_indexes("articles")}
+        assert {index.name for index in NewsArticle.__table__.indexes} <= indexes
+        conn.execute(text("DELETE FROM articles WHERE id = 2"))
+        conn.execute(text(
+            "INSERT INTO articles (title, url, published_at, fetched_at) "
+            "VALUES ('New', 'https://example.com/new', '2024-01-02 00:00:00', '2024-01-02 00:00:00')"
+        ))
+        assert conn.execute(text("SELECT id FROM articles WHERE title = 'New'")).scalar() == 8
+
+def test_headline_candidates_are_read_in_index_order(app):
+    from datetime import datetime
+    from sqlalchemy import select
+    from database import engine
+    from models.news_article import NewsArticle
+    # One category's candidate query, as get_headlines builds it
+    query = select(NewsArticle.id, NewsArticle.category, NewsArticle.published_at, NewsArticle.story_key)\
+        .where(NewsArticle.category == "science", NewsArticle.fetched_at >= datetime(2024, 1, 1))\
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc()).limit(30)
+    compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+    assert "COVERING INDEX ix_articles_category_published_id_fetched" in plan
+    assert "TEMP B-TREE" not in plan # The LIMIT ends the scan instead of sorting the whole window
+
+def test_obsolete_indexes_are_dropped(tmp_path):
+    from migrations import drop_obsolete_indexes
+    engine = _legacy_database(tmp_path, [{"id": 1, "title": "Story", "description": None, "content": None,
+                                          "url": "https://example.com/1", "url_hash": f"{1:032x}", "image_url": None}])
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE INDEX ix_articles_category_fetched_published ON articles (category, fetched_at)")
+    drop_obsolete_indexes(engine)
+    assert "ix_articles_category_fetched_published" not in {index["name"] for index in inspect(engine).get_indexes("articles")}
@@ -0,0 +1,47 @@
+from sqlalchemy import select
+
+from database import SessionLocal
+from models.news_article import NewsArticle
+from services import page_cache
+
+def _article_ids():
+    db = SessionLocal()
+    try:
+        return db.execute(select(NewsArticle.id).order_by(NewsArticle.id)).scalars().all()
+    finally:
+        db.close()
+
+def _cached_keys():
+    return [key for (key,) in page_cache._connect().execute("SELECT key FROM pages ORDER BY created_at")]
+
+def test_query_parameters_the_view_ignores_share_one_entry(client, store_articles):
+    store_articles([{"title": "Harbour reopens after storm", "url": "https://example.com/harbour"}])
+    article_id = _article_ids()[0]
+
+    first = client.get(f"/article/{article_id}?utm_source=mail")
+    second = client.get(f"/article/{article_id}?fbclid=abc&x=1")
+    assert first.status_code == second.status_code == 200
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert _cached_keys() == [f"/article/{article_id}"]
+
+    revalidated = client.get(f"/article/{article_id}?x=2", headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+def test_whitelisted_parameters_are_part_of_the_key(app):
+    view = page_cache.cached_page(params=("page", "q"))(lambda: "ok")
+    with app.test_request_context("/search?q=rain&utm_source=x&page=2"):
+        assert view() is not None
+    with app.test_request_context("/search?page=2&q=rain"):
+        view()
+    assert _cached_keys() == ["/search?page=2&q=rain"]
+
+def test_oldest_pages_are_evicted_beyond_the_cap(client, store_articles, monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_MAX_ENTRIES", 2)
+    store_articles([
+        {"title": f"Story number {i}", "url": f"https://example.com/story-{i}"} for i in range(3)
+    ])
+    ids = _article_ids()
+    for article_id in ids:
+        assert client.get(f"/article/{article_id}").status_code == 200
+
+    assert _cached_keys() == [f"/article/{article_id}" for article_id in ids[1:]]
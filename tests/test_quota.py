@@ -0,0 +1,40 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from services import quota
+
+def _reserve_in_thread(provider):
+    """Runs reserve_request on another thread, like a fetch worker; returns (thread, results)."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(quota.reserve_request(provider)), daemon=True)
+    thread.start()
+    return thread, results
+
+def test_open_session_does_not_starve_quota_bookkeeping():
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1")) # Holds a writer connection, like ingest storing a batch
+        thread, results = _reserve_in_thread("GNews")
+        thread.join(timeout=5)
+        assert results == [True]
+    finally:
+        db.close()
+
+def test_concurrent_writes_wait_for_the_lock():
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE") # Another writer holds SQLite's write lock...
+        thread, results = _reserve_in_thread("GNews")
+        time.sleep(0.3)
+        assert results == [] # ...so the reservation waits (busy_timeout) instead of failing
+        conn.commit()
+    thread.join(timeout=5)
+    assert results == [True]
+    assert quota.quota_status()["GNews"]["used"] == 1
+
+def test_reservations_stop_at_the_daily_limit(monkeypatch):
+    monkeypatch.setitem(quota.PROVIDER_QUOTAS, "GNews", dict(quota.PROVIDER_QUOTAS["GNews"], daily_limit=2))
+    assert [quota.reserve_request("GNews") for _ in range(3)] == [True, True, False]
+    assert quota.quota_status()["GNews"]["used"] == 2
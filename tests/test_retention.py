@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from database import SessionLocal
+from models.news_article import NewsArticle
+from models.archived_article import ArchivedArticle
+
+def _old_and_new(store_articles):
+    now = datetime.utcnow()
+    store_articles([
+        {"title": f"Old budget story {i}", "url": f"https://example.com/old/{i}",
+         "published_at": now - timedelta(days=60, minutes=i)}
+        for i in range(3)
+    ] + [{"title": "Fresh budget story", "url": "https://example.com/new", "published_at": now}])
+
+def test_archive_moves_old_articles_out_and_reads_them_back(client, store_articles):
+    from services.retention import run_retention
+    _old_and_new(store_articles)
+    db = SessionLocal()
+    try:
+        old_ids = db.execute(select(NewsArticle.id).where(NewsArticle.title.like("Old%"))).scalars().all()
+    finally:
+        db.close()
+
+    result = run_retention(hot_days=30, batch_size=2)
+    assert result["archived"] == 3
+
+    db = SessionLocal()
+    try:
+        assert db.execute(select(func.count()).select_from(NewsArticle)).scalar() == 1
+        assert db.execute(select(func.count()).select_from(ArchivedArticle)).scalar() == 3
+    finally:
+        db.close()
+
+    for article_id in old_ids:
+        response = client.get(f"/api/v1/articles/{article_id}")
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert data["id"] == article_id and data["title"].startswith("Old budget story")
+        assert data["content"].startswith("Full text about")
+    # Archived articles are out of the search index
+    page = client.get("/search?q=budget").get_data(as_text=True)
+    assert "Fresh budget story" in page and "Old budget story" not in page
+
+def test_archived_articles_still_count_as_stored(store_articles):
+    from services.retention import run_retention
+    _old_and_new(store_articles)
+    run_retention(hot_days=30)
+    counts = store_articles([{"title": "Old budget story 0", "url": "https://example.com/old/0",
+                              "published_at": datetime.utcnow() - timedelta(days=60)}])
+    assert counts["added"] == 0 and counts["duplicates"] == 1
+
+def test_ids_of_archived_articles_are_not_reused(client, store_articles):
+    from services.retention import run_retention
+    now = datetime.utcnow()
+    store_articles([{"title": "Fresh budget story", "url": "https://example.com/new", "published_at": now}])
+    # Stored last, so the archived rows hold the highest ids
+    store_articles([{"title": f"Old budget story {i}", "url": f"https://example.com/old/{i}",
+                     "published_at": now - timedelta(days=60, minutes=i)} for i in range(3)])
+    db = SessionLocal()
+    try:
+        archived_ids = db.execute(select(NewsArticle.id).where(NewsArticle.title.like("Old%"))).scalars().all()
+    finally:
+        db.close()
+    run_retention(hot_days=30)
+
+    store_articles([{"title": "Later budget story", "url": "https://example.com/later", "published_at": now}])
+    db = SessionLocal()
+    try:
+        new_id = db.execute(select(NewsArticle.id).where(NewsArticle.title == "Later budget story")).scalar()
+    finally:
+        db.close()
+    assert new_id > max(archived_ids)
+    # Both stay reachable by id, and the new one is above the search index watermark
+    assert client.get(f"/api/v1/articles/{new_id}").get_json()["data"]["title"] == "Later budget story"
+    assert client.get(f"/api/v1/articles/{max(archived_ids)}").get_json()["data"]["title"].startswith("Old budget story")
+    assert "Later budget story" in client.get("/search?q=budget").get_data(as_text=True)
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from services import snapshots
+
+@pytest.fixture
+def snapshots_enabled(monkeypatch):
+    import routes.api
+    monkeypatch.setattr(snapshots, "SNAPSHOTS_ENABLED", True)
+    monkeypatch.setattr(routes.api, "SNAPSHOTS_ENABLED", True)
+
+def _feed_file(version, category):
+    with open(os.path.join(snapshots.VERSIONS_DIR, version, "feeds", f"{category}.json"), "rb") as f:
+        return f.read()
+
+def test_publish_writes_every_file_with_a_gzip_variant(store_articles):
+    store_articles([{"title": "Satellite launch succeeds", "url": "https://example.com/launch", "category": "science"}])
+    version = snapshots.publish_snapshots(force=True)
+    assert version and snapshots.current_version() == version
+
+    directory = os.path.join(snapshots.VERSIONS_DIR, version)
+    names = ["index.html"] + [f"feeds/{c}.json" for c in ("science", "sports")]
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as plain, open(os.path.join(directory, name + ".gz"), "rb") as packed:
+            assert gzip.decompress(packed.read()) == plain.read()
+    feed = json.loads(_feed_file(version, "science"))
+    assert [item["title"] for item in feed["data"]] == ["Satellite launch succeeds"]
+    assert json.loads(_feed_file(version, "sports"))["data"] == []
+
+def test_disabled_snapshots_are_not_published():
+    assert snapshots.publish_snapshots() is None
+    assert snapshots.current_version() is None
+
+def test_feed_and_index_are_served_from_the_live_snapshot(client, store_articles, snapshots_enabled):
+    store_articles([{"title": "Market rally continues", "url": "https://example.com/rally", "category": "business"}])
+    version = snapshots.publish_snapshots()
+    # Stored after publishing: the snapshot doesn't show it until the next one
+    store_articles([{"title": "Second market story", "url": "https://example.com/rally-2", "category": "business"}])
+
+    response = client.get("/api/v1/feeds/business")
+    assert response.status_code == 200
+    assert response.get_data() == _feed_file(version, "business")
+    assert version in response.headers["ETag"]
+    assert client.get("/api/v1/feeds/business", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    packed = client.get("/api/v1/feeds/business", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.get_data()) == _feed_file(version, "business")
+
+    page = client.get("/").get_data(as_text=True)
+    assert "Market rally continues" in page and "Second market story" not in page
+    # Query strings bypass the snapshot
+    assert "Second market story" in client.get("/?fresh=1").get_data(as_text=True)
+
+def test_new_version_replaces_the_live_one_and_old_ones_are_pruned(monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_KEEP_VERSIONS", 2)
+    versions = [snapshots.publish_snapshots(force=True) for _ in range(4)]
+    assert len(set(versions)) == 4
+    assert snapshots.current_version() == versions[-1]
+    assert sorted(os.listdir(snapshots.VERSIONS_DIR)) == versions[-2:]
+
+def test_failed_publish_keeps_the_previous_version(monkeypatch):
+    version = snapshots.publish_snapshots(force=True)
+    def broken(*args, **kwargs):
+        raise RuntimeError("template error")
+    monkeypatch.setattr(snapshots, "render_template", broken)
+    assert snapshots.publish_snapshots(force=True) is None
+    assert snapshots.current_version() == version
+
+def test_ingest_publishes_a_snapshot(snapshots_enabled):
+    from services.ingest import run_ingest
+    assert run_ingest()["added"] > 0
+    assert snapshots.current_version() is not None
+
+def test_quiet_ingest_still_republishes(stub, snapshots_enabled):
+    from services.ingest import run_ingest
+    version = snapshots.publish_snapshots()
+    stub.articles = 0 # Nothing new: the headlines can still have aged out of the window
+    assert run_ingest()["added"] == 0
+    assert snapshots.current_version() not in (None, version)
+
+def test_retention_republishes(snapshots_enabled):
+    from services.retention import run_retention
+    version = snapshots.publish_snapshots()
+    assert run_retention()["archived"] == 0
+    assert snapshots.current_version() not in (None, version)
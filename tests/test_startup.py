@@ -0,0 +1,71 @@
+import gc
+import importlib.util
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_config(monkeypatch, preload):
+    monkeypatch.setenv("GUNICORN_PRELOAD", "true" if preload else "false")
+    monkeypatch.delenv("WORKER_INIT_DEFERRED", raising=False)
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", os.path.join(PROJECT_DIR, "gunicorn.conf.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _fake_worker(monkeypatch):
+    """A worker whose app module records init_worker calls."""
+    calls = []
+    monkeypatch.setitem(sys.modules, "fake_main", types.SimpleNamespace(init_worker=lambda: calls.append(1)))
+    app = types.SimpleNamespace(import_name="fake_main")
+    return types.SimpleNamespace(app=types.SimpleNamespace(wsgi=lambda: app)), calls
+
+@pytest.fixture(autouse=True)
+def restore_gc():
+    yield
+    gc.enable()
+
+def test_preloading_defers_worker_init_to_post_fork(monkeypatch):
+    conf = _load_config(monkeypatch, preload=True)
+    assert conf.preload_app
+    assert os.environ["WORKER_INIT_DEFERRED"] == "true"
+    assert not gc.isenabled() # Until the app is imported and frozen
+
+    worker, calls = _fake_worker(monkeypatch)
+    conf.post_fork(None, worker)
+    assert calls == [1]
+    assert gc.isenabled()
+
+def test_without_preload_the_worker_imports_and_inits_the_app_itself(monkeypatch):
+    gc.disable()
+    conf = _load_config(monkeypatch, preload=False)
+    assert not conf.preload_app
+    assert "WORKER_INIT_DEFERRED" not in os.environ
+
+    worker, calls = _fake_worker(monkeypatch)
+    conf.when_ready(None)
+    conf.post_fork(None, worker)
+    assert calls == [] # create_app runs init_worker when the worker imports the app
+    assert gc.isenabled()
+
+def test_init_worker_drops_inherited_connections(app):
+    from database import engine
+    from main import init_worker
+    with engine.connect():
+        pass
+    assert engine.pool.checkedin() >= 1
+    init_worker()
+    assert engine.pool.checkedin() == 0
+
+def test_web_workers_do_not_load_the_retention_module(app, tmp_path):
+    # A fresh interpreter, so modules imported by other tests don't count
+    env = dict(os.environ, INSTANCE_FOLDER_PATH=str(tmp_path), SCHEDULER_ENABLED="false")
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('services.retention' in sys.modules)"],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()[-1]
+    assert loaded == "False"
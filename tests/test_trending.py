@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from services import trending
+from services.trending import CountMinSketch, TopK, score, title_terms
+
+BURST_TERMS = {"volcano", "eruption", "forces", "evacuations", "iceland"}
+
+def test_sketch_never_undercounts_and_round_trips():
+    rng = random.Random(3)
+    sketch = CountMinSketch(width=64, depth=4) # Small, so collisions are certain
+    truth = Counter(f"term{rng.randrange(500)}" for _ in range(5000))
+    for term, count in truth.items():
+        sketch.add(term, count)
+    assert all(sketch.estimate(term) >= count for term, count in truth.items())
+
+    restored = CountMinSketch.from_bytes(sketch.to_bytes(), width=64, depth=4)
+    assert all(restored.estimate(term) == sketch.estimate(term) for term in truth)
+
+def test_top_k_keeps_the_largest_estimates():
+    top = TopK(k=3)
+    for term, estimate in [("a", 1), ("b", 5), ("c", 2), ("d", 7), ("a", 9), ("e", 3)]:
+        top.offer(term, estimate)
+    assert top.counts == {"a": 9, "d": 7, "b": 5}
+
+def test_title_terms_drop_stopwords_and_numbers():
+    assert title_terms("Watch: Fed raises rates in 2025") == {"fed", "raises", "rates", "fed raises", "raises rates"}
+
+def test_acceleration_beats_volume():
+    assert score(10, 2 * 6) > score(40, 40 * 6) # 2 -> 10 per window vs a steady 40
+
+def _headlines(now):
+    """Three days of steady market headlines, then a burst of one story in the last two hours."""
+    articles = [{"title": "Stock markets close higher as investors weigh earnings",
+                 "url": f"https://example.com/markets/{hours}", "published_at": now - timedelta(hours=hours, minutes=10)}
+                for hours in range(72)]
+    articles += [{"title": "Volcano eruption forces evacuations in Iceland",
+                  "url": f"https://example.com/volcano/{i}", "published_at": now - timedelta(minutes=10 * i)}
+                 for i in range(6)]
+    return articles
+
+def test_burst_trends_and_steady_topics_do_not(client, store_articles):
+    store_articles(_headlines(datetime.utcnow()))
+    terms = client.get("/api/v1/trending").get_json()["data"]
+    assert terms, "the burst should trend"
+    # One topic per story: the overlapping phrases of the headline are grouped
+    assert len(terms) == 1
+    assert set(terms[0]["term"].split()) <= BURST_TERMS
+    assert terms[0]["window_count"] == 6
+    page = client.get("/").get_data(as_text=True)
+    assert "<h2>Trending</h2>" in page and terms[0]["term"] in page
+
+def test_rebuild_matches_incremental_counts(store_articles):
+    from database import ReadSessionLocal
+    store_articles(_headlines(datetime.utcnow()))
+    db = ReadSessionLocal()
+    try:
+        incremental = trending.get_trending_terms(db)
+    finally:
+        db.close()
+
+    assert trending.rebuild_trends() == 78
+    db = ReadSessionLocal()
+    try:
+        assert trending.get_trending_terms(db) == incremental
+    finally:
+        db.close()
+
+def test_articles_older_than_the_baseline_are_ignored():
+    now = datetime.utcnow()
+    assert trending.record_titles([{"title": "Ancient history", "published_at": now - timedelta(days=30)}], now=now) == 0